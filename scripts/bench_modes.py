@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Benchmark dos modos de geração: `quality` (Crew com três agentes) × `fast` (uma chamada).
+
+Roda as mesmas perguntas nos dois modos com o LLM configurado no `.env` e reporta
+latência, tokens e custo estimado por modo. Os caches de resposta não são usados:
+cada pergunta chama o LLM de fato.
+
+Exemplos:
+    python scripts/bench_modes.py --repeat 3
+    python scripts/bench_modes.py --questions perguntas.txt --price-in 0.15 --price-out 0.60
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dotenv import load_dotenv, find_dotenv  # noqa: E402
+
+load_dotenv(find_dotenv())
+
+from src.agents.agent_manager import AgentManager, RESPONSE_MODES  # noqa: E402
+from src.service.personabot_service import _run_crew, _search_context  # noqa: E402
+from src.utils.metrics import percentile  # noqa: E402
+
+
+DEFAULT_QUESTIONS = [
+    "O que você acha de café pela manhã?",
+    "Qual a sua dica para começar a programar?",
+    "Você prefere praia ou montanha?",
+]
+
+
+def token_usage(manager: AgentManager) -> tuple[int, int]:
+    """Tokens (prompt, completion) acumulados pelo LLM do manager (todas as chamadas)."""
+    try:
+        usage = manager.llm.get_token_usage_summary()
+    except Exception:
+        return 0, 0
+    return int(getattr(usage, "prompt_tokens", 0) or 0), int(getattr(usage, "completion_tokens", 0) or 0)
+
+
+def run_mode(manager: AgentManager, mode: str, questions: list[str], contexts: dict[str, list[str]]) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    p0, c0 = token_usage(manager)
+    for question in questions:
+        t0 = time.perf_counter()
+        try:
+            if mode == "fast":
+                manager.run_fast_path(question, contexts[question])
+            else:
+                _run_crew(manager, question, contexts[question])
+        except Exception as e:
+            errors += 1
+            print(f"AVISO: [{mode}] falha em '{question}': {e}", file=sys.stderr)
+        latencies.append(time.perf_counter() - t0)
+    p1, c1 = token_usage(manager)
+    return {
+        "requests": len(questions),
+        "errors": errors,
+        "mean_s": statistics.mean(latencies) if latencies else 0.0,
+        "p50_s": percentile(latencies, 50),
+        "p95_s": percentile(latencies, 95),
+        "prompt_tokens": p1 - p0,
+        "completion_tokens": c1 - c0,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compara latência, tokens e custo dos modos quality e fast.")
+    parser.add_argument("--questions", help="arquivo com uma pergunta por linha (padrão: perguntas de exemplo)")
+    parser.add_argument("--repeat", type=int, default=1, help="repetições de cada pergunta por modo")
+    parser.add_argument("--modes", default=",".join(RESPONSE_MODES), help="modos a medir (separados por vírgula)")
+    parser.add_argument("--price-in", type=float, default=0.0, help="US$ por 1M tokens de entrada")
+    parser.add_argument("--price-out", type=float, default=0.0, help="US$ por 1M tokens de saída")
+    args = parser.parse_args()
+
+    if args.questions:
+        with open(args.questions, "r", encoding="utf-8") as f:
+            questions = [line.strip() for line in f if line.strip()]
+    else:
+        questions = DEFAULT_QUESTIONS
+    questions = questions * max(1, args.repeat)
+
+    # Mesmo contexto do RAG para os dois modos (a busca fica fora da medição)
+    contexts = {q: _search_context(q) for q in set(questions)}
+
+    print(f"{len(questions)} perguntas por modo")
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        # Manager novo por modo: o contador de tokens do LLM começa do zero
+        result = run_mode(AgentManager(), mode, questions, contexts)
+        n = max(1, result["requests"] - result["errors"])
+        cost = (result["prompt_tokens"] * args.price_in + result["completion_tokens"] * args.price_out) / 1_000_000
+        print(
+            f"{mode:<8} erros {result['errors']:>3} | média {result['mean_s']:6.2f}s "
+            f"p50 {result['p50_s']:6.2f}s p95 {result['p95_s']:6.2f}s | "
+            f"tokens/resp {result['prompt_tokens'] / n:7.0f} in {result['completion_tokens'] / n:6.0f} out | "
+            f"custo/resp US$ {cost / n:.6f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
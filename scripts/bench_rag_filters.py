@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Benchmark da busca filtrada por metadados no Chroma × tamanho da coleção.
+
+Gera uma coleção sintética (vetores aleatórios no lugar do encoder, que não é o que se
+mede aqui) com interações de várias personas, usuários e canais espalhadas por 90 dias,
+e mede a latência de `search_similar_interactions` sem filtro e com filtros de persona,
+usuário e período empurrados para o Chroma, conforme a coleção cresce.
+
+Exemplos:
+    python scripts/bench_rag_filters.py --sizes 1000,10000,50000 --queries 200
+    python scripts/bench_rag_filters.py --sizes 5000 --dim 768 --persist /tmp/bench_chroma
+"""
+import argparse
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import chromadb  # noqa: E402
+
+from src.rag.rag_service import RAGService  # noqa: E402
+from src.utils.metrics import percentile  # noqa: E402
+
+
+PERSONAS = ["Rony", "Lia", "Guru", "Poeta", "Vó"]
+CHANNELS = ["twitter", "web", "cli"]
+DAY = 24 * 3600
+
+
+class RandomEmbedder:
+    """Vetores aleatórios reprodutíveis: isola o custo do Chroma do custo do encoder."""
+
+    model_name = "random"
+
+    def __init__(self, dim: int, seed: int):
+        self.dim = dim
+        self.rng = random.Random(seed)
+
+    def embed_documents(self, texts):
+        return [[self.rng.gauss(0, 1) for _ in range(self.dim)] for _ in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def grow(service: RAGService, start: int, end: int, users: int, now: float, rng: random.Random) -> None:
+    items = (
+        {
+            "id": f"doc-{i}",
+            "text": f"interação {i}",
+            "metadata": {
+                "persona": rng.choice(PERSONAS),
+                "user": str(rng.randrange(users)),
+                "channel": rng.choice(CHANNELS),
+                "kind": rng.choice(["question", "answer"]),
+                "timestamp": now - rng.uniform(0, 90 * DAY),
+            },
+        }
+        for i in range(start, end)
+    )
+    service.store_interactions(items, batch_size=500, write_chunk_size=5000, skip_existing=False)
+
+
+def scenarios(users: int, now: float, rng: random.Random) -> dict:
+    return {
+        "sem filtro": lambda: {},
+        "persona": lambda: {"persona": rng.choice(PERSONAS)},
+        "persona+usuário": lambda: {"persona": rng.choice(PERSONAS), "user": str(rng.randrange(users))},
+        "últimos 7 dias": lambda: {"since": now - 7 * DAY},
+        "persona+canal+30d": lambda: {
+            "persona": rng.choice(PERSONAS), "channel": rng.choice(CHANNELS), "since": now - 30 * DAY,
+        },
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Latência da busca filtrada no Chroma por tamanho da coleção.")
+    parser.add_argument("--sizes", default="1000,10000,50000", help="tamanhos da coleção, crescentes")
+    parser.add_argument("--queries", type=int, default=100, help="consultas por cenário e tamanho")
+    parser.add_argument("--n-results", type=int, default=5)
+    parser.add_argument("--users", type=int, default=1000, help="usuários distintos")
+    parser.add_argument("--dim", type=int, default=384, help="dimensão dos vetores (MiniLM = 384)")
+    parser.add_argument("--persist", default=None, help="diretório do PersistentClient (padrão: temporário)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    sizes = sorted(int(s) for s in args.sizes.split(",") if s.strip())
+    path = Path(args.persist) if args.persist else Path(tempfile.mkdtemp(prefix="bench-chroma-"))
+    client = chromadb.PersistentClient(path=str(path))
+    service = RAGService(
+        client=client, embedding_function=RandomEmbedder(args.dim, args.seed), collection_name="bench_interactions"
+    )
+    rng = random.Random(args.seed)
+    now = time.time()
+    cases = scenarios(args.users, now, rng)
+
+    print(f"Coleção em {path} | dim {args.dim} | {args.queries} consultas por cenário | n_results {args.n_results}")
+    print(f"{'docs':>8}  {'cenário':<20} {'p50 ms':>8} {'p95 ms':>8} {'média res.':>10}")
+    try:
+        size = service.collection.count()
+        for target in sizes:
+            if target > size:
+                started = time.perf_counter()
+                grow(service, size, target, args.users, now, rng)
+                print(f"{target:>8}  (ingestão de {target - size} docs em {time.perf_counter() - started:.1f}s)")
+                size = target
+            for name, make_filters in cases.items():
+                latencies, hits = [], []
+                for _ in range(args.queries):
+                    filters = make_filters()
+                    started = time.perf_counter()
+                    docs = service.search_similar_interactions("consulta", n_results=args.n_results, **filters)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    hits.append(len(docs))
+                print(
+                    f"{size:>8}  {name:<20} {percentile(latencies, 50):>8.2f} "
+                    f"{percentile(latencies, 95):>8.2f} {statistics.mean(hits):>10.2f}"
+                )
+    finally:
+        if not args.persist:
+            shutil.rmtree(path, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
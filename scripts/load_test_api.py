@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Teste de carga de `/api/ask`: vazão com requisições concorrentes.
+
+Modos:
+- `--url http://localhost:8000`: dispara contra um servidor real (uvicorn).
+- sem `--url`: roda a app em processo (httpx + ASGI) com LLM e RAG simulados
+  (`--llm-latency` segundos por resposta) e compara o caminho antigo (handler
+  síncrono no threadpool do Starlette) com o caminho assíncrono atual.
+
+Exemplos:
+    python scripts/load_test_api.py --requests 400 --concurrency 200 --llm-latency 1.0
+    python scripts/load_test_api.py --url http://localhost:8000 --requests 50 --concurrency 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.utils.metrics import percentile  # noqa: E402
+
+
+async def run_load(client: httpx.AsyncClient, path: str, total: int, concurrency: int) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                r = await client.post(path, json={"question": f"pergunta de carga {i}"})
+                if r.status_code != 200:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - t0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    wall = time.perf_counter() - started
+    return {
+        "requests": total,
+        "errors": errors,
+        "wall_s": wall,
+        "rps": total / wall if wall else 0.0,
+        "p50_s": percentile(latencies, 50),
+        "p95_s": percentile(latencies, 95),
+        "p99_s": percentile(latencies, 99),
+        "mean_s": statistics.mean(latencies) if latencies else 0.0,
+    }
+
+
+def print_report(label: str, r: dict) -> None:
+    print(
+        f"{label:<22} {r['requests']:>6} req | erros {r['errors']:>4} | {r['wall_s']:7.2f}s | "
+        f"{r['rps']:8.1f} req/s | p50 {r['p50_s']:.2f}s p95 {r['p95_s']:.2f}s p99 {r['p99_s']:.2f}s"
+    )
+
+
+async def run_simulated(args: argparse.Namespace) -> None:
+    # O pool limita gerações simultâneas; para o teste, um manager por requisição concorrente
+    os.environ.setdefault("AGENT_POOL_SIZE", str(args.concurrency))
+    os.environ.setdefault("AGENT_POOL_PREWARM", "false")
+    # As duas rodadas usam as mesmas perguntas: sem cache, para medir a Crew de fato
+    os.environ.setdefault("RESPONSE_CACHE_BACKEND", "off")
+
+    from crewai import Crew
+    from src.web.app import app, AskRequest
+    from src.service.personabot_service import run_single_interaction
+
+    latency = args.llm_latency
+    answer = SimpleNamespace(raw="resposta simulada")
+
+    def fake_kickoff(self, *a, **kw):
+        time.sleep(latency)  # LLM bloqueante: segura a thread durante a geração
+        return answer
+
+    async def fake_akickoff(self, *a, **kw):
+        await asyncio.sleep(latency)  # LLM assíncrono: libera o event loop
+        return answer
+
+    class FakeRAG:
+        def search_similar_interactions(self, *a, **kw):
+            return []
+
+    # Caminho antigo: `def` síncrono executado no threadpool do Starlette
+    @app.post("/api/ask-legacy-sync")
+    def legacy_ask(payload: AskRequest):
+        return {"ok": True, "answer": run_single_interaction(payload.question)}
+
+    with mock.patch("src.agents.agent_manager.RAGService", FakeRAG), \
+            mock.patch("src.service.personabot_service._search_context", return_value=[]), \
+            mock.patch.object(Crew, "kickoff", fake_kickoff), \
+            mock.patch.object(Crew, "akickoff", fake_akickoff, create=True):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+            print(
+                f"Simulação: {args.requests} requisições, concorrência {args.concurrency}, "
+                f"LLM simulado de {latency:.2f}s"
+            )
+            before = await run_load(client, "/api/ask-legacy-sync", args.requests, args.concurrency)
+            print_report("antes (sync/threadpool)", before)
+            after = await run_load(client, "/api/ask", args.requests, args.concurrency)
+            print_report("depois (async)", after)
+            if before["rps"]:
+                print(f"Ganho de vazão: {after['rps'] / before['rps']:.1f}x")
+
+
+async def run_remote(args: argparse.Namespace) -> None:
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as client:
+        result = await run_load(client, args.path, args.requests, args.concurrency)
+        print_report(args.path, result)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Teste de carga concorrente para /api/ask.")
+    parser.add_argument("--url", help="URL de um servidor em execução (omita para simulação em processo)")
+    parser.add_argument("--path", default="/api/ask")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="latência simulada do LLM (s)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    if args.url:
+        asyncio.run(run_remote(args))
+    else:
+        asyncio.run(run_simulated(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""Replay de menções pelo pipeline completo contra a API falsa do Twitter.
+
+Sobe `src/twitter/fake_server.py` em processo, injeta um fluxo de menções (gravado em
+JSONL ou sintético) a N× a velocidade real e roda daemon + workers + outbox + scheduler
+de rate limit apontando para o servidor falso. Ao final reporta a vazão sustentada
+(menções respondidas por minuto) e os percentis da latência menção -> resposta.
+
+Por padrão o LLM é simulado (`--llm-latency` segundos por resposta); `--real-llm` usa a
+Crew de verdade.
+
+Entrada JSONL: uma menção por linha, `{"text": ..., "offset_s": 12.5, "author_id": "..."}`
+(`offset_s` = segundos desde o início da gravação; sem ele, as menções chegam juntas).
+
+Exemplos:
+    python scripts/replay_mentions.py --synthetic 300 --rate 120 --speed 10 --workers 8
+    python scripts/replay_mentions.py --input mencoes.jsonl --speed 60 --error-rate 0.02
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.pipeline.checkpoint import Checkpoint  # noqa: E402
+from src.pipeline.context import ContextResolver  # noqa: E402
+from src.pipeline.daemon import MentionDaemon, make_reply_handler  # noqa: E402
+from src.pipeline.delay import humanized_delay  # noqa: E402
+from src.pipeline.outbox import Outbox, OutboxSender  # noqa: E402
+from src.pipeline.priority import PRIORITY_MODES, MentionScorer  # noqa: E402
+from src.pipeline.seen import SeenIndex  # noqa: E402
+from src.twitter.client import TwitterClient  # noqa: E402
+from src.twitter.fake_server import BOT_ID, FAKE_LIMITS, FakeServerThread, FakeTwitterState  # noqa: E402
+from src.twitter.rate_limit import RateLimitScheduler  # noqa: E402
+from src.utils.metrics import percentile  # noqa: E402
+
+
+QUESTIONS = [
+    "O que você acha de café?",
+    "Qual a sua dica para começar a programar?",
+    "Praia ou montanha?",
+    "Me indica um livro?",
+    "Como você organiza a sua semana?",
+]
+
+
+def load_stream(args: argparse.Namespace) -> list[dict]:
+    if args.input:
+        with open(args.input, "r", encoding="utf-8") as f:
+            items = [json.loads(line) for line in f if line.strip()]
+        return sorted(items, key=lambda m: float(m.get("offset_s", 0)))
+    # Chegadas de Poisson com `--rate` menções por minuto
+    rng = random.Random(args.seed)
+    offset, items = 0.0, []
+    for i in range(args.synthetic):
+        offset += rng.expovariate(args.rate / 60)
+        items.append({
+            "text": f"@personabot {rng.choice(QUESTIONS)} #{i}",
+            "offset_s": offset,
+            "author_id": str(2000 + rng.randrange(500)),
+        })
+    return items
+
+
+def feed(state: FakeTwitterState, items: list[dict], speed: float, done: threading.Event) -> None:
+    started = time.monotonic()
+    for item in items:
+        delay = float(item.get("offset_s", 0)) / speed - (time.monotonic() - started)
+        if delay > 0:
+            time.sleep(delay)
+        state.add_tweet(item["text"], author_id=str(item.get("author_id", "2000")))
+    done.set()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay de menções contra a API falsa do Twitter.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--input", help="JSONL com menções gravadas")
+    source.add_argument("--synthetic", type=int, default=200, help="quantidade de menções sintéticas")
+    parser.add_argument("--rate", type=float, default=60.0, help="menções/minuto do fluxo sintético (tempo real)")
+    parser.add_argument("--speed", type=float, default=10.0, help="fator de aceleração do replay (N×)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue-size", type=int, default=100)
+    parser.add_argument("--priority", choices=PRIORITY_MODES, default="score", help="ordem da fila dos workers")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="intervalo de polling (s)")
+    parser.add_argument(
+        "--reply-delay", type=float, nargs=2, default=(0.0, 0.0), metavar=("MIN", "MAX"),
+        help="atraso humano das respostas em segundos de tempo real (ex.: 120 900)",
+    )
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="latência simulada do LLM (s)")
+    parser.add_argument("--real-llm", action="store_true", help="usa a Crew/LLM configurados")
+    parser.add_argument("--api-latency", type=float, default=0.02, help="latência da API falsa (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fração de 503 na API falsa")
+    parser.add_argument("--post-limit", type=int, default=FAKE_LIMITS["post"][0], help="posts por janela de 15 min (tempo real)")
+    parser.add_argument("--timeout", type=float, default=600.0, help="tempo máximo do replay (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    items = load_stream(args)
+    # A N× a velocidade real, as janelas de rate limit encolhem na mesma proporção
+    limits = {name: (count, window / args.speed) for name, (count, window) in FAKE_LIMITS.items()}
+    limits["post"] = (args.post_limit, limits["post"][1])
+    state = FakeTwitterState(latency=args.api_latency, error_rate=args.error_rate, limits=limits, seed=args.seed)
+    server = FakeServerThread(state).start()
+    workdir = Path(tempfile.mkdtemp(prefix="replay-"))
+
+    scheduler = RateLimitScheduler(limits=limits | {"default": FAKE_LIMITS["lookup"]}, max_workers=8)
+    creds = {"consumer_key": "x", "consumer_secret": "x", "access_token": "x", "access_token_secret": "x", "user_id": BOT_ID}
+    client = TwitterClient(scheduler=scheduler, credentials=creds, base_url=server.url)
+    outbox = Outbox(workdir / "pipeline.sqlite")
+    sender = OutboxSender(outbox, client.submit_reply, base_delay=0.2, max_delay=5.0)
+
+    def simulated_answer(question: str, mode=None, extra_context=None) -> str:
+        time.sleep(args.llm_latency)
+        return f"Resposta simulada: {question[:80]}"
+
+    resolver = ContextResolver(client)
+    patch = mock.patch("src.service.personabot_service.run_single_interaction", simulated_answer)
+    if not args.real_llm:
+        patch.start()
+    daemon = MentionDaemon(
+        client,
+        make_reply_handler(
+            client,
+            outbox=outbox,
+            on_enqueue=sender.schedule,
+            delay=lambda: humanized_delay(args.reply_delay[0] / args.speed, args.reply_delay[1] / args.speed),
+            resolver=resolver,
+        ),
+        Checkpoint(workdir / "pipeline.sqlite"),
+        poll_interval=args.poll_interval,
+        backfill=True,
+        workers=args.workers,
+        max_queue=args.queue_size,
+        seen=SeenIndex(workdir / "pipeline.sqlite"),
+        bot_user_id=BOT_ID,
+        priority=MentionScorer() if args.priority == "score" else None,
+        priority_aging=0.01 * args.speed,
+        resolver=resolver,
+    )
+
+    print(
+        f"Replay: {len(items)} menções a {args.speed:g}× | workers {args.workers} | "
+        f"LLM {'real' if args.real_llm else f'simulado {args.llm_latency:.2f}s'} | API falsa em {server.url}"
+    )
+    fed = threading.Event()
+    started = time.time()
+    sender.start()
+    threading.Thread(target=feed, args=(state, items, args.speed, fed), daemon=True).start()
+    runner = threading.Thread(target=daemon.run_forever, daemon=True)
+    runner.start()
+    try:
+        while time.time() - started < args.timeout:
+            if fed.is_set() and len(state.replies) >= len(items):
+                break
+            time.sleep(0.1)
+    finally:
+        daemon.stop()
+        runner.join(30)
+        sender.stop(10)
+        scheduler.close()
+        server.stop()
+        if not args.real_llm:
+            patch.stop()
+
+    replies = state.replies
+    latencies = [r["latency"] for r in replies if r["latency"] is not None]
+    elapsed = (max(r["posted_at"] for r in replies) - started) if replies else time.time() - started
+    per_min = len(replies) / elapsed * 60 if elapsed else 0.0
+    fake = state.stats()
+    print(
+        f"Respondidas: {len(replies)}/{len(items)} em {elapsed:.1f}s | "
+        f"vazão sustentada: {per_min:.1f} menções/min ({per_min / args.speed:.1f}/min em tempo real)"
+    )
+    print(
+        f"Latência menção -> resposta: p50 {percentile(latencies, 50):.2f}s "
+        f"p95 {percentile(latencies, 95):.2f}s p99 {percentile(latencies, 99):.2f}s"
+    )
+    print(
+        f"API falsa: {fake['requests']} requisições | 429: {fake['throttled']} | "
+        f"503 injetados: {fake['injected_errors']} | respostas duplicadas: {fake['duplicate_replies']}"
+    )
+    sender_stats = sender.stats()
+    daemon_stats = daemon.stats()
+    by_class = (daemon_stats["pool"]["priority"] or {}).get("queue_wait_by_class", {})
+    for klass, wait in by_class.items():
+        print(f"Espera na fila [{klass}]: {wait['count']} menções, média {wait.get('avg') or 0:.2f}s")
+    context = daemon_stats["context"]
+    print(
+        f"Contexto: {context['api_calls']} chamadas de lookup (ingênuo: {context['naive_calls']}) | "
+        f"economia de {context['saved_per_mention']:.2f} chamadas por menção"
+    )
+    print(f"Duplicatas descartadas: {daemon_stats['duplicates']} | tweets do bot ignorados: {daemon_stats['own_tweets']}")
+    print(
+        f"Outbox: enviados {sender_stats['sent']} | retentativas {sender_stats['retried']} | "
+        f"falhas {sender_stats['failed']} | atraso na liberação (média) {sender_stats['release_lag'].get('avg') or 0:.3f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,49 @@
+import asyncio
 import os
 from crewai import Agent, Task, LLM
 from typing import Any
-from src.rag.rag_service import RAGService
+from src.rag.rag_service import RAGService, rag_search_settings
 from src.config_loader import load_persona_config
 
+def llm_settings() -> dict:
+    """Parâmetros do LLM lidos do ambiente (provider, modelo e parâmetros de geração)."""
+    provider = os.getenv("LLM_PROVIDER", "openai").lower()
+    # Parâmetros de geração para reduzir alucinação
+    temperature = float(os.getenv("LLM_TEMPERATURE", "0.1"))
+    top_p = float(os.getenv("LLM_TOP_P", "0.9"))
+    try:
+        max_tokens = int(os.getenv("LLM_MAX_TOKENS", "256"))
+    except ValueError:
+        max_tokens = 256
+    settings = {
+        "provider": provider,
+        "temperature": temperature,
+        "top_p": top_p,
+        "max_tokens": max_tokens,
+    }
+    if provider == "ollama":
+        settings["model"] = f"ollama/{os.getenv('OLLAMA_MODEL', 'llama3.1')}"
+        settings["base_url"] = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+    else:
+        settings["model"] = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    return settings
+
+
+RESPONSE_MODES = ("quality", "fast")
+
+
+def response_mode(mode: str | None = None) -> str:
+    """Modo de geração: `quality` (Crew com três agentes, padrão) ou `fast` (uma chamada).
+
+    Sem argumento, usa a variável de ambiente `RESPONSE_MODE`.
+    """
+    mode = (mode or os.getenv("RESPONSE_MODE", "quality")).strip().lower()
+    return mode if mode in RESPONSE_MODES else "quality"
+
+
 class AgentManager:
-    def __init__(self, persona_config: dict | None = None):
-        self.rag_service = RAGService()
+    def __init__(self, persona_config: dict | None = None, rag_service: RAGService | None = None):
+        self.rag_service = rag_service or RAGService()
         self.persona_config = persona_config or load_persona_config()
         self.llm = self._create_llm()
 
@@ -18,7 +55,7 @@ class AgentManager:
         """
         def _run(query: str) -> str:
             try:
-                docs = self.rag_service.search_similar_interactions(query, n_results=5) or []
+                docs = self.rag_service.search_similar_interactions(query, **rag_search_settings()) or []
                 if not docs:
                     return "Nenhum contexto relevante encontrado."
                 return "\n".join(f"- {d}" for d in docs)
@@ -41,30 +78,25 @@ class AgentManager:
         - OpenAI (padrão): usa `OPENAI_API_KEY` e `OPENAI_MODEL` (ex.: gpt-4o-mini)
         - Ollama: defina `LLM_PROVIDER=ollama`, `OLLAMA_BASE_URL` e `OLLAMA_MODEL` (ex.: llama3.1)
         """
-        provider = os.getenv("LLM_PROVIDER", "openai").lower()
-        # Parâmetros de geração para reduzir alucinação
-        temperature = float(os.getenv("LLM_TEMPERATURE", "0.1"))
-        top_p = float(os.getenv("LLM_TOP_P", "0.9"))
-        try:
-            max_tokens = int(os.getenv("LLM_MAX_TOKENS", "256"))
-        except ValueError:
-            max_tokens = 256
-        if provider == "ollama":
-            model = os.getenv("OLLAMA_MODEL", "llama3.1")
-            base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+        settings = llm_settings()
+        if settings["provider"] == "ollama":
             # O litellm aceita o prefixo 'ollama/' para o modelo
             return LLM(
-                model=f"ollama/{model}",
-                base_url=base_url,
+                model=settings["model"],
+                base_url=settings["base_url"],
                 api_key=os.getenv("OLLAMA_API_KEY", "ollama"),
-                temperature=temperature,
-                top_p=top_p,
-                max_tokens=max_tokens,
+                temperature=settings["temperature"],
+                top_p=settings["top_p"],
+                max_tokens=settings["max_tokens"],
             )
 
         # OpenAI (padrão)
-        model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-        return LLM(model=model, temperature=temperature, top_p=top_p, max_tokens=max_tokens)
+        return LLM(
+            model=settings["model"],
+            temperature=settings["temperature"],
+            top_p=settings["top_p"],
+            max_tokens=settings["max_tokens"],
+        )
 
     def create_memory_agent(self) -> Agent:
         use_rag_tool = os.getenv("USE_RAG_TOOL", "false").strip().lower() in ("1", "true", "yes")
@@ -78,13 +110,16 @@ class AgentManager:
             verbose=True
         )
 
-    def create_persona_agent(self) -> Agent:
+    def _style_block(self) -> str:
         style_params = self.persona_config.get('style_params', {})
         style_lines = []
         if isinstance(style_params, dict) and style_params:
             for k, v in style_params.items():
                 style_lines.append(f"- **{k.capitalize()}:** {v}")
-        style_block = "\n".join(style_lines)
+        return "\n".join(style_lines)
+
+    def create_persona_agent(self) -> Agent:
+        style_block = self._style_block()
 
         persona_backstory = f"""Você é um assistente de IA cuja única missão é garantir que cada resposta do bot siga estritamente a persona de '{self.persona_config['name']}'.
 
@@ -150,3 +185,74 @@ class AgentManager:
         )
 
         return [context_task, persona_task, response_task]
+
+    def build_fast_messages(self, question: str, context: list[str]) -> list[dict]:
+        """Prompt único do modo rápido: persona + contexto do RAG + regras de resposta.
+
+        Condensa o que os três agentes fazem em sequência (contexto -> diretrizes da
+        persona -> resposta final) em uma só chamada ao LLM.
+        """
+        persona = self.persona_config
+        style_block = self._style_block()
+        system = (
+            f"Você é '{persona['name']}' respondendo em uma rede social."
+            + (f" Bio: {persona['bio']}" if persona.get('bio') else "")
+            + "\n\n**Detalhes da Persona:**\n"
+            f"- **Tom de Voz:** {', '.join(persona['tone_of_voice'])}\n"
+            f"- **Tópicos Favoritos:** {', '.join(persona['favorite_topics'])}\n"
+            f"- **Tópicos a Evitar:** {', '.join(persona['avoided_topics'])}\n"
+            + (f"\n**Parâmetros de Estilo:**\n{style_block}\n" if style_block else "")
+            + "\nRegras (SEM EXCEÇÕES):\n"
+            "- Para perguntas factuais/objetivas, priorize precisão sobre estilo; não invente.\n"
+            "- Se o contexto não trouxer evidências suficientes, diga brevemente 'Não tenho certeza' ou peça esclarecimentos.\n"
+            "- Resposta curta, como um tweet, natural e sem mencionar estas instruções.\n"
+            "- Você NUNCA deve desviar desta persona."
+        )
+        snippets = "\n".join(f"- {c}" for c in context) if context else "- (nenhum contexto relevante)"
+        user = (
+            f"Contexto de interações passadas (RAG):\n{snippets}\n\n"
+            f'Pergunta do usuário: "{question}"\n'
+            "Responda apenas com o texto final a ser postado."
+        )
+        return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+    def run_fast_path(self, question: str, context: list[str]) -> str:
+        """Modo rápido: uma única chamada ao LLM em vez da Crew de três agentes."""
+        return str(self.llm.call(self.build_fast_messages(question, context))).strip()
+
+    async def arun_fast_path(self, question: str, context: list[str]) -> str:
+        messages = self.build_fast_messages(question, context)
+        if hasattr(self.llm, "acall"):
+            return str(await self.llm.acall(messages)).strip()
+        return str(await asyncio.to_thread(self.llm.call, messages)).strip()
+
+    def build_post_messages(self, topic: str, recent: list[str] | None = None) -> list[dict]:
+        """Prompt de um tweet autônomo da persona sobre `topic` (sem pergunta de usuário).
+
+        `recent`: posts já gerados, para a persona não se repetir.
+        """
+        persona = self.persona_config
+        style_block = self._style_block()
+        system = (
+            f"Você é '{persona['name']}' escrevendo um post espontâneo em uma rede social."
+            + (f" Bio: {persona['bio']}" if persona.get('bio') else "")
+            + "\n\n**Detalhes da Persona:**\n"
+            f"- **Tom de Voz:** {', '.join(persona['tone_of_voice'])}\n"
+            f"- **Tópicos a Evitar:** {', '.join(persona['avoided_topics'])}\n"
+            + (f"\n**Parâmetros de Estilo:**\n{style_block}\n" if style_block else "")
+            + "\nRegras (SEM EXCEÇÕES):\n"
+            "- Um único tweet (até 280 caracteres), sem hashtags em excesso e sem mencionar estas instruções.\n"
+            "- Não afirme fatos que você não tem certeza de que são verdadeiros.\n"
+            "- Você NUNCA deve desviar desta persona."
+        )
+        avoid = "\n".join(f"- {r}" for r in recent or [])
+        user = (
+            f'Tema do post: "{topic}".\n'
+            + (f"Posts recentes (não repita ideias nem frases):\n{avoid}\n" if avoid else "")
+            + "Responda apenas com o texto do tweet."
+        )
+        return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+    def compose_post(self, topic: str, recent: list[str] | None = None) -> str:
+        """Gera um tweet autônomo da persona em uma única chamada ao LLM."""
+        return str(self.llm.call(self.build_post_messages(topic, recent))).strip()
@@ -11,3 +11,13 @@ def load_persona_config() -> dict:
         raise FileNotFoundError(f"Arquivo de persona não encontrado em: {config_path}")
     except Exception as e:
         raise e
+
+
+def load_all_personas() -> dict:
+    """Persona padrão (`default`) e as de `config/personas/*.yaml`, indexadas pelo nome do arquivo."""
+    config_dir = Path(__file__).parent.parent / "config"
+    personas = {"default": load_persona_config()}
+    for path in sorted((config_dir / "personas").glob("*.yaml")):
+        with open(path, 'r', encoding='utf-8') as file:
+            personas[path.stem] = yaml.safe_load(file)
+    return personas
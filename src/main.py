@@ -45,34 +45,8 @@ def main():
         verbose=True
     )
 
-    # O código abaixo é um exemplo de como o loop principal poderia funcionar.
-    # Ele está comentado para evitar execução contínua durante o desenvolvimento inicial.
-
-    # from src.twitter.client import TwitterClient
-    # import time
-
-    # client = TwitterClient()
-    # last_processed_id = None # Em um cenário real, isso seria persistido
-
-    # while True:
-    #     print("Verificando por novas menções...")
-    #     mentions = client.get_recent_mentions(last_processed_id)
-        
-    #     for mention in reversed(mentions): # Processa da mais antiga para a mais nova
-    #         if not is_safe_to_respond(mention.text):
-    #             continue
-
-    #         print(f"Processando menção: {mention.text}")
-    #         tasks[0].description = f'A pergunta do usuário é: "{mention.text}". Busque contexto.'
-    #         final_response = crew.kickoff()
-            
-    #         print(f"Resposta gerada: {final_response}")
-    #         # client.post_reply(final_response, mention.id)
-            
-    #         last_processed_id = mention.id
-        
-    #     print("Aguardando 60 segundos para a próxima verificação...")
-    #     time.sleep(60)
+    # O loop de menções do Twitter roda como um daemon separado, com checkpoint
+    # persistido do since_id: `python -m src.pipeline.daemon` (veja o README).
 
     # Exemplo de execução com uma pergunta
     print("\n--- Exemplo de Interação (Execução Única) ---")
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional
+
+
+DEFAULT_PIPELINE_DB = Path(__file__).parents[2] / "data" / "pipeline.sqlite"
+
+
+def pipeline_db_path() -> Path:
+    """Banco SQLite do pipeline de menções (`PIPELINE_DB_PATH`, padrão `data/pipeline.sqlite`)."""
+    return Path(os.getenv("PIPELINE_DB_PATH") or DEFAULT_PIPELINE_DB)
+
+
+class Checkpoint:
+    """Checkpoints nomeados (ex.: `since_id` das menções) gravados em SQLite/WAL.
+
+    Cada `set` é uma transação confirmada: após um crash, o processo retoma do último
+    valor gravado.
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "name TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, name: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM checkpoints WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, name: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (name, value, updated_at) VALUES (?, ?, ?)",
+                (name, str(value), time.time()),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class Watermark:
+    """Marca d'água de ids processados fora de ordem (vários workers).
+
+    Os ids são registrados em ordem crescente (`track`) e concluídos em qualquer ordem
+    (`done`). O checkpoint só avança até o maior id cujo prefixo inteiro já terminou,
+    então um crash nunca pula uma menção que ainda estava na fila ou em andamento.
+    """
+
+    def __init__(self, on_advance: Callable[[str], None]):
+        self._on_advance = on_advance
+        self._lock = threading.Lock()
+        self._pending: "OrderedDict[str, bool]" = OrderedDict()
+
+    def track(self, key: str) -> None:
+        with self._lock:
+            self._pending.setdefault(key, False)
+
+    def discard(self, key: str) -> None:
+        """Esquece um id registrado que não será processado agora (ex.: adiado)."""
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def done(self, key: str) -> None:
+        with self._lock:
+            if key not in self._pending:
+                return
+            self._pending[key] = True
+            last = None
+            while self._pending and next(iter(self._pending.values())):
+                last, _ = self._pending.popitem(last=False)
+            if last is not None:
+                # Dentro do lock: gravações do checkpoint nunca regridem
+                self._on_advance(last)
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return key in self._pending
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
@@ -0,0 +1,222 @@
+"""Contexto de conversa das menções (autor, tweet respondido, thread) para a Crew.
+
+Em vez de um lookup por menção, `ContextResolver.resolve(mentions)` junta os ids que
+faltam de todo o lote e faz uma chamada por página de até 100 ids (`GET /2/tweets` com a
+expansão `author_id`, que já traz os autores; `GET /2/users` só para quem sobrar), subindo
+a thread um nível por vez. Tweets e usuários ficam num `LRUCache` com TTL: menções da
+mesma conversa ou do mesmo autor não voltam à API.
+
+`stats()` compara as chamadas feitas com as de uma busca ingênua (uma por objeto por
+menção) e reporta as chamadas economizadas por menção.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from src.twitter.client import MENTION_FIELDS, Mention, replied_to_id
+from src.utils.lru import LRUCache
+
+
+# Tamanho máximo de cada trecho de tweet no prompt
+MAX_TEXT_CHARS = 280
+
+
+def context_settings() -> dict:
+    """`CONTEXT_CACHE_TTL` (s), `CONTEXT_CACHE_MAX_ITEMS` e `CONTEXT_MAX_DEPTH` (níveis da thread)."""
+    return {
+        "ttl": float(os.getenv("CONTEXT_CACHE_TTL", "600")),
+        "max_items": int(os.getenv("CONTEXT_CACHE_MAX_ITEMS", "10000")),
+        "max_depth": int(os.getenv("CONTEXT_MAX_DEPTH", "3")),
+    }
+
+
+def _tweet_record(tweet: Any) -> Dict[str, Any]:
+    return {
+        "id": str(tweet.id),
+        "text": getattr(tweet, "text", "") or "",
+        "author_id": str(tweet.author_id) if getattr(tweet, "author_id", None) else None,
+        "conversation_id": str(tweet.conversation_id) if getattr(tweet, "conversation_id", None) else None,
+        "in_reply_to_id": replied_to_id(tweet),
+    }
+
+
+def _user_record(user: Any) -> Dict[str, Any]:
+    metrics = getattr(user, "public_metrics", None) or {}
+    return {
+        "id": str(user.id),
+        "username": getattr(user, "username", None),
+        "name": getattr(user, "name", None),
+        "followers": metrics.get("followers_count"),
+    }
+
+
+@dataclass
+class MentionContext:
+    """Autor da menção e a thread acima dela (do tweet mais antigo ao respondido)."""
+
+    mention_id: str
+    author: Optional[Dict[str, Any]] = None
+    thread: List[Dict[str, Any]] = field(default_factory=list)
+    users: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def _handle(self, user_id: Optional[str]) -> str:
+        user = self.users.get(user_id or "")
+        return f"@{user['username']}" if user and user.get("username") else "alguém"
+
+    def lines(self) -> List[str]:
+        """Trechos de contexto no formato dos snippets do RAG (um por linha do prompt)."""
+        out: List[str] = []
+        if self.author and self.author.get("username"):
+            followers = self.author.get("followers")
+            extra = f" ({followers} seguidores)" if followers is not None else ""
+            out.append(f"Menção enviada por @{self.author['username']}{extra}")
+        for i, tweet in enumerate(self.thread):
+            label = "Tweet respondido" if i == len(self.thread) - 1 else "Tweet anterior da conversa"
+            out.append(f"{label} ({self._handle(tweet.get('author_id'))}): {tweet['text'][:MAX_TEXT_CHARS]}")
+        return out
+
+
+class ContextResolver:
+    """Resolve em lote o contexto de menções, com cache LRU/TTL de tweets e usuários.
+
+    `client` precisa de `lookup_tweets(ids, **params)` e `lookup_users(ids, **params)`
+    (ex.: `TwitterClient`), cada um retornando uma resposta da API por lote de ids.
+    `max_depth` limita quantos tweets acima da menção são buscados; a raiz da conversa
+    entra sempre que a menção estiver numa thread.
+    """
+
+    def __init__(self, client: Any, ttl: float = 600.0, max_items: int = 10_000, max_depth: int = 3):
+        self.client = client
+        self.max_depth = max_depth
+        self.tweets: LRUCache[Dict[str, Any]] = LRUCache(max_items=max_items, ttl=ttl)
+        self.users: LRUCache[Dict[str, Any]] = LRUCache(max_items=max_items, ttl=ttl)
+        self._contexts: LRUCache[MentionContext] = LRUCache(max_items=max_items, ttl=ttl)
+        self._lock = threading.Lock()
+        self.mentions = 0
+        self.api_calls = 0
+        self.naive_calls = 0
+        self.errors = 0
+
+    def _count(self, responses: List[Any]) -> List[Any]:
+        with self._lock:
+            self.api_calls += len(responses)
+        return responses
+
+    def _fetch_tweets(self, ids: Iterable[Optional[str]]) -> None:
+        missing = sorted({i for i in ids if i and self.tweets.get(i) is None})
+        if not missing:
+            return
+        responses = self._count(self.client.lookup_tweets(
+            missing,
+            tweet_fields=MENTION_FIELDS,
+            expansions=["author_id"],
+            user_fields=["public_metrics"],
+        ))
+        for resp in responses:
+            for tweet in getattr(resp, "data", None) or []:
+                self.tweets.set(str(tweet.id), _tweet_record(tweet))
+            for user in (getattr(resp, "includes", None) or {}).get("users", []):
+                self.users.set(str(user.id), _user_record(user))
+
+    def _fetch_users(self, ids: Iterable[Optional[str]]) -> None:
+        missing = sorted({i for i in ids if i and self.users.get(i) is None})
+        if not missing:
+            return
+        for resp in self._count(self.client.lookup_users(missing, user_fields=["public_metrics"])):
+            for user in getattr(resp, "data", None) or []:
+                self.users.set(str(user.id), _user_record(user))
+
+    def resolve(self, mentions: List[Mention]) -> Dict[str, MentionContext]:
+        """Busca (em lote) o que falta no cache e retorna o contexto de cada menção, por id."""
+        for m in mentions:
+            # O timeline de menções já expande o autor: não precisa de lookup
+            if m.author_id and m.author_username:
+                self.users.set(m.author_id, {
+                    "id": m.author_id, "username": m.author_username, "name": None, "followers": m.author_followers,
+                })
+
+        roots = {
+            m.id: m.conversation_id for m in mentions
+            if m.in_reply_to_id and m.conversation_id and m.conversation_id != m.id
+        }
+        chains: Dict[str, List[Dict[str, Any]]] = {m.id: [] for m in mentions}
+        cursors = {m.id: m.in_reply_to_id for m in mentions if m.in_reply_to_id}
+        # Um lote por nível da thread; a raiz vai junto com o primeiro nível
+        self._fetch_tweets(list(cursors.values()) + list(roots.values()))
+        for depth in range(self.max_depth):
+            if depth:
+                self._fetch_tweets(cursors.values())
+            advanced = {}
+            for mention_id, tweet_id in cursors.items():
+                tweet = self.tweets.get(tweet_id)
+                if tweet is None:
+                    continue  # apagado ou protegido
+                chains[mention_id].append(tweet)
+                parent = tweet.get("in_reply_to_id")
+                if parent and parent != roots.get(mention_id):
+                    advanced[mention_id] = parent
+            cursors = advanced
+            if not cursors:
+                break
+
+        contexts: Dict[str, MentionContext] = {}
+        for m in mentions:
+            thread = list(reversed(chains[m.id]))
+            root = self.tweets.get(roots[m.id]) if m.id in roots else None
+            if root is not None and all(t["id"] != root["id"] for t in thread):
+                thread.insert(0, root)
+            contexts[m.id] = MentionContext(m.id, thread=thread)
+
+        self._fetch_users(
+            [m.author_id for m in mentions]
+            + [t.get("author_id") for ctx in contexts.values() for t in ctx.thread]
+        )
+        naive = 0
+        for m in mentions:
+            ctx = contexts[m.id]
+            author_ids: Set[str] = {t["author_id"] for t in ctx.thread if t.get("author_id")}
+            if m.author_id:
+                ctx.author = self.users.get(m.author_id)
+                author_ids.add(m.author_id)
+            ctx.users = {uid: user for uid in author_ids if (user := self.users.get(uid)) is not None}
+            # Busca ingênua, menção a menção: um GET por tweet da thread (que já expande o
+            # autor) e um pelo autor da menção só se ele não veio na expansão do timeline
+            naive += len(ctx.thread) + (1 if m.author_id and not m.author_username else 0)
+            self._contexts.set(m.id, ctx)
+        with self._lock:
+            self.mentions += len(mentions)
+            self.naive_calls += naive
+        return contexts
+
+    def context_for(self, mention: Mention) -> MentionContext:
+        """Contexto já resolvido da menção; sem ele (ex.: chegou por push), resolve só ela."""
+        ctx = self._contexts.get(mention.id)
+        if ctx is not None:
+            return ctx
+        try:
+            return self.resolve([mention])[mention.id]
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            print(f"Falha ao buscar o contexto da menção {mention.id}: {e}")
+            return MentionContext(mention.id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            mentions, api_calls, naive = self.mentions, self.api_calls, self.naive_calls
+            errors = self.errors
+        return {
+            "mentions": mentions,
+            "api_calls": api_calls,
+            "naive_calls": naive,
+            "saved_calls": naive - api_calls,
+            "saved_per_mention": round((naive - api_calls) / mentions, 2) if mentions else 0.0,
+            "errors": errors,
+            "cached_tweets": len(self.tweets),
+            "cached_users": len(self.users),
+            "tweet_hits": self.tweets.hits,
+            "user_hits": self.users.hits,
+        }
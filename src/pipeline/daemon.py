@@ -0,0 +1,588 @@
+"""Daemon de ingestão de menções do Twitter.
+
+Busca menções de forma incremental a partir de um `since_id` persistido (SQLite/WAL),
+responde da mais antiga para a mais nova e avança o checkpoint após cada menção. Um
+reinício retoma exatamente de onde parou, sem rebuscar nem responder de novo o backlog.
+
+Com `--workers N`, o fetcher alimenta uma fila limitada e N workers executam a Crew em
+paralelo; o checkpoint segue a marca d'água das menções concluídas. As respostas vão
+para um outbox durável (`src/pipeline/outbox.py`), drenado por um sender em segundo plano.
+Menções já tratadas (ex.: após perda do checkpoint) e tweets do próprio bot são descartados
+pelo índice de ids vistos (`src/pipeline/seen.py`) antes de qualquer trabalho da Crew.
+Cada resposta sai após um atraso "humano" aleatório (2–15 min), agendado no outbox.
+O contexto de cada menção (autor, tweet respondido, thread) é buscado em lote por poll
+e guardado em cache (`src/pipeline/context.py`) antes de ir para a Crew.
+
+Com `--precompute`, os tweets autônomos das personas são pré-gerados em segundo plano
+(`src/pipeline/precompute.py`) só na janela ociosa e com a fila de menções vazia.
+
+Com `--webhook-port`, o daemon também serve `src/web/app.py` (UI + webhook da Account
+Activity API em `/webhooks/twitter`): menções chegam por push e o polling passa a ser só
+reconciliação (`--reconcile-interval`), voltando ao intervalo normal se o webhook silenciar.
+
+Com `--async`, o polling e os lookups de contexto passam pelo `AsyncTwitterClient`
+(`src/twitter/async_client.py`): um event loop e uma sessão keep-alive para o fetcher e
+todos os workers. As respostas continuam saindo pelo outbox com o cliente síncrono.
+
+Uso:
+    python -m src.pipeline.daemon [--interval 60] [--workers 4] [--queue-size 100]
+                                  [--queue-policy block|drop|defer] [--priority fifo|score]
+                                  [--webhook-port 8000] [--reconcile-interval 900] [--precompute]
+                                  [--once] [--dry-run] [--no-delay] [--backfill] [--async]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import signal
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from src.pipeline.checkpoint import Checkpoint, Watermark, pipeline_db_path
+from src.pipeline.context import ContextResolver, context_settings
+from src.pipeline.delay import humanized_delay
+from src.pipeline.outbox import Outbox, OutboxSender
+from src.pipeline.priority import PRIORITY_MODES, MentionScorer, priority_class, priority_settings
+from src.pipeline.seen import SeenIndex, seen_index_settings
+from src.pipeline.workers import DEFERRED, DROPPED, QUEUE_POLICIES, QUEUED, WorkerPool
+from src.twitter.client import Mention, TwitterClient
+
+
+CHECKPOINT_NAME = "mentions.since_id"
+_LEADING_HANDLES = re.compile(r"^(?:@\w+\s*)+")
+
+
+def strip_mentions(text: str) -> str:
+    """Remove os @handles iniciais que o Twitter insere em respostas."""
+    return _LEADING_HANDLES.sub("", text).strip()
+
+
+def make_reply_handler(
+    client: TwitterClient,
+    dry_run: bool = False,
+    outbox: Optional[Outbox] = None,
+    on_enqueue: Optional[Callable[[str, float], None]] = None,
+    delay: Optional[Callable[[], float]] = None,
+    resolver: Optional[ContextResolver] = None,
+) -> Callable[[Mention], Optional[str]]:
+    """Handler padrão: filtro de segurança -> resposta da persona -> reply no Twitter.
+
+    Com `outbox`, a resposta é gravada na caixa de saída durável (enviada pelo
+    `OutboxSender`) em vez de postada no caminho de processamento. `delay()` sorteia o
+    atraso "humano" de cada resposta, que fica agendada no outbox (o worker segue livre);
+    `on_enqueue(in_reply_to, due_at)` avisa o sender do novo prazo. Com `resolver`, o
+    autor e a thread da menção vão para a Crew junto com o contexto do RAG.
+    """
+    from src.service.personabot_service import is_safe_to_respond, run_single_interaction
+
+    def handle(mention: Mention) -> Optional[str]:
+        if outbox is not None and mention.id in outbox:
+            return None  # resposta já gerada antes de um reinício
+        question = strip_mentions(mention.text)
+        if not question or not is_safe_to_respond(question):
+            print(f"Menção {mention.id} ignorada pelo filtro de segurança.")
+            return None
+        extra = resolver.context_for(mention).lines() if resolver is not None else None
+        answer = run_single_interaction(question, extra_context=extra)
+        if dry_run:
+            print(f"[dry-run] resposta para {mention.id}: {answer}")
+        elif outbox is not None:
+            wait = delay() if delay is not None else 0.0
+            outbox.enqueue(mention.id, answer, delay=wait)
+            if on_enqueue is not None:
+                on_enqueue(mention.id, time.time() + wait)
+        else:
+            client.post_reply(answer, mention.id)
+        return answer
+
+    return handle
+
+
+class MentionDaemon:
+    """Laço de polling com checkpoint durável.
+
+    - O checkpoint só avança depois que a menção foi tratada; um crash no meio do
+      processamento faz a menção ser buscada de novo no reinício.
+    - Se o handler falhar, o lote é interrompido e a menção é retentada no próximo poll;
+      após `max_attempts` falhas seguidas ela é descartada para não travar a fila.
+    - Sem checkpoint (primeira execução), apenas marca a menção mais recente como ponto
+      de partida, a menos que `backfill=True`.
+
+    Com `workers > 0` as menções vão para um `WorkerPool` (fila de `max_queue` itens) e
+    a política `queue_policy` define a pressão de retorno quando a fila enche: `block`
+    (o fetcher espera), `drop` (descarta e conta) ou `defer` (para o lote; as menções
+    não aceitas continuam além do checkpoint e voltam no próximo poll).
+
+    Com `seen`, menções já concluídas são descartadas antes do handler (contadas em
+    `duplicates`) e cada menção concluída é registrada no índice; tweets de
+    `bot_user_id` nunca são respondidos (`own_tweets`), evitando loops.
+
+    Com `priority` (ex.: `MentionScorer`), a fila dos workers é ordenada pela pontuação
+    de cada menção, com envelhecimento `priority_aging` contra inanição; a espera por
+    classe de prioridade aparece em `stats()["pool"]["priority"]`.
+
+    Menções também podem chegar por push (`ingest`, chamado pelo webhook): vão direto
+    para o pool, sem mexer no checkpoint, que continua sendo avançado só pelo polling.
+    Enquanto o webhook dá sinal de vida (nos últimos `push_stale_after` segundos), o
+    polling vira reconciliação a cada `reconcile_interval`: recupera o que o webhook
+    perdeu (`gap_recovered`) e descarta pelo índice `seen` o que já foi respondido.
+
+    Com `resolver`, o contexto das menções de cada poll é buscado num lote só antes do
+    despacho; o handler o encontra no cache (menções por push resolvem uma a uma).
+
+    Com `dry_run`, o progresso (checkpoint e menções vistas) fica só em memória: um
+    teste contra o banco de produção não consome as menções da próxima execução real.
+    """
+
+    def __init__(
+        self,
+        client: TwitterClient,
+        handler: Callable[[Mention], Any],
+        checkpoint: Checkpoint,
+        poll_interval: float = 60.0,
+        max_attempts: int = 3,
+        backfill: bool = False,
+        checkpoint_name: str = CHECKPOINT_NAME,
+        workers: int = 0,
+        max_queue: int = 100,
+        queue_policy: str = "block",
+        seen: Optional[SeenIndex] = None,
+        bot_user_id: Optional[str] = None,
+        priority: Optional[Callable[[Mention], float]] = None,
+        priority_aging: float = 0.0,
+        reconcile_interval: Optional[float] = None,
+        push_stale_after: float = 300.0,
+        resolver: Optional[ContextResolver] = None,
+        dry_run: bool = False,
+    ):
+        self.client = client
+        self.handler = handler
+        self.checkpoint = checkpoint
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backfill = backfill
+        self.checkpoint_name = checkpoint_name
+        self.seen = seen
+        self.bot_user_id = str(bot_user_id) if bot_user_id is not None else None
+        self.priority = priority
+        self.reconcile_interval = reconcile_interval
+        self.push_stale_after = push_stale_after
+        self.resolver = resolver
+        self.dry_run = dry_run
+        # Dry-run: progresso só em memória, o checkpoint e o índice `seen` persistidos não mudam
+        self._dry_since_id: Optional[str] = None
+        self._dry_seen: set[str] = set()
+        self.stop_event = threading.Event()
+        self._wake = threading.Event()
+        self._pushed: set[str] = set()
+        self._failures: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.polls = 0
+        self.fetched = 0
+        self.processed = 0
+        self.failed = 0
+        self.gave_up = 0  # menções abandonadas após `max_attempts`
+        self.dropped = 0  # descartadas pela fila cheia (`MENTION_QUEUE_POLICY=drop`)
+        self.duplicates = 0
+        self.own_tweets = 0
+        self.pushed = 0
+        self.gap_recovered = 0
+        self.last_poll_at: Optional[float] = None
+        self.last_push_at: Optional[float] = None
+        self.pool: Optional[WorkerPool] = None
+        self.watermark: Optional[Watermark] = None
+        if workers > 0:
+            self.watermark = Watermark(self._advance)
+            self.pool = WorkerPool(
+                handler,
+                workers=workers,
+                max_queue=max_queue,
+                policy=queue_policy,
+                max_attempts=max_attempts,
+                on_done=self._on_done,
+                name="mention-worker",
+                priority=priority,
+                aging=priority_aging,
+                classify=priority_class,
+            )
+
+    @property
+    def since_id(self) -> Optional[str]:
+        if self.dry_run and self._dry_since_id is not None:
+            return self._dry_since_id
+        return self.checkpoint.get(self.checkpoint_name)
+
+    def _advance(self, mention_id: str) -> None:
+        if self.dry_run:
+            self._dry_since_id = mention_id
+        else:
+            self.checkpoint.set(self.checkpoint_name, mention_id)
+
+    def _skip(self, mention: Mention, count: bool = True) -> bool:
+        """True para tweets do próprio bot e menções que já foram tratadas."""
+        if self.bot_user_id is not None and mention.author_id == self.bot_user_id:
+            if count:
+                self.own_tweets += 1
+            return True
+        if mention.id in self._dry_seen or (self.seen is not None and mention.id in self.seen):
+            if count:
+                self.duplicates += 1
+            return True
+        return False
+
+    def _mark_seen(self, mention: Mention) -> None:
+        if self.dry_run:
+            self._dry_seen.add(mention.id)
+        elif self.seen is not None:
+            self.seen.add(mention.id)
+
+    def run_once(self) -> int:
+        """Um ciclo de polling; retorna quantas menções foram tratadas (ou enfileiradas, com workers)."""
+        since_id = self.since_id
+        self.polls += 1
+        self.last_poll_at = time.time()
+        mentions = self.client.get_recent_mentions(since_id)
+        self.fetched += len(mentions)
+
+        if since_id is None and not self.backfill:
+            if mentions:
+                self._advance(mentions[-1].id)
+                print(f"Checkpoint inicial em {mentions[-1].id}; menções anteriores não serão respondidas.")
+            return 0
+
+        if self.resolver is not None and mentions:
+            try:
+                self.resolver.resolve([m for m in mentions if not self._skip(m, count=False)])
+            except Exception as e:
+                # Sem contexto a menção ainda é respondida; o handler tenta de novo sozinho
+                print(f"Erro ao buscar o contexto das menções: {e}")
+
+        if self.pool is not None:
+            return self._dispatch(mentions)
+
+        handled = 0
+        for mention in mentions:
+            if self.stop_event.is_set():
+                break
+            if self._skip(mention):
+                self._advance(mention.id)
+                continue
+            try:
+                self.handler(mention)
+            except Exception as e:
+                self.failed += 1
+                attempts = self._failures.get(mention.id, 0) + 1
+                self._failures[mention.id] = attempts
+                if attempts < self.max_attempts:
+                    print(f"Erro ao processar menção {mention.id} (tentativa {attempts}): {e}")
+                    break
+                print(f"Menção {mention.id} descartada após {attempts} tentativas: {e}")
+                self.gave_up += 1
+            else:
+                self.processed += 1
+                handled += 1
+            self._mark_seen(mention)
+            self._failures.pop(mention.id, None)
+            self._advance(mention.id)
+        return handled
+
+    def _dispatch(self, mentions: list[Mention]) -> int:
+        """Enfileira as menções no pool; retorna quantas foram aceitas."""
+        self.pool.start()
+        queued = 0
+        for mention in mentions:
+            if self.stop_event.is_set():
+                break
+            if mention.id in self.watermark:
+                continue  # já na fila ou em andamento (poll anterior)
+            with self._lock:
+                self.watermark.track(mention.id)
+                pushed = mention.id in self._pushed
+            if pushed:
+                continue  # chegou pelo webhook e está em andamento; `_on_done` libera o checkpoint
+            if self._skip(mention):
+                self.watermark.done(mention.id)
+                continue
+            if self.push_active:
+                self.gap_recovered += 1  # o webhook está vivo, mas não entregou esta menção
+            status = self.pool.submit(mention)
+            if status == DROPPED:
+                self.dropped += 1
+                self.watermark.done(mention.id)
+            elif status == DEFERRED:
+                # Fila cheia: esta e as seguintes ficam para o próximo poll
+                self.watermark.discard(mention.id)
+                break
+            else:
+                queued += 1
+        return queued
+
+    def _on_done(self, mention: Mention, ok: bool) -> None:
+        # Chamado pelos workers: falha definitiva (após as tentativas) também libera o checkpoint
+        if ok and hasattr(self.priority, "note_handled"):
+            self.priority.note_handled(mention)  # thread ativa ganha prioridade
+        with self._lock:
+            if ok:
+                self.processed += 1
+            else:
+                self.failed += 1
+                self.gave_up += 1
+            self._mark_seen(mention)
+            self._pushed.discard(mention.id)
+        self.watermark.done(mention.id)
+
+    @property
+    def idle(self) -> bool:
+        """True sem menções na fila nem em processamento (no modo serial, sempre)."""
+        return self.pool is None or self.pool.idle
+
+    @property
+    def push_active(self) -> bool:
+        """True se o webhook deu sinal de vida nos últimos `push_stale_after` segundos."""
+        return self.last_push_at is not None and time.time() - self.last_push_at < self.push_stale_after
+
+    def ingest(self, mentions: list[Mention]) -> int:
+        """Entrada por push (webhook): enfileira as menções novas; retorna quantas aceitou.
+
+        Nunca bloqueia (o webhook precisa responder rápido): com a fila cheia, ou sem
+        pool/índice `seen` para deduplicar contra o polling, só antecipa o próximo poll.
+        """
+        self.last_push_at = time.time()
+        if not mentions:
+            return 0
+        if self.pool is None or self.seen is None:
+            self.wake()
+            return 0
+        self.pool.start()
+        accepted = 0
+        for mention in sorted(mentions, key=lambda m: int(m.id)):
+            with self._lock:
+                if mention.id in self._pushed or mention.id in self.watermark:
+                    continue
+                self._pushed.add(mention.id)
+            if self._skip(mention):
+                with self._lock:
+                    self._pushed.discard(mention.id)
+                continue
+            if self.pool.submit(mention, timeout=0) != QUEUED:
+                with self._lock:
+                    self._pushed.discard(mention.id)
+                self.wake()  # o polling pega a menção quando houver espaço
+                continue
+            accepted += 1
+        with self._lock:
+            self.pushed += accepted
+        return accepted
+
+    def wake(self) -> None:
+        """Antecipa o próximo ciclo de polling."""
+        self._wake.set()
+
+    def next_interval(self) -> float:
+        if self.reconcile_interval is not None and self.push_active:
+            return self.reconcile_interval
+        return self.poll_interval
+
+    def drain(self) -> None:
+        """Aguarda a fila do pool esvaziar (no modo serial não há o que esperar)."""
+        if self.pool is not None:
+            self.pool.join()
+
+    def run_forever(self) -> None:
+        print(f"Daemon de menções iniciado (intervalo {self.poll_interval:.0f}s, since_id={self.since_id}).")
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    self.run_once()
+                except Exception as e:
+                    # Falha de rede/API: o checkpoint não mudou, o próximo ciclo tenta de novo
+                    print(f"Erro no polling de menções: {e}")
+                self._wake.wait(self.next_interval())
+                self._wake.clear()
+        finally:
+            if self.pool is not None:
+                # Menções ainda na fila não avançam o checkpoint: voltam após o reinício
+                self.pool.close(drain=False)
+        print("Daemon de menções encerrado.")
+
+    def stop(self, *_: Any) -> None:
+        self.stop_event.set()
+        self._wake.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "since_id": self.since_id,
+            "polls": self.polls,
+            "fetched": self.fetched,
+            "processed": self.processed,
+            "failed": self.failed,
+            "gave_up": self.gave_up,
+            "dropped": self.dropped,
+            "duplicates": self.duplicates,
+            "own_tweets": self.own_tweets,
+            "pushed": self.pushed,
+            "gap_recovered": self.gap_recovered,
+            "push_active": self.push_active,
+            "seen": self.seen.stats() if self.seen is not None else None,
+            "last_poll_at": self.last_poll_at,
+            "inflight": len(self.watermark) if self.watermark is not None else 0,
+            "pool": self.pool.stats() if self.pool is not None else None,
+            "context": self.resolver.stats() if self.resolver is not None else None,
+        }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Daemon de ingestão e resposta de menções do Twitter.")
+    parser.add_argument(
+        "--interval", type=float, default=float(os.getenv("MENTION_POLL_INTERVAL", "60")),
+        help="segundos entre buscas (MENTION_POLL_INTERVAL)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("MENTION_WORKERS", "4")),
+        help="workers executando a Crew em paralelo; 0 = serial (MENTION_WORKERS)",
+    )
+    parser.add_argument(
+        "--queue-size", type=int, default=int(os.getenv("MENTION_QUEUE_SIZE", "100")),
+        help="capacidade da fila entre o fetcher e os workers (MENTION_QUEUE_SIZE)",
+    )
+    parser.add_argument(
+        "--queue-policy", choices=QUEUE_POLICIES, default=os.getenv("MENTION_QUEUE_POLICY", "block"),
+        help="fila cheia: block, drop ou defer (MENTION_QUEUE_POLICY)",
+    )
+    priority = priority_settings()
+    parser.add_argument(
+        "--priority", choices=PRIORITY_MODES, default=priority["mode"],
+        help="ordem da fila dos workers: fifo ou score (MENTION_PRIORITY)",
+    )
+    parser.add_argument(
+        "--priority-aging", type=float, default=priority["aging"],
+        help="pontos de prioridade ganhos por segundo de espera (MENTION_PRIORITY_AGING)",
+    )
+    parser.add_argument(
+        "--webhook-port", type=int, default=int(os.getenv("MENTION_WEBHOOK_PORT", "0")),
+        help="serve a app web com o webhook nesta porta; 0 = só polling (MENTION_WEBHOOK_PORT)",
+    )
+    parser.add_argument(
+        "--reconcile-interval", type=float, default=float(os.getenv("MENTION_RECONCILE_INTERVAL", "900")),
+        help="intervalo do polling de reconciliação com o webhook ativo (MENTION_RECONCILE_INTERVAL)",
+    )
+    parser.add_argument(
+        "--precompute", action="store_true",
+        default=os.getenv("PRECOMPUTE_POSTS", "false").strip().lower() in ("1", "true", "yes"),
+        help="pré-gera os tweets autônomos na janela ociosa, com a fila vazia (PRECOMPUTE_POSTS)",
+    )
+    parser.add_argument(
+        "--async", dest="use_async", action="store_true",
+        default=os.getenv("MENTION_ASYNC_CLIENT", "false").strip().lower() in ("1", "true", "yes"),
+        help="polling e lookups de contexto pelo cliente assíncrono (MENTION_ASYNC_CLIENT; requer tweepy[async]>=4.10)",
+    )
+    parser.add_argument("--db", default=None, help="SQLite do pipeline (PIPELINE_DB_PATH)")
+    parser.add_argument("--once", action="store_true", help="executa um único ciclo e sai")
+    parser.add_argument("--dry-run", action="store_true", help="gera respostas sem postar nem avançar o checkpoint")
+    parser.add_argument(
+        "--no-delay", action="store_true",
+        help="posta sem o atraso humano (REPLY_DELAY_MIN_S/REPLY_DELAY_MAX_S, padrão 2–15 min)",
+    )
+    parser.add_argument("--backfill", action="store_true", help="sem checkpoint, responde as menções recentes")
+    args = parser.parse_args(argv)
+
+    client = TwitterClient()
+    if client.api_v2 is None:
+        return 1
+    db_path = args.db or pipeline_db_path()
+    # Leituras (menções e contexto) num event loop; posts seguem pelo cliente síncrono
+    reader = client
+    if args.use_async:
+        from src.twitter.async_client import AsyncClientThread
+
+        reader = AsyncClientThread(scheduler=client.scheduler)
+    resolver = ContextResolver(reader, **context_settings())
+    # Respostas vão para o outbox durável; o sender posta em lotes, com retentativas
+    outbox = Outbox(db_path)
+    # Dry-run não posta nada, nem respostas pendentes de execuções anteriores
+    sender = OutboxSender(outbox, client.submit_reply) if not args.dry_run else None
+    daemon = MentionDaemon(
+        reader,
+        make_reply_handler(
+            client,
+            dry_run=args.dry_run,
+            outbox=outbox,
+            on_enqueue=sender.schedule if sender is not None else None,
+            delay=None if args.no_delay else humanized_delay,
+            resolver=resolver,
+        ),
+        Checkpoint(db_path),
+        poll_interval=args.interval,
+        backfill=args.backfill,
+        workers=args.workers,
+        max_queue=args.queue_size,
+        queue_policy=args.queue_policy,
+        seen=SeenIndex(db_path, **seen_index_settings()),
+        bot_user_id=client.user_id,
+        priority=MentionScorer() if args.priority == "score" else None,
+        priority_aging=args.priority_aging,
+        reconcile_interval=args.reconcile_interval if args.webhook_port else None,
+        resolver=resolver,
+        dry_run=args.dry_run,
+    )
+    if args.once:
+        daemon.run_once()
+        daemon.drain()
+        if sender is not None:
+            while sender.flush():
+                pass
+            print(sender.stats())
+        print(daemon.stats())
+        if reader is not client:
+            reader.close()
+        return 0
+    server = None
+    if args.webhook_port:
+        from src.twitter.webhook import get_webhook_hub
+        from src.web.app import app
+        from src.web.server import ServerThread
+
+        get_webhook_hub().register(daemon.ingest, bot_user_id=daemon.bot_user_id)
+        server = ServerThread(app, host="0.0.0.0", port=args.webhook_port, name="webhook").start()
+        print(f"Webhook de menções em {server.url}/webhooks/twitter")
+    precompute = None
+    if args.precompute:
+        from src.agents.agent_manager import llm_settings
+        from src.config_loader import load_all_personas
+        from src.pipeline.precompute import PostQueue, PrecomputeJob, in_window, precompute_settings
+
+        settings = precompute_settings()
+        # Só gera com o LLM livre: dentro da janela e sem menções esperando resposta
+        precompute = PrecomputeJob(
+            PostQueue(db_path),
+            load_all_personas(),
+            per_persona=settings["per_persona"],
+            idle=lambda: in_window(settings["hours"]) and daemon.idle,
+            model=llm_settings()["model"],
+        )
+        threading.Thread(
+            target=precompute.run_forever, args=(settings["interval"],), name="precompute", daemon=True
+        ).start()
+    signal.signal(signal.SIGINT, daemon.stop)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    if sender is not None:
+        sender.start()
+    try:
+        daemon.run_forever()
+    finally:
+        if precompute is not None:
+            precompute.stop()
+        if sender is not None:
+            sender.stop(timeout=30)
+        if server is not None:
+            server.stop()
+        if reader is not client:
+            reader.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
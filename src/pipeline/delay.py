@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import heapq
+import os
+import random
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+
+def reply_delay_range() -> Tuple[float, float]:
+    """Atraso "humano" das respostas em segundos (`REPLY_DELAY_MIN_S`/`REPLY_DELAY_MAX_S`, padrão 2–15 min)."""
+    low = float(os.getenv("REPLY_DELAY_MIN_S", "120"))
+    high = float(os.getenv("REPLY_DELAY_MAX_S", "900"))
+    return (min(low, high), max(low, high))
+
+
+def humanized_delay(low: Optional[float] = None, high: Optional[float] = None) -> float:
+    """Sorteia o atraso de uma resposta; 0 quando o intervalo é [0, 0]."""
+    if low is None or high is None:
+        low, high = reply_delay_range()
+    return random.uniform(low, high) if high > 0 else 0.0
+
+
+class TimerHeap:
+    """Min-heap de prazos (`due_at`, chave) para despacho atrasado.
+
+    Guardar milhares de respostas pendentes custa uma tupla cada; agendar e liberar são
+    O(log n) e quem consome dorme até `next_due()` em vez de uma thread por resposta.
+    Reagendar uma chave deixa a entrada antiga no heap (remoção preguiçosa): ela é
+    ignorada ao sair se não for mais o prazo vigente.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._heap: List[Tuple[float, str]] = []
+        self._due: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def schedule(self, key: str, due_at: float) -> None:
+        with self._lock:
+            self._due[key] = due_at
+            heapq.heappush(self._heap, (due_at, key))
+
+    def cancel(self, key: str) -> None:
+        with self._lock:
+            self._due.pop(key, None)
+
+    def _prune(self) -> None:
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def next_due(self) -> Optional[float]:
+        with self._lock:
+            self._prune()
+            return self._heap[0][0] if self._heap else None
+
+    def wait_time(self, default: Optional[float] = None) -> Optional[float]:
+        """Segundos até o próximo prazo (0 = já vencido; `default` com o heap vazio)."""
+        due = self.next_due()
+        if due is None:
+            return default
+        return max(0.0, due - self._clock())
+
+    def pop_due(self, now: Optional[float] = None) -> List[str]:
+        """Remove e retorna as chaves vencidas até `now` (padrão: agora), em ordem de prazo."""
+        now = self._clock() if now is None else now
+        released = []
+        with self._lock:
+            while self._heap:
+                self._prune()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                _, key = heapq.heappop(self._heap)
+                del self._due[key]
+                released.append(key)
+        return released
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._due)
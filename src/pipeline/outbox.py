@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.pipeline.delay import TimerHeap
+from src.utils.metrics import Histogram
+
+
+PENDING, SENDING, SENT, FAILED = "pending", "sending", "sent", "failed"
+# Erros HTTP que não adianta retentar (conteúdo/permissão); 429 e 5xx são retentados
+PERMANENT_STATUS = (400, 401, 403, 404)
+
+
+def backoff_delay(attempt: int, base: float = 2.0, max_delay: float = 300.0) -> float:
+    """Backoff exponencial com jitter completo: uniforme em [0, min(max, base * 2^(n-1))]."""
+    return random.uniform(0, min(max_delay, base * (2 ** max(0, attempt - 1))))
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    return getattr(getattr(error, "response", None), "status_code", None)
+
+
+def _is_duplicate(error: BaseException) -> bool:
+    # O Twitter recusa status idênticos: a resposta já foi postada antes de um crash
+    return _status_code(error) == 403 and "duplicate" in str(error).lower()
+
+
+class Outbox:
+    """Caixa de saída durável de respostas (SQLite/WAL).
+
+    A chave de idempotência é o `in_reply_to_tweet_id`: enfileirar de novo a resposta
+    para a mesma menção (ex.: após um crash) não cria uma segunda entrada. Respostas com
+    atraso ficam gravadas com o prazo em `next_attempt_at` e sobrevivem a reinícios.
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "in_reply_to TEXT PRIMARY KEY, text TEXT NOT NULL, status TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL, "
+            "created_at REAL NOT NULL, sent_at REAL, tweet_id TEXT, last_error TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox(status, next_attempt_at)")
+        # Entradas que estavam sendo enviadas quando o processo caiu voltam para a fila
+        self._conn.execute("UPDATE outbox SET status = ? WHERE status = ?", (PENDING, SENDING))
+        self._conn.commit()
+
+    def enqueue(self, in_reply_to: str, text: str, delay: float = 0.0) -> bool:
+        """Grava a resposta para sair em `delay` segundos; retorna False se já havia uma para esta menção."""
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO outbox (in_reply_to, text, status, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (str(in_reply_to), text, PENDING, now + max(0.0, delay), now),
+            )
+            self._conn.commit()
+            return cur.rowcount > 0
+
+    def __contains__(self, in_reply_to: object) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM outbox WHERE in_reply_to = ?", (str(in_reply_to),)).fetchone()
+        return row is not None
+
+    def due_times(self) -> List[Tuple[str, float]]:
+        """(in_reply_to, prazo) de todas as entradas pendentes, para montar o agendador."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT in_reply_to, next_attempt_at FROM outbox WHERE status = ?", (PENDING,)
+            ).fetchall()
+
+    def claim_due(self, limit: int) -> List[Dict[str, Any]]:
+        """Marca até `limit` entradas vencidas como `sending` e as retorna."""
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT in_reply_to, text, attempts, created_at, next_attempt_at FROM outbox "
+                "WHERE status = ? AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                (PENDING, now, limit),
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE outbox SET status = ? WHERE in_reply_to = ?", [(SENDING, r[0]) for r in rows]
+            )
+            self._conn.commit()
+        return [
+            {"in_reply_to": r[0], "text": r[1], "attempts": r[2], "created_at": r[3], "due_at": r[4]} for r in rows
+        ]
+
+    def mark_sent(self, in_reply_to: str, tweet_id: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, sent_at = ?, tweet_id = ?, attempts = attempts + 1, last_error = NULL "
+                "WHERE in_reply_to = ?",
+                (SENT, time.time(), tweet_id, in_reply_to),
+            )
+            self._conn.commit()
+
+    def mark_retry(self, in_reply_to: str, error: str, delay: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, next_attempt_at = ?, last_error = ? "
+                "WHERE in_reply_to = ?",
+                (PENDING, time.time() + delay, error, in_reply_to),
+            )
+            self._conn.commit()
+
+    def mark_failed(self, in_reply_to: str, error: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, last_error = ? WHERE in_reply_to = ?",
+                (FAILED, error, in_reply_to),
+            )
+            self._conn.commit()
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        return {status: 0 for status in (PENDING, SENDING, SENT, FAILED)} | dict(rows)
+
+
+class OutboxSender:
+    """Drena o `Outbox` em segundo plano, em lotes.
+
+    `send(text, in_reply_to)` pode retornar um `Future` (ex.: `TwitterClient.submit_reply`,
+    que passa pelo scheduler de rate limit): o lote inteiro é submetido de uma vez e os
+    resultados são aguardados juntos. Falhas transitórias são retentadas com backoff
+    exponencial com jitter até `max_attempts`; erros permanentes (4xx) falham de vez.
+
+    A fonte da verdade dos prazos é a coluna `next_attempt_at` do SQLite: `claim_due`
+    decide o que sai em cada lote. O `TimerHeap` só guarda os prazos conhecidos
+    (atrasos "humanos" e retentativas) para o sender dormir até o próximo, sem uma
+    thread por resposta; `poll_interval` é a rede de segurança para entradas gravadas
+    por outro processo. Entradas enviadas ou com falha definitiva saem do heap, e um
+    prazo vencido que o SQLite não libera (ex.: já enviado por outro processo) é
+    descartado como aviso velho.
+    """
+
+    def __init__(
+        self,
+        outbox: Outbox,
+        send: Callable[[str, str], Any],
+        batch_size: int = 20,
+        max_attempts: int = 6,
+        base_delay: float = 2.0,
+        max_delay: float = 300.0,
+        poll_interval: float = 5.0,
+    ):
+        self.outbox = outbox
+        self.send = send
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at: Optional[float] = None
+        self.timers = TimerHeap()
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.batches = 0
+        # Tempo entre a resposta ser gravada e ser postada
+        self.delivery_latency = Histogram()
+        # Atraso entre o prazo de uma entrada e o momento em que ela foi liberada
+        self.release_lag = Histogram()
+
+    def start(self) -> "OutboxSender":
+        if self._thread is None:
+            self._started_at = time.time()
+            for in_reply_to, due_at in self.outbox.due_times():
+                self.timers.schedule(in_reply_to, due_at)
+            self._thread = threading.Thread(target=self._loop, name="outbox-sender", daemon=True)
+            self._thread.start()
+        return self
+
+    def notify(self) -> None:
+        """Acorda o sender (ex.: logo após um `enqueue`)."""
+        self._wake.set()
+
+    def schedule(self, in_reply_to: str, due_at: float) -> None:
+        """Registra o prazo de uma entrada recém-gravada e acorda o sender."""
+        self.timers.schedule(str(in_reply_to), due_at)
+        self._wake.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            started = time.time()
+            try:
+                flushed = self.flush()
+            except Exception as e:
+                print(f"Erro no envio do outbox: {e}")
+                flushed = 0
+            else:
+                if not flushed:
+                    # Nada vencido no SQLite: prazos anteriores a `claim_due` são avisos velhos
+                    self.timers.pop_due(started)
+            if not flushed:
+                self._wake.wait(min(self.poll_interval, self.timers.wait_time(self.poll_interval)))
+                self._wake.clear()
+
+    def flush(self) -> int:
+        """Envia um lote de entradas vencidas; retorna quantas foram processadas."""
+        batch = self.outbox.claim_due(self.batch_size)
+        if not batch:
+            return 0
+        self.batches += 1
+        now = time.time()
+        pending = []
+        for item in batch:
+            self.release_lag.observe(max(0.0, now - item["due_at"]))
+            try:
+                pending.append((item, self.send(item["text"], item["in_reply_to"])))
+            except Exception as e:
+                self._handle_error(item, e)
+        for item, result in pending:
+            try:
+                value = result.result() if isinstance(result, Future) else result
+            except Exception as e:
+                self._handle_error(item, e)
+                continue
+            self._handle_sent(item, value)
+        return len(batch)
+
+    def _handle_sent(self, item: Dict[str, Any], result: Any) -> None:
+        tweet_id = getattr(result, "id_str", None) or getattr(result, "id", None)
+        self.outbox.mark_sent(item["in_reply_to"], str(tweet_id) if tweet_id is not None else None)
+        self.timers.cancel(item["in_reply_to"])
+        self.sent += 1
+        self.delivery_latency.observe(time.time() - item["created_at"])
+
+    def _handle_error(self, item: Dict[str, Any], error: BaseException) -> None:
+        if _is_duplicate(error):
+            self._handle_sent(item, None)
+            return
+        attempts = item["attempts"] + 1
+        if _status_code(error) in PERMANENT_STATUS or attempts >= self.max_attempts:
+            self.outbox.mark_failed(item["in_reply_to"], str(error))
+            self.timers.cancel(item["in_reply_to"])
+            self.failed += 1
+            print(f"Resposta para {item['in_reply_to']} falhou definitivamente: {error}")
+            return
+        delay = backoff_delay(attempts, self.base_delay, self.max_delay)
+        self.outbox.mark_retry(item["in_reply_to"], str(error), delay)
+        self.timers.schedule(item["in_reply_to"], time.time() + delay)
+        self.retried += 1
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        uptime = time.time() - self._started_at if self._started_at else 0.0
+        return {
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "batches": self.batches,
+            "throughput_per_min": round(self.sent / uptime * 60, 2) if uptime else None,
+            "queue": self.outbox.counts(),
+            "scheduled": len(self.timers),
+            "next_due_in_s": self.timers.wait_time(),
+            "release_lag": self.release_lag.snapshot(),
+            "delivery_latency": self.delivery_latency.snapshot(),
+        }
@@ -0,0 +1,326 @@
+"""Pré-geração fora do pico dos tweets autônomos diários das personas.
+
+Gerar o post do dia na hora disputa o LLM com as respostas a menções. Este job roda em
+horários ociosos (`PRECOMPUTE_HOURS`, padrão 2–6 h) e mantém, para cada persona
+(`config/persona.yaml` e `config/personas/*.yaml`), uma fila de candidatos sobre os seus
+`favorite_topics`, gravada em SQLite/WAL (`PostQueue`) com tema, modelo e tempo de
+geração. No horário de pico, publicar é só `PostQueue.take(persona)`: nenhuma chamada ao LLM.
+
+Uso:
+    python -m src.pipeline.precompute [--per-persona 7] [--hours 2-6] [--personas default,minimalista]
+                                      [--once] [--force] [--list]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.pipeline.checkpoint import pipeline_db_path
+from src.utils.metrics import Histogram
+
+
+PENDING, TAKEN, DISCARDED = "pending", "taken", "discarded"
+
+
+def precompute_settings() -> dict:
+    """`PRECOMPUTE_PER_PERSONA` (candidatos por persona), `PRECOMPUTE_HOURS` (janela, ex. `2-6`)
+    e `PRECOMPUTE_INTERVAL` (segundos entre verificações no modo contínuo)."""
+    return {
+        "per_persona": int(os.getenv("PRECOMPUTE_PER_PERSONA", "7")),
+        "hours": parse_hours(os.getenv("PRECOMPUTE_HOURS", "2-6")),
+        "interval": float(os.getenv("PRECOMPUTE_INTERVAL", "600")),
+    }
+
+
+def parse_hours(spec: str) -> Optional[Tuple[int, int]]:
+    """`"2-6"` -> (2, 6): das 2h até antes das 6h; `"22-4"` atravessa a meia-noite; vazio = sempre."""
+    spec = (spec or "").strip()
+    if not spec:
+        return None
+    start, _, end = spec.partition("-")
+    return int(start) % 24, int(end or start) % 24
+
+
+def in_window(hours: Optional[Tuple[int, int]], now: Optional[datetime] = None) -> bool:
+    if hours is None:
+        return True
+    hour = (now or datetime.now()).hour
+    start, end = hours
+    if start == end:
+        return True
+    return start <= hour < end if start < end else hour >= start or hour < end
+
+
+class PostQueue:
+    """Fila durável de posts autônomos candidatos (SQLite/WAL), um registro por candidato."""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS post_candidates ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, persona TEXT NOT NULL, persona_name TEXT, "
+            "topic TEXT NOT NULL, text TEXT NOT NULL, status TEXT NOT NULL, model TEXT, "
+            "generation_ms REAL, created_at REAL NOT NULL, taken_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_post_candidates_queue ON post_candidates(persona, status, created_at)"
+        )
+        self._conn.commit()
+
+    def add(
+        self,
+        persona: str,
+        topic: str,
+        text: str,
+        persona_name: Optional[str] = None,
+        model: Optional[str] = None,
+        generation_ms: Optional[float] = None,
+    ) -> int:
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO post_candidates (persona, persona_name, topic, text, status, model, generation_ms, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (persona, persona_name, topic, text, PENDING, model, generation_ms, time.time()),
+            )
+            self._conn.commit()
+            return int(cur.lastrowid)
+
+    def pending(self, persona: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM post_candidates WHERE persona = ? AND status = ?", (persona, PENDING)
+            ).fetchone()
+        return row[0]
+
+    def recent(self, persona: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Candidatos mais novos da persona (qualquer status), para evitar repetição."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, topic, text, status, created_at FROM post_candidates WHERE persona = ? "
+                "ORDER BY id DESC LIMIT ?",
+                (persona, limit),
+            ).fetchall()
+        return [{"id": r[0], "topic": r[1], "text": r[2], "status": r[3], "created_at": r[4]} for r in rows]
+
+    def take(self, persona: str) -> Optional[Dict[str, Any]]:
+        """Retira o candidato pendente mais antigo da persona (marcado como `taken`)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, topic, text, model, created_at FROM post_candidates "
+                "WHERE persona = ? AND status = ? ORDER BY created_at, id LIMIT 1",
+                (persona, PENDING),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE post_candidates SET status = ?, taken_at = ? WHERE id = ?", (TAKEN, time.time(), row[0])
+            )
+            self._conn.commit()
+        return {"id": row[0], "persona": persona, "topic": row[1], "text": row[2], "model": row[3], "created_at": row[4]}
+
+    def discard(self, candidate_id: int) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE post_candidates SET status = ? WHERE id = ?", (DISCARDED, candidate_id))
+            self._conn.commit()
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """{persona: {status: n}}."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT persona, status, COUNT(*) FROM post_candidates GROUP BY persona, status"
+            ).fetchall()
+        out: Dict[str, Dict[str, int]] = {}
+        for persona, status, n in rows:
+            out.setdefault(persona, {})[status] = n
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def llm_generator(persona: dict, topic: str, recent: List[str]) -> str:
+    """Gerador padrão: um `AgentManager` do pool da persona escreve o post em uma chamada."""
+    from src.service.manager_pool import get_pool
+
+    with get_pool(persona).checkout() as manager:
+        return manager.compose_post(topic, recent)
+
+
+class PrecomputeJob:
+    """Completa a fila de cada persona até `per_persona` candidatos pendentes.
+
+    - Os temas giram pelos `favorite_topics`, começando pelos menos usados entre os
+      candidatos recentes da persona.
+    - `idle()` é consultado antes de cada geração; se o sistema deixar de estar ocioso
+      (fora da janela de horário ou com menções na fila), o lote para e continua na
+      próxima rodada. Cada candidato é gravado assim que gerado.
+    - `generate(persona, topic, recent)` pode ser trocado (testes, outro LLM).
+    """
+
+    def __init__(
+        self,
+        queue: PostQueue,
+        personas: Dict[str, dict],
+        generate: Callable[[dict, str, List[str]], str] = llm_generator,
+        per_persona: int = 7,
+        idle: Callable[[], bool] = lambda: True,
+        model: Optional[str] = None,
+    ):
+        self.queue = queue
+        self.personas = personas
+        self.generate = generate
+        self.per_persona = per_persona
+        self.idle = idle
+        self.model = model
+        self.generated = 0
+        self.failed = 0
+        self.interrupted = 0
+        self.runs = 0
+        self.generation_time = Histogram()
+        self.stop_event = threading.Event()
+
+    def next_topic(self, key: str, persona: dict) -> Optional[str]:
+        topics = list(persona.get("favorite_topics") or [])
+        if not topics:
+            return None
+        used = Counter(c["topic"] for c in self.queue.recent(key, limit=len(topics) * 2))
+        # Menos usado primeiro; empate pela ordem do YAML
+        return min(topics, key=lambda t: (used[t], topics.index(t)))
+
+    def run_once(self) -> int:
+        """Uma rodada de pré-geração; retorna quantos candidatos foram gravados."""
+        self.runs += 1
+        generated = 0
+        for key, persona in self.personas.items():
+            while self.queue.pending(key) < self.per_persona:
+                if self.stop_event.is_set():
+                    return generated
+                if not self.idle():
+                    self.interrupted += 1
+                    return generated
+                topic = self.next_topic(key, persona)
+                if topic is None:
+                    break
+                recent = [c["text"] for c in self.queue.recent(key, limit=5)]
+                started = time.perf_counter()
+                try:
+                    text = self.generate(persona, topic, recent)
+                except Exception as e:
+                    self.failed += 1
+                    print(f"Falha ao pré-gerar post de '{key}' sobre '{topic}': {e}")
+                    break  # próxima persona; esta tenta de novo na próxima rodada
+                elapsed = time.perf_counter() - started
+                self.generation_time.observe(elapsed)
+                if not text or not text.strip():
+                    self.failed += 1
+                    break
+                self.queue.add(
+                    key, topic, text.strip(),
+                    persona_name=persona.get("name"), model=self.model, generation_ms=round(elapsed * 1000, 1),
+                )
+                generated += 1
+                self.generated += 1
+        return generated
+
+    def run_forever(self, interval: float = 600.0) -> None:
+        print(f"Pré-geração de posts iniciada ({len(self.personas)} personas, {self.per_persona} por persona).")
+        while not self.stop_event.is_set():
+            try:
+                if self.idle():
+                    self.run_once()
+            except Exception as e:
+                print(f"Erro na pré-geração de posts: {e}")
+            self.stop_event.wait(interval)
+        print("Pré-geração de posts encerrada.")
+
+    def stop(self, *_: Any) -> None:
+        self.stop_event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "generated": self.generated,
+            "failed": self.failed,
+            "interrupted": self.interrupted,
+            "generation_time": self.generation_time.snapshot(),
+            "queue": self.queue.counts(),
+        }
+
+
+def main(argv: list[str] | None = None) -> int:
+    import signal
+
+    from src.agents.agent_manager import llm_settings
+    from src.config_loader import load_all_personas
+
+    settings = precompute_settings()
+    parser = argparse.ArgumentParser(description="Pré-gera, fora do pico, os tweets autônomos das personas.")
+    parser.add_argument(
+        "--per-persona", type=int, default=settings["per_persona"],
+        help="candidatos pendentes mantidos por persona (PRECOMPUTE_PER_PERSONA)",
+    )
+    parser.add_argument(
+        "--hours", default=os.getenv("PRECOMPUTE_HOURS", "2-6"),
+        help="janela ociosa em horas locais, ex. 2-6 ou 22-4; vazio = sempre (PRECOMPUTE_HOURS)",
+    )
+    parser.add_argument(
+        "--interval", type=float, default=settings["interval"],
+        help="segundos entre rodadas no modo contínuo (PRECOMPUTE_INTERVAL)",
+    )
+    parser.add_argument("--personas", default=None, help="lista separada por vírgulas (padrão: todas)")
+    parser.add_argument("--db", default=None, help="SQLite do pipeline (PIPELINE_DB_PATH)")
+    parser.add_argument("--once", action="store_true", help="executa uma única rodada e sai")
+    parser.add_argument("--force", action="store_true", help="ignora a janela de horário")
+    parser.add_argument("--list", action="store_true", help="mostra os candidatos pendentes e sai")
+    args = parser.parse_args(argv)
+
+    queue = PostQueue(args.db or pipeline_db_path())
+    personas = load_all_personas()
+    if args.personas:
+        wanted = [p.strip() for p in args.personas.split(",") if p.strip()]
+        personas = {k: personas[k] for k in wanted if k in personas}
+    if args.list:
+        for key in personas:
+            pending = [c for c in queue.recent(key, limit=100) if c["status"] == PENDING]
+            print(f"{key}: {len(pending)} pendentes")
+            for c in reversed(pending):
+                print(f"  [{c['topic']}] {c['text']}")
+        return 0
+
+    hours = None if args.force else parse_hours(args.hours)
+    job = PrecomputeJob(
+        queue,
+        personas,
+        per_persona=args.per_persona,
+        idle=lambda: in_window(hours),
+        model=llm_settings()["model"],
+    )
+    if args.once:
+        if not job.idle():
+            print(f"Fora da janela ociosa ({args.hours}); use --force para gerar agora.")
+            return 0
+        job.run_once()
+        print(job.stats())
+        return 0
+    signal.signal(signal.SIGINT, job.stop)
+    signal.signal(signal.SIGTERM, job.stop)
+    job.run_forever(args.interval)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import math
+import os
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+from src.twitter.client import Mention
+from src.utils.lru import LRUCache
+
+
+PRIORITY_MODES = ("fifo", "score")
+PRIORITY_CLASSES = ("high", "normal", "low")
+# Época dos ids "snowflake" do Twitter (ms)
+TWITTER_EPOCH_MS = 1288834974657
+
+
+def priority_settings() -> dict:
+    """`MENTION_PRIORITY` (fifo|score) e `MENTION_PRIORITY_AGING` (pontos por segundo de espera)."""
+    return {
+        "mode": os.getenv("MENTION_PRIORITY", "score").strip().lower(),
+        "aging": float(os.getenv("MENTION_PRIORITY_AGING", "0.01")),
+    }
+
+
+def mention_timestamp(mention: Mention) -> Optional[float]:
+    """Instante da menção: `created_at` ou, sem ele, o tempo embutido no id snowflake."""
+    if mention.created_at:
+        try:
+            return datetime.fromisoformat(str(mention.created_at).replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            pass
+    try:
+        tweet_id = int(mention.id)
+    except (TypeError, ValueError):
+        return None
+    if tweet_id < 1 << 32:
+        return None  # ids curtos (testes, fixtures) não carregam tempo
+    return ((tweet_id >> 22) + TWITTER_EPOCH_MS) / 1000
+
+
+def priority_class(score: float) -> str:
+    """Classe da menção para as métricas de espera por prioridade."""
+    if score >= 1.5:
+        return "high"
+    if score >= 0.75:
+        return "normal"
+    return "low"
+
+
+class MentionScorer:
+    """Pontuação padrão de menções (maior = mais urgente).
+
+    Soma de componentes, cada um com seu peso:
+    - frescor: 1 para uma menção nova, decaindo pela metade a cada `half_life` segundos;
+    - alcance do autor: log10(1 + seguidores) / 6, limitado a 1 (1M de seguidores = 1);
+    - profundidade: menções que são respostas dentro de uma conversa (`depth_weight`,
+      negativo por padrão, para não se prender em threads longas);
+    - thread ativa: conversa em que o bot respondeu há menos de `active_ttl` segundos.
+
+    Qualquer `Callable[[Mention], float]` pode substituí-la no `MentionDaemon`.
+    """
+
+    def __init__(
+        self,
+        half_life: float = 30 * 60,
+        follower_weight: float = 1.0,
+        depth_weight: float = -0.25,
+        active_weight: float = 1.0,
+        active_ttl: float = 60 * 60,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.half_life = half_life
+        self.follower_weight = follower_weight
+        self.depth_weight = depth_weight
+        self.active_weight = active_weight
+        self._clock = clock
+        self._active: LRUCache[bool] = LRUCache(max_items=10_000, ttl=active_ttl)
+
+    def note_handled(self, mention: Mention) -> None:
+        """Marca a conversa da menção como ativa (o bot acabou de responder nela)."""
+        if mention.conversation_id:
+            self._active.set(mention.conversation_id, True)
+
+    def __call__(self, mention: Mention) -> float:
+        score = 0.0
+        created = mention_timestamp(mention)
+        age = max(0.0, self._clock() - created) if created is not None else 0.0
+        score += 0.5 ** (age / self.half_life)
+        if mention.author_followers:
+            score += self.follower_weight * min(1.0, math.log10(1 + mention.author_followers) / 6)
+        if mention.conversation_id and mention.conversation_id != mention.id:
+            score += self.depth_weight
+            if self._active.get(mention.conversation_id):
+                score += self.active_weight
+        return score
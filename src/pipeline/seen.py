@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.pipeline.checkpoint import Checkpoint
+from src.utils.bloom import BloomFilter
+
+
+FLOOR_NAME = "seen.floor"
+
+
+def seen_index_settings() -> Dict[str, float]:
+    """Capacidade (`SEEN_INDEX_CAPACITY`) e taxa de falso positivo (`SEEN_INDEX_ERROR_RATE`)."""
+    return {
+        "capacity": int(os.getenv("SEEN_INDEX_CAPACITY", "1000000")),
+        "error_rate": float(os.getenv("SEEN_INDEX_ERROR_RATE", "0.001")),
+    }
+
+
+class SeenIndex:
+    """Conjunto durável de ids de menções já tratadas (SQLite/WAL + Bloom filter em memória).
+
+    A consulta (`id in seen`) custa O(1): um Bloom negativo responde sem tocar no disco;
+    só os positivos (duplicatas reais ou falsos positivos raros) confirmam no SQLite.
+    A memória é limitada por `capacity`: ao passar do limite, os ids mais antigos saem do
+    banco, o filtro é reconstruído e tudo até o maior id removido (o "piso") conta como
+    visto — ids do Twitter são crescentes, então isso só afeta menções muito antigas.
+    """
+
+    def __init__(self, path: Path | str, capacity: int = 1_000_000, error_rate: float = 0.001):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen_mentions (tweet_id INTEGER PRIMARY KEY, seen_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._meta = Checkpoint(self.path)
+        floor = self._meta.get(FLOOR_NAME)
+        self.floor: Optional[int] = int(floor) if floor is not None else None
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.size = 0
+        self.lookups = 0
+        self.bloom_negatives = 0
+        self.false_positives = 0
+        self.pruned = 0
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        self.bloom.clear()
+        self.size = 0
+        for (tweet_id,) in self._conn.execute("SELECT tweet_id FROM seen_mentions"):
+            self.bloom.add(str(tweet_id))
+            self.size += 1
+
+    def __contains__(self, tweet_id: object) -> bool:
+        key = int(str(tweet_id))
+        with self._lock:
+            self.lookups += 1
+            if self.floor is not None and key <= self.floor:
+                return True
+            if str(key) not in self.bloom:
+                self.bloom_negatives += 1
+                return False
+            row = self._conn.execute("SELECT 1 FROM seen_mentions WHERE tweet_id = ?", (key,)).fetchone()
+            if row is None:
+                self.false_positives += 1
+            return row is not None
+
+    def add(self, tweet_id: object) -> bool:
+        """Registra o id; retorna False se já estava no índice."""
+        key = int(str(tweet_id))
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO seen_mentions (tweet_id, seen_at) VALUES (?, ?)", (key, time.time())
+            )
+            self._conn.commit()
+            if cur.rowcount <= 0:
+                return False
+            self.bloom.add(str(key))
+            self.size += 1
+            if self.size > self.capacity:
+                self._prune()
+            return True
+
+    def _prune(self) -> None:
+        # Mantém 90% da capacidade para não reconstruir o filtro a cada inserção
+        keep = int(self.capacity * 0.9)
+        row = self._conn.execute(
+            "SELECT tweet_id FROM seen_mentions ORDER BY tweet_id DESC LIMIT 1 OFFSET ?", (keep,)
+        ).fetchone()
+        if row is None:
+            return
+        floor = max(row[0], self.floor or 0)
+        cur = self._conn.execute("DELETE FROM seen_mentions WHERE tweet_id <= ?", (floor,))
+        self._conn.commit()
+        self._meta.set(FLOOR_NAME, str(floor))
+        self.floor = floor
+        self.pruned += cur.rowcount
+        self._rebuild()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+        self._meta.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": self.size,
+                "floor": self.floor,
+                "lookups": self.lookups,
+                "bloom_negatives": self.bloom_negatives,
+                "false_positives": self.false_positives,
+                "pruned": self.pruned,
+                "bloom": self.bloom.snapshot(),
+            }
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import itertools
+import math
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.utils.metrics import Histogram
+
+
+# O que fazer quando a fila está cheia:
+# - block: o produtor (fetcher) espera por espaço;
+# - drop: o item é descartado e contado (nunca será processado);
+# - defer: o item não é aceito agora; o produtor para e o reapresenta mais tarde.
+QUEUE_POLICIES = ("block", "drop", "defer")
+
+QUEUED, DROPPED, DEFERRED = "queued", "dropped", "deferred"
+
+
+class _Job:
+    __slots__ = ("item", "enqueued_at", "score", "klass")
+
+    def __init__(self, item: Any, score: float = 0.0, klass: Optional[str] = None):
+        self.item = item
+        self.enqueued_at = time.perf_counter()
+        self.score = score
+        self.klass = klass
+
+
+class WorkerPool:
+    """Fila limitada + N threads executando `handler(item)` (produtor/consumidor).
+
+    `on_done(item, ok)` é chamado ao fim de cada item (sucesso ou falha definitiva, após
+    `max_attempts`). Métricas: profundidade da fila, tempo de espera na fila, tempo de
+    processamento e utilização de cada worker (fração do tempo ocupado).
+
+    Com `priority(item) -> float`, a fila vira uma fila de prioridade (maior pontuação
+    sai primeiro). Contra inanição, cada item ganha `aging` pontos por segundo de espera:
+    como todos envelhecem no mesmo ritmo, a ordem é dada pela chave fixa
+    `aging * enfileirado_em - pontuação`, sem reordenar a fila. `classify(score)` agrupa
+    os itens em classes com histogramas de espera próprios.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Any],
+        workers: int = 4,
+        max_queue: int = 100,
+        policy: str = "block",
+        max_attempts: int = 3,
+        on_done: Optional[Callable[[Any, bool], None]] = None,
+        name: str = "worker",
+        priority: Optional[Callable[[Any], float]] = None,
+        aging: float = 0.0,
+        classify: Optional[Callable[[float], str]] = None,
+    ):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"política inválida: {policy!r} (use {', '.join(QUEUE_POLICIES)})")
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.policy = policy
+        self.max_attempts = max(1, max_attempts)
+        self.on_done = on_done
+        self.name = name
+        self.priority = priority
+        self.aging = aging
+        self.classify = classify
+        self._seq = itertools.count()
+        if priority is not None:
+            self._queue: queue.Queue = queue.PriorityQueue(maxsize=max(1, max_queue))
+        else:
+            self._queue = queue.Queue(maxsize=max(1, max_queue))
+        self._threads: List[threading.Thread] = []
+        self._closed = threading.Event()
+        self._draining = True
+        self._lock = threading.Lock()
+        self._busy = [0.0] * self.workers
+        self._started_at: Optional[float] = None
+        self._active = 0
+        self.submitted = 0
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.deferred = 0
+        self.discarded = 0
+        self.queue_wait = Histogram()
+        self.service_time = Histogram()
+        self.queue_wait_by_class: Dict[str, Histogram] = {}
+
+    def start(self) -> "WorkerPool":
+        if self._threads:
+            return self
+        self._started_at = time.perf_counter()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, args=(i,), name=f"{self.name}-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def submit(self, item: Any, timeout: Optional[float] = None) -> str:
+        """Enfileira `item`; retorna `queued`, `dropped` ou `deferred` conforme a política."""
+        if self._closed.is_set():
+            raise RuntimeError("pool encerrado")
+        job = self._job(item)
+        if self.policy == "block":
+            deadline = None if timeout is None else time.monotonic() + timeout
+            # Espera em fatias para reagir a `close()` enquanto bloqueado
+            while True:
+                try:
+                    self._queue.put(self._entry(job), timeout=0.25)
+                    break
+                except queue.Full:
+                    if self._closed.is_set() or (deadline is not None and time.monotonic() >= deadline):
+                        with self._lock:
+                            self.deferred += 1
+                        return DEFERRED
+        else:
+            try:
+                self._queue.put_nowait(self._entry(job))
+            except queue.Full:
+                with self._lock:
+                    if self.policy == "drop":
+                        self.dropped += 1
+                    else:
+                        self.deferred += 1
+                return DROPPED if self.policy == "drop" else DEFERRED
+        with self._lock:
+            self.submitted += 1
+        return QUEUED
+
+    def _job(self, item: Any) -> _Job:
+        if self.priority is None:
+            return _Job(item)
+        score = float(self.priority(item))
+        return _Job(item, score, self.classify(score) if self.classify is not None else None)
+
+    def _entry(self, job: Optional[_Job]) -> Any:
+        if self.priority is None:
+            return job
+        # (chave, sequência, job): a sequência desempata sem comparar jobs; sentinelas por último
+        key = math.inf if job is None else self.aging * job.enqueued_at - job.score
+        return (key, next(self._seq), job)
+
+    def _run(self, index: int) -> None:
+        while True:
+            job = self._queue.get()
+            if self.priority is not None:
+                job = job[2]
+            try:
+                if job is None:
+                    return
+                if self._closed.is_set() and not self._draining:
+                    with self._lock:
+                        self.discarded += 1
+                    continue
+                self._process(index, job)
+            finally:
+                self._queue.task_done()
+
+    def _process(self, index: int, job: _Job) -> None:
+        started = time.perf_counter()
+        self.queue_wait.observe(started - job.enqueued_at)
+        if job.klass is not None:
+            with self._lock:
+                histogram = self.queue_wait_by_class.setdefault(job.klass, Histogram())
+            histogram.observe(started - job.enqueued_at)
+        with self._lock:
+            self._active += 1
+        ok = False
+        try:
+            for attempt in range(1, self.max_attempts + 1):
+                try:
+                    self.handler(job.item)
+                    ok = True
+                    break
+                except Exception as e:
+                    print(f"[{self.name}-{index}] erro (tentativa {attempt}/{self.max_attempts}): {e}")
+        finally:
+            elapsed = time.perf_counter() - started
+            self.service_time.observe(elapsed)
+            with self._lock:
+                self._active -= 1
+                self._busy[index] += elapsed
+                if ok:
+                    self.processed += 1
+                else:
+                    self.failed += 1
+        if self.on_done is not None:
+            self.on_done(job.item, ok)
+
+    @property
+    def idle(self) -> bool:
+        """True sem itens na fila nem em andamento."""
+        with self._lock:
+            return self._active == 0 and self._queue.qsize() == 0
+
+    def join(self) -> None:
+        """Aguarda a fila esvaziar e os itens em andamento terminarem."""
+        self._queue.join()
+
+    def close(self, drain: bool = False, timeout: Optional[float] = None) -> None:
+        """Encerra os workers. Com `drain=False`, itens ainda na fila são descartados
+        (não chamam `on_done`); os em andamento terminam normalmente."""
+        self._draining = drain
+        self._closed.set()
+        for _ in self._threads:
+            self._queue.put(self._entry(None))
+        for t in self._threads:
+            t.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.perf_counter()
+        uptime = now - self._started_at if self._started_at else 0.0
+        with self._lock:
+            busy = list(self._busy)
+            active = self._active
+            counters = {
+                "submitted": self.submitted,
+                "processed": self.processed,
+                "failed": self.failed,
+                "dropped": self.dropped,
+                "deferred": self.deferred,
+                "discarded": self.discarded,
+            }
+            by_class = dict(self.queue_wait_by_class)
+        return {
+            "workers": self.workers,
+            "policy": self.policy,
+            "queue_depth": self._queue.qsize(),
+            "queue_max": self._queue.maxsize,
+            "active": active,
+            **counters,
+            "utilization": [round(b / uptime, 4) if uptime else 0.0 for b in busy],
+            "queue_wait": self.queue_wait.snapshot(),
+            "service_time": self.service_time.snapshot(),
+            "priority": {
+                "aging": self.aging,
+                "queue_wait_by_class": {k: h.snapshot() for k, h in sorted(by_class.items())},
+            } if self.priority is not None else None,
+        }
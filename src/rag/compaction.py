@@ -0,0 +1,245 @@
+"""Esquecimento por idade e compactação da memória de interações (Chroma).
+
+Interações com `timestamp` mais antigo que a retenção (`RAG_RETENTION_DAYS`, padrão 30)
+saem da coleção. Opcionalmente, antes de apagá-las, cada grupo (persona, usuário, canal)
+vira um documento-resumo (`kind="digest"`), que continua pesquisável e ocupa uma fração
+do espaço. Depois das remoções, o SQLite do Chroma passa por `VACUUM` para devolver o
+espaço em disco.
+
+O relatório traz quantidade de documentos, tamanho em disco e latência de consulta
+(p50/p95 com as mesmas consultas) antes e depois.
+
+Uso:
+    python -m src.rag.compaction [--max-age-days 30] [--no-digest] [--no-vacuum] [--dry-run]
+                                 [--interval 86400]
+
+Documentos sem `timestamp` numérico (gravados antes do esquema de metadados) não são
+tocados.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.rag.rag_service import DEFAULT_DB_DIR, RAGService, interaction_metadata
+from src.utils.metrics import percentile
+
+
+DAY = 24 * 3600
+# Trechos por resumo e tamanho máximo de cada um (resumo extrativo padrão)
+DIGEST_MAX_ITEMS = 20
+DIGEST_ITEM_CHARS = 160
+
+
+def compaction_settings() -> dict:
+    """`RAG_RETENTION_DAYS` (idade máxima, padrão 30) e `RAG_COMPACTION_DIGEST` (resumir antes de apagar)."""
+    return {
+        "max_age_days": float(os.getenv("RAG_RETENTION_DAYS", "30")),
+        "digest": os.getenv("RAG_COMPACTION_DIGEST", "true").strip().lower() in ("1", "true", "yes"),
+    }
+
+
+def dir_size(path: Optional[Path]) -> Optional[int]:
+    """Bytes ocupados pelos arquivos do diretório (None sem diretório, ex.: cliente em memória)."""
+    if path is None or not Path(path).exists():
+        return None
+    return sum(f.stat().st_size for f in Path(path).rglob("*") if f.is_file())
+
+
+def extractive_digest(texts: List[str]) -> str:
+    """Resumo sem LLM: os trechos mais recentes, encurtados, um por linha."""
+    lines = [t.strip().replace("\n", " ")[:DIGEST_ITEM_CHARS] for t in texts[-DIGEST_MAX_ITEMS:] if t.strip()]
+    return "\n".join(f"- {line}" for line in lines)
+
+
+class MemoryCompactor:
+    """Expira interações antigas de um `RAGService`, com resumo opcional e `VACUUM`.
+
+    `summarize(texts) -> str` gera o texto de cada resumo (padrão: extrativo; pode ser
+    um LLM). `db_dir` é o diretório do `PersistentClient`, usado para medir o disco e
+    compactar o SQLite; sem ele essas etapas são puladas.
+    """
+
+    def __init__(
+        self,
+        service: RAGService,
+        db_dir: Optional[Path | str] = DEFAULT_DB_DIR,
+        summarize: Callable[[List[str]], str] = extractive_digest,
+        page_size: int = 1000,
+        probes: int = 50,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.service = service
+        self.db_dir = Path(db_dir) if db_dir is not None else None
+        self.summarize = summarize
+        self.page_size = page_size
+        self.probes = probes
+        self._clock = clock
+
+    def _probe_queries(self) -> List[List[float]]:
+        """Embeddings de documentos existentes, usados como consultas antes e depois."""
+        sample = self.service.collection.get(limit=self.probes, include=["embeddings"])
+        embeddings = sample.get("embeddings")
+        return [list(e) for e in embeddings] if embeddings is not None else []
+
+    def measure(self, queries: List[List[float]], n_results: int = 5) -> Dict[str, Any]:
+        latencies = []
+        for qvec in queries:
+            started = time.perf_counter()
+            self.service.collection.query(query_embeddings=[qvec], n_results=n_results, include=["distances"])
+            latencies.append((time.perf_counter() - started) * 1000)
+        return {
+            "documents": self.service.collection.count(),
+            "disk_bytes": dir_size(self.db_dir),
+            "query_p50_ms": round(percentile(latencies, 50), 2),
+            "query_p95_ms": round(percentile(latencies, 95), 2),
+        }
+
+    def expired(self, cutoff: float) -> List[Tuple[str, str, dict]]:
+        """(id, texto, metadados) das interações anteriores a `cutoff`, exceto resumos."""
+        # Filtro só pelo período (`$ne` não casaria interações sem `kind`); resumos saem aqui
+        where = {"timestamp": {"$lt": cutoff}}
+        found: Dict[str, Tuple[str, str, dict]] = {}
+        offset = 0
+        while True:
+            page = self.service.collection.get(
+                where=where, limit=self.page_size, offset=offset, include=["documents", "metadatas"]
+            )
+            ids = page.get("ids") or []
+            for doc_id, text, metadata in zip(ids, page.get("documents") or [], page.get("metadatas") or []):
+                metadata = metadata or {}
+                if metadata.get("kind") != "digest":
+                    found[doc_id] = (doc_id, text or "", metadata)
+            if len(ids) < self.page_size:
+                break
+            offset += self.page_size
+        return sorted(found.values(), key=lambda item: item[2].get("timestamp", 0))
+
+    def digests(self, items: List[Tuple[str, str, dict]]) -> List[dict]:
+        """Um documento-resumo por (persona, usuário, canal), no formato de `store_interactions`."""
+        groups: Dict[Tuple[Any, Any, Any], List[Tuple[str, str, dict]]] = {}
+        for item in items:
+            meta = item[2]
+            groups.setdefault((meta.get("persona"), meta.get("user"), meta.get("channel")), []).append(item)
+        out = []
+        for (persona, user, channel), group in groups.items():
+            start = group[0][2].get("timestamp")
+            end = group[-1][2].get("timestamp")
+            key = "|".join(str(v) for v in (persona, user, channel, start, end, len(group)))
+            text = self.summarize([text for _, text, _ in group])
+            if not text:
+                continue
+            out.append({
+                "id": "digest-" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:16],
+                "text": text,
+                "metadata": interaction_metadata(
+                    persona=persona, user=user, channel=channel, kind="digest", timestamp=end,
+                    period_start=start, period_end=end, count=len(group),
+                ),
+            })
+        return out
+
+    def vacuum(self) -> bool:
+        """`VACUUM` no SQLite do Chroma; False se não houver banco ou ele estiver ocupado."""
+        db = self.db_dir / "chroma.sqlite3" if self.db_dir is not None else None
+        if db is None or not db.exists():
+            return False
+        try:
+            conn = sqlite3.connect(str(db), timeout=30)
+            try:
+                conn.execute("VACUUM")
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"VACUUM do Chroma não executado: {e}")
+            return False
+        return True
+
+    def run(
+        self, max_age_days: float = 30.0, digest: bool = True, vacuum: bool = True, dry_run: bool = False
+    ) -> Dict[str, Any]:
+        """Executa uma compactação e retorna o relatório (antes/depois)."""
+        started = time.perf_counter()
+        cutoff = self._clock() - max_age_days * DAY
+        queries = self._probe_queries()
+        before = self.measure(queries)
+        items = self.expired(cutoff)
+        summaries = self.digests(items) if digest and items else []
+        report: Dict[str, Any] = {
+            "cutoff": cutoff,
+            "expired": len(items),
+            "digests": len(summaries),
+            "dry_run": dry_run,
+            "vacuumed": False,
+            "before": before,
+        }
+        if not dry_run and items:
+            if summaries:
+                # Resumos gravados antes da remoção: uma falha aqui não perde a memória
+                self.service.store_interactions(summaries, skip_existing=True)
+            ids = [doc_id for doc_id, _, _ in items]
+            for i in range(0, len(ids), self.page_size):
+                self.service.collection.delete(ids=ids[i:i + self.page_size])
+            if vacuum:
+                report["vacuumed"] = self.vacuum()
+        report["after"] = self.measure(queries) if not dry_run else before
+        report["seconds"] = round(time.perf_counter() - started, 3)
+        return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    before, after = report["before"], report["after"]
+
+    def _mb(value: Optional[int]) -> str:
+        return f"{value / 1024 / 1024:.1f} MB" if value is not None else "n/d"
+
+    return "\n".join([
+        f"Expiradas: {report['expired']} | resumos: {report['digests']} | VACUUM: {'sim' if report['vacuumed'] else 'não'}"
+        + (" | dry-run" if report["dry_run"] else ""),
+        f"Documentos: {before['documents']} -> {after['documents']}",
+        f"Disco: {_mb(before['disk_bytes'])} -> {_mb(after['disk_bytes'])}",
+        f"Consulta p50: {before['query_p50_ms']:.2f} ms -> {after['query_p50_ms']:.2f} ms | "
+        f"p95: {before['query_p95_ms']:.2f} ms -> {after['query_p95_ms']:.2f} ms",
+    ])
+
+
+def main(argv: list[str] | None = None) -> int:
+    settings = compaction_settings()
+    parser = argparse.ArgumentParser(description="Esquece interações antigas e compacta a memória do Chroma.")
+    parser.add_argument(
+        "--max-age-days", type=float, default=settings["max_age_days"],
+        help="idade máxima das interações em dias (RAG_RETENTION_DAYS)",
+    )
+    parser.add_argument(
+        "--no-digest", action="store_true", default=not settings["digest"],
+        help="apaga sem gerar resumos (RAG_COMPACTION_DIGEST=false)",
+    )
+    parser.add_argument("--no-vacuum", action="store_true", help="não executa VACUUM no SQLite do Chroma")
+    parser.add_argument("--dry-run", action="store_true", help="só mede e conta o que seria expirado")
+    parser.add_argument(
+        "--interval", type=float, default=0.0, help="repete a cada N segundos (ex.: 86400); 0 = uma vez"
+    )
+    args = parser.parse_args(argv)
+
+    compactor = MemoryCompactor(RAGService())
+    while True:
+        report = compactor.run(
+            max_age_days=args.max_age_days, digest=not args.no_digest, vacuum=not args.no_vacuum, dry_run=args.dry_run,
+        )
+        print(format_report(report))
+        if args.interval <= 0:
+            return 0
+        try:
+            time.sleep(args.interval)
+        except KeyboardInterrupt:
+            return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
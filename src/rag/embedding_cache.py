@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.utils.lru import LRUCache
+
+
+_WS = re.compile(r"\s+")
+# Custo aproximado de uma entrada além do vetor (chave sha1, tupla, nó do OrderedDict)
+_ENTRY_OVERHEAD = 160
+# A limpeza do SQLite (expiradas + excesso) roda na abertura e a cada N gravações
+_PRUNE_EVERY = 256
+
+
+def normalize_text(text: str) -> str:
+    """Normaliza o texto para a chave do cache (Unicode NFC, espaços colapsados)."""
+    return _WS.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def cache_key(model: str, text: str) -> str:
+    raw = f"{model}\0{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()
+
+
+def _sizeof(key: Any, vec: array) -> int:
+    return len(key) + vec.itemsize * len(vec) + _ENTRY_OVERHEAD
+
+
+class EmbeddingCache:
+    """Cache LRU + TTL de embeddings de consulta, com orçamento em bytes.
+
+    Vetores são guardados como `array('d')` (8 bytes por dimensão, bem menos que uma
+    lista de floats). Se `path` for informado, as entradas também são gravadas em um
+    SQLite (WAL) e recarregadas sob demanda, mantendo o cache quente entre reinícios.
+    O arquivo guarda no máximo `max_disk_items` linhas (saem as mais antigas) e as
+    expiradas são apagadas na abertura e a cada `_PRUNE_EVERY` gravações.
+    """
+
+    def __init__(
+        self,
+        max_items: Optional[int] = 10_000,
+        max_bytes: Optional[int] = 64 * 1024 * 1024,
+        ttl: Optional[float] = 24 * 3600,
+        path: Optional[Path | str] = None,
+        max_disk_items: Optional[int] = 100_000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.ttl = ttl
+        self.max_disk_items = max_disk_items
+        self._clock = clock
+        self._memory: LRUCache[array] = LRUCache(
+            max_items=max_items, max_bytes=max_bytes, ttl=ttl, sizeof=_sizeof, clock=clock
+        )
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._writes = 0
+        self.disk_hits = 0
+        self.disk_pruned = 0
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_created ON embeddings(created_at)")
+            self._db.commit()
+            with self._db_lock:
+                self._prune()
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        key = cache_key(model, text)
+        vec = self._memory.get(key)
+        if vec is None and self._db is not None:
+            loaded = self._load(key)
+            if loaded is not None:
+                vec, created_at = loaded
+                self.disk_hits += 1
+                # Só o que resta da validade gravada no disco, não um TTL novo
+                remaining = created_at + self.ttl - self._clock() if self.ttl is not None else None
+                self._memory.set(key, vec, ttl=remaining)
+        return vec.tolist() if vec is not None else None
+
+    def set(self, model: str, text: str, vector: List[float]) -> None:
+        key = cache_key(model, text)
+        vec = array("d", vector)
+        self._memory.set(key, vec)
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, model, vector, created_at) VALUES (?, ?, ?, ?)",
+                    (key, model, vec.tobytes(), self._clock()),
+                )
+                self._writes += 1
+                if self._writes % _PRUNE_EVERY == 0:
+                    self._prune()
+                self._db.commit()
+
+    def _prune(self) -> None:
+        """Apaga do SQLite as linhas expiradas e as mais antigas além de `max_disk_items`."""
+        deleted = 0
+        if self.ttl is not None:
+            cur = self._db.execute("DELETE FROM embeddings WHERE created_at <= ?", (self._clock() - self.ttl,))
+            deleted += cur.rowcount
+        if self.max_disk_items is not None:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+            if count > self.max_disk_items:
+                cur = self._db.execute(
+                    "DELETE FROM embeddings WHERE key IN ("
+                    "SELECT key FROM embeddings ORDER BY created_at ASC LIMIT ?)",
+                    (count - self.max_disk_items,),
+                )
+                deleted += cur.rowcount
+        self._db.commit()
+        self.disk_pruned += max(deleted, 0)
+
+    def _load(self, key: str) -> Optional[Tuple[array, float]]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT vector, created_at FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            blob, created_at = row
+            if self.ttl is not None and created_at + self.ttl <= self._clock():
+                self._db.execute("DELETE FROM embeddings WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+        vec = array("d")
+        vec.frombytes(blob)
+        return vec, created_at
+
+    def stats(self) -> Dict[str, Any]:
+        data = self._memory.stats()
+        data["persistent"] = self._db is not None
+        data["disk_hits"] = self.disk_hits
+        data["disk_pruned"] = self.disk_pruned
+        return data
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from src.utils.metrics import Histogram
+
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+
+@dataclass
+class _Request:
+    texts: List[str]
+    future: "Future[List[List[float]]]"
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class EmbeddingEngine:
+    """Embedder único do processo com micro-batching de chamadas concorrentes.
+
+    Envolve um embedder LangChain (`embed_documents`/`embed_query`). Pedidos que chegam
+    dentro de uma janela de `max_wait_ms` são agrupados em uma única chamada a
+    `embed_documents` (um forward pass do encoder) e cada chamador recebe um `Future`.
+
+    Consultas também passam por `embed_documents`: para os modelos usados aqui
+    (sentence-transformers e OpenAI) `embed_query(t)` equivale a `embed_documents([t])[0]`.
+    """
+
+    def __init__(self, embedder: Any, max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        if not hasattr(embedder, "embed_documents"):
+            raise TypeError("O embedder precisa expor `embed_documents` para micro-batching.")
+        self.embedder = embedder
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.model_name: str = str(
+            getattr(embedder, "model_name", None) or getattr(embedder, "model", None) or type(embedder).__name__
+        )
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self.batch_size = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_latency = Histogram()
+        self.encode_time = Histogram()
+
+    # API assíncrona (futures)
+    def submit(self, texts: List[str]) -> "Future[List[List[float]]]":
+        """Enfileira textos para embedding e retorna um Future com os vetores."""
+        future: "Future[List[List[float]]]" = Future()
+        if not texts:
+            future.set_result([])
+            return future
+        if self._closed:
+            raise RuntimeError("EmbeddingEngine encerrado.")
+        self._ensure_worker()
+        self._queue.put(_Request(list(texts), future))
+        return future
+
+    def submit_query(self, text: str) -> "Future[List[float]]":
+        inner = self.submit([text])
+        outer: "Future[List[float]]" = Future()
+
+        def _done(f: "Future[List[List[float]]]") -> None:
+            exc = f.exception()
+            if exc is not None:
+                outer.set_exception(exc)
+            else:
+                outer.set_result(f.result()[0])
+
+        inner.add_done_callback(_done)
+        return outer
+
+    # API compatível com embeddings do LangChain
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.submit(texts).result()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.submit([text]).result()[0]
+
+    def close(self) -> None:
+        self._closed = True
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join(timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "queue_depth": self._queue.qsize(),
+            "batch_size": self.batch_size.snapshot(),
+            "queue_latency_seconds": self.queue_latency.snapshot(),
+            "encode_seconds": self.encode_time.snapshot(),
+        }
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="embedding-engine", daemon=True)
+                self._worker.start()
+
+    def _collect(self, first: _Request) -> List[_Request]:
+        """Agrupa pedidos até encher o batch ou expirar a janela iniciada pelo primeiro."""
+        batch = [first]
+        size = len(first.texts)
+        deadline = first.enqueued_at + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                req = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if req is None:
+                self._closed = True
+                break
+            batch.append(req)
+            size += len(req.texts)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            started = time.perf_counter()
+            for req in batch:
+                self.queue_latency.observe(started - req.enqueued_at)
+            texts = [t for req in batch for t in req.texts]
+            self.batch_size.observe(len(texts))
+            try:
+                vectors = self.embedder.embed_documents(texts)
+            except Exception as e:
+                for req in batch:
+                    req.future.set_exception(e)
+            else:
+                self.encode_time.observe(time.perf_counter() - started)
+                offset = 0
+                for req in batch:
+                    n = len(req.texts)
+                    req.future.set_result([list(v) for v in vectors[offset:offset + n]])
+                    offset += n
+            if self._closed and self._queue.empty():
+                return
@@ -0,0 +1,65 @@
+"""Ingestão em lote de interações no RAG a partir de JSONL.
+
+Uso:
+    python -m src.rag.ingest interacoes.jsonl [--batch-size 64] [--write-chunk 1000]
+    cat interacoes.jsonl | python -m src.rag.ingest -
+
+Cada linha é um objeto JSON com `text` e, opcionalmente, `id` e `metadata`. Sem `id`,
+usa-se o hash do texto (reingestões do mesmo arquivo não duplicam documentos).
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+from typing import IO, Iterator
+
+from src.rag.rag_service import RAGService
+
+
+def iter_jsonl(stream: IO[str]) -> Iterator[dict]:
+    """Lê interações de um stream JSONL, ignorando linhas vazias ou inválidas."""
+    for lineno, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            print(f"AVISO: linha {lineno} ignorada (JSON inválido: {e})", file=sys.stderr)
+            continue
+        if isinstance(data, dict) and not data.get("id") and isinstance(data.get("text"), str):
+            data["id"] = hashlib.sha1(data["text"].encode("utf-8")).hexdigest()
+        yield data
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Ingestão em lote de interações (JSONL) no ChromaDB.")
+    parser.add_argument("path", help="arquivo JSONL ou '-' para stdin")
+    parser.add_argument("--batch-size", type=int, default=64, help="textos por chamada ao embedder")
+    parser.add_argument("--write-chunk", type=int, default=1000, help="documentos por collection.add")
+    parser.add_argument("--no-skip-existing", action="store_true", help="não consulta ids já existentes")
+    args = parser.parse_args(argv)
+
+    service = RAGService()
+    if args.path == "-":
+        stats = service.store_interactions(
+            iter_jsonl(sys.stdin), args.batch_size, args.write_chunk, not args.no_skip_existing
+        )
+    else:
+        with open(args.path, "r", encoding="utf-8") as f:
+            stats = service.store_interactions(
+                iter_jsonl(f), args.batch_size, args.write_chunk, not args.no_skip_existing
+            )
+
+    print(
+        f"Recebidas: {stats['received']} | gravadas: {stats['stored']} | "
+        f"já existentes: {stats['skipped_existing']} | duplicadas: {stats['skipped_duplicate']} | "
+        f"inválidas: {stats['invalid']} | {stats['seconds']}s ({stats['docs_per_sec']} docs/s)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,80 +1,311 @@
 import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from dotenv import load_dotenv, find_dotenv
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 import chromadb
 
+from src.rag.embedding_cache import EmbeddingCache
+from src.rag.embedding_engine import EmbeddingEngine
+
+
+DEFAULT_DB_DIR = Path(__file__).parent.parent.parent / "data" / "chroma_db"
+
+# Handles compartilhados no processo: o PersistentClient e o modelo de embeddings são caros
+# de criar (segundos e centenas de MB), então cada RAGService reutiliza as mesmas instâncias.
+_shared_lock = threading.Lock()
+_shared_clients: dict[str, Any] = {}
+_shared_embedding: dict[str, Optional[Any]] = {}
+
+
+def get_shared_client(db_dir: Path | str = DEFAULT_DB_DIR) -> Any:
+    """Retorna o `chromadb.PersistentClient` do processo para o diretório informado."""
+    key = str(Path(db_dir).resolve())
+    with _shared_lock:
+        client = _shared_clients.get(key)
+        if client is None:
+            Path(key).mkdir(parents=True, exist_ok=True)
+            client = chromadb.PersistentClient(path=key)
+            _shared_clients[key] = client
+        return client
+
+
+def get_shared_embedding_function() -> Optional[Any]:
+    """Retorna o embedder do processo, carregando-o apenas na primeira chamada.
+
+    Por padrão o embedder é envolvido por um `EmbeddingEngine`, que agrupa chamadas
+    concorrentes em um único forward pass (desative com `EMBEDDING_BATCHING=false`).
+    """
+    with _shared_lock:
+        if "default" not in _shared_embedding:
+            embedder = _load_embedding_function()
+            batching = os.getenv("EMBEDDING_BATCHING", "true").strip().lower() in ("1", "true", "yes")
+            if embedder is not None and batching and hasattr(embedder, "embed_documents"):
+                try:
+                    max_batch = int(os.getenv("EMBEDDING_MAX_BATCH", "64"))
+                except ValueError:
+                    max_batch = 64
+                try:
+                    window_ms = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))
+                except ValueError:
+                    window_ms = 5.0
+                embedder = EmbeddingEngine(embedder, max_batch_size=max_batch, max_wait_ms=window_ms)
+            _shared_embedding["default"] = embedder
+        return _shared_embedding["default"]
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def get_shared_embedding_cache() -> Optional[EmbeddingCache]:
+    """Retorna o cache de embeddings de consulta do processo (None se desativado).
+
+    Configuração: `EMBEDDING_CACHE` (liga/desliga), `EMBEDDING_CACHE_MAX_ITEMS`,
+    `EMBEDDING_CACHE_MAX_MB`, `EMBEDDING_CACHE_TTL` (segundos), `EMBEDDING_CACHE_PATH`
+    (SQLite opcional para persistir o cache entre reinícios) e
+    `EMBEDDING_CACHE_MAX_DISK_ITEMS` (linhas no SQLite, padrão 100000).
+    """
+    with _shared_lock:
+        if "cache" not in _shared_embedding:
+            enabled = os.getenv("EMBEDDING_CACHE", "true").strip().lower() in ("1", "true", "yes")
+            cache = None
+            if enabled:
+                ttl = _env_number("EMBEDDING_CACHE_TTL", 24 * 3600)
+                cache = EmbeddingCache(
+                    max_items=int(_env_number("EMBEDDING_CACHE_MAX_ITEMS", 10_000)),
+                    max_bytes=int(_env_number("EMBEDDING_CACHE_MAX_MB", 64) * 1024 * 1024),
+                    ttl=ttl if ttl > 0 else None,
+                    path=os.getenv("EMBEDDING_CACHE_PATH") or None,
+                    max_disk_items=int(_env_number("EMBEDDING_CACHE_MAX_DISK_ITEMS", 100_000)),
+                )
+            _shared_embedding["cache"] = cache
+        return _shared_embedding["cache"]
+
+
+def shared_embedding_stats() -> Optional[dict]:
+    """Métricas do `EmbeddingEngine` compartilhado (None se ainda não carregado)."""
+    embedder = _shared_embedding.get("default")
+    if isinstance(embedder, EmbeddingEngine):
+        return embedder.stats()
+    return None
+
+
+def shared_embedding_cache_stats() -> Optional[dict]:
+    """Métricas do cache de embeddings (None se desativado ou ainda não criado)."""
+    cache = _shared_embedding.get("cache")
+    return cache.stats() if cache is not None else None
+
+
+def _load_embedding_function() -> Optional[Any]:
+    """Tenta inicializar embeddings locais (sentence-transformers) e, se falhar,
+    usa OpenAIEmbeddings (requer OPENAI_API_KEY). Caso contrário, retorna None.
+    """
+    # Garante que o .env seja carregado, mesmo quando usado fora do main
+    try:
+        load_dotenv(find_dotenv(usecwd=True), override=False)
+    except Exception:
+        pass
+    # Preferência: modelo local via sentence-transformers (recomendado para privacidade/custo)
+    # 1) Tenta o pacote recomendado sem warnings de depreciação
+    try:
+        from langchain_huggingface import HuggingFaceEmbeddings
+
+        return HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+    except Exception:
+        pass
+
+    # 2) Fallback para a implementação antiga do LangChain Community
+    try:
+        from langchain_community.embeddings import SentenceTransformerEmbeddings
+        return SentenceTransformerEmbeddings(model_name="all-MiniLM-L6-v2")
+    except Exception:
+        pass
+
+    # Fallback: OpenAI Embeddings
+    try:
+        if os.getenv("OPENAI_API_KEY"):
+            from langchain_openai import OpenAIEmbeddings
+
+            return OpenAIEmbeddings()
+    except Exception:
+        pass
+
+    # Sem embedder disponível (modo somente texto, não recomendado)
+    return None
+
+
+# Esquema de metadados das interações: campos pelos quais a busca pode filtrar.
+# `timestamp` é gravado em segundos desde a época (float) para permitir `$gte`/`$lte`.
+INTERACTION_FILTER_FIELDS = ("persona", "user", "channel")
+INTERACTION_KINDS = ("question", "answer", "digest")
+
+
+def to_epoch(value: Any) -> Optional[float]:
+    """Converte epoch, `datetime` ou ISO 8601 em segundos desde a época (None se inválido)."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            try:
+                value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            except ValueError:
+                return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return None
+
+
+def interaction_metadata(
+    persona: Optional[str] = None,
+    user: Optional[str] = None,
+    channel: Optional[str] = None,
+    kind: Optional[str] = None,
+    timestamp: Any = None,
+    **extra: Any,
+) -> dict:
+    """Metadados de uma interação no esquema da coleção.
+
+    `persona` (nome da persona), `user` (autor), `channel` (ex.: `twitter`, `web`),
+    `kind` (`question`, `answer` ou `digest`) e `timestamp` (epoch, `datetime` ou ISO;
+    padrão: agora). Campos extras escalares são mantidos; valores None são descartados
+    (o Chroma não os aceita). Um `timestamp` informado mas ilegível levanta `ValueError`
+    em vez de virar "agora" (dados antigos de backfill não podem parecer recentes).
+    """
+    if kind is not None and kind not in INTERACTION_KINDS:
+        raise ValueError(f"kind inválido: {kind!r} (use {', '.join(INTERACTION_KINDS)})")
+    ts = to_epoch(timestamp)
+    if ts is None and timestamp not in (None, ""):
+        raise ValueError(f"timestamp inválido: {timestamp!r}")
+    metadata = {
+        "persona": persona,
+        "user": str(user) if user is not None else None,
+        "channel": channel,
+        "kind": kind,
+        "timestamp": ts if ts is not None else time.time(),
+        **extra,
+    }
+    return {k: v for k, v in metadata.items() if v is not None}
+
+
+def build_where(
+    persona: Optional[str] = None,
+    user: Optional[str] = None,
+    channel: Optional[str] = None,
+    since: Any = None,
+    until: Any = None,
+    where: Optional[dict] = None,
+) -> Optional[dict]:
+    """Monta o filtro `where` do Chroma (igualdade nos campos e intervalo em `timestamp`).
+
+    `where` é combinado com `$and` aos demais filtros; sem nenhum filtro, retorna None.
+    """
+    clauses = []
+    for field, value in zip(INTERACTION_FILTER_FIELDS, (persona, user, channel)):
+        if value is not None:
+            clauses.append({field: {"$eq": str(value)}})
+    since_ts, until_ts = to_epoch(since), to_epoch(until)
+    if since_ts is not None:
+        clauses.append({"timestamp": {"$gte": since_ts}})
+    if until_ts is not None:
+        clauses.append({"timestamp": {"$lte": until_ts}})
+    if where:
+        clauses.append(where)
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def rag_search_settings() -> dict:
+    """Cortes de relevância do contexto injetado nos prompts.
+
+    `RAG_N_RESULTS` (máximo de trechos, padrão 5), `RAG_MAX_DISTANCE` (distância máxima
+    na métrica da coleção, padrão 1.2: L2² de embeddings normalizados, ~cosseno 0.4;
+    vazio = sem corte) e `RAG_SPREAD` (folga de distância em relação ao melhor
+    resultado; vazio = sem corte).
+    """
+    def _optional(name: str, default: str = "") -> Optional[float]:
+        raw = os.getenv(name, default).strip()
+        try:
+            return float(raw) if raw else None
+        except ValueError:
+            return None
+
+    return {
+        "n_results": int(_env_number("RAG_N_RESULTS", 5)),
+        "max_distance": _optional("RAG_MAX_DISTANCE", "1.2"),
+        "spread": _optional("RAG_SPREAD"),
+    }
+
+
+@dataclass
+class InteractionHit:
+    """Resultado de busca: id, texto, distância à consulta e metadados da interação."""
+
+    id: str
+    text: str
+    distance: Optional[float]
+    metadata: dict = field(default_factory=dict)
+
 
 class RAGService:
-    def __init__(self):
+    def __init__(
+        self,
+        client: Optional[Any] = None,
+        embedding_function: Optional[Any] = None,
+        collection_name: str = "personabot_interactions",
+    ):
         """Inicializa o serviço de RAG com ChromaDB, compatível com Chroma 0.4/0.5 e 1.x.
 
         - Tenta usar SentenceTransformerEmbeddings (modelo local) ou OpenAIEmbeddings como fallback.
         - Para Chroma 1.x, calcula embeddings no cliente e passa via `embeddings=`.
         - Para versões antigas (0.4/0.5), mantém o uso de `embedding_function` na coleção.
+        - Cliente Chroma e embedder são compartilhados no processo (ver `get_shared_client`).
+
+        `client`, `embedding_function` e `collection_name` substituem os padrões do processo
+        (ex.: cliente em memória e embedder falso em testes e benchmarks).
         """
 
         # Caminho do DB e garantia de diretório
-        db_dir = Path(__file__).parent.parent.parent / "data" / "chroma_db"
-        db_dir.mkdir(parents=True, exist_ok=True)
-        self.client = chromadb.PersistentClient(path=str(db_dir))
+        self.client = client if client is not None else get_shared_client(DEFAULT_DB_DIR)
 
         # Inicializa embedding function com fallback
-        self.embedding_function: Optional[Any] = self._init_embedding_function()
+        self.embedding_function: Optional[Any] = (
+            embedding_function if embedding_function is not None else self._init_embedding_function()
+        )
 
         # Alguns releases do Chroma aceitam `embedding_function` na coleção; outros não.
         self._supports_collection_embedding = True
         try:
             if self.embedding_function is not None:
                 self.collection = self.client.get_or_create_collection(
-                    name="personabot_interactions",
+                    name=collection_name,
                     embedding_function=self.embedding_function,
                 )
             else:
                 # Sem embedder do lado do cliente (modo degradado)
-                self.collection = self.client.get_or_create_collection(name="personabot_interactions")
+                self.collection = self.client.get_or_create_collection(name=collection_name)
         except Exception:
             # Chroma 1.x (ou validações internas) podem falhar ao receber um objeto de embedding externo
             # Nesses casos, não acoplamos o embedder à coleção e calculamos embeddings no cliente.
             self._supports_collection_embedding = False
-            self.collection = self.client.get_or_create_collection(name="personabot_interactions")
+            self.collection = self.client.get_or_create_collection(name=collection_name)
 
     def _init_embedding_function(self) -> Optional[Any]:
-        """Tenta inicializar embeddings locais (sentence-transformers) e, se falhar,
-        usa OpenAIEmbeddings (requer OPENAI_API_KEY). Caso contrário, retorna None.
-        """
-        # Garante que o .env seja carregado, mesmo quando usado fora do main
-        try:
-            load_dotenv(find_dotenv(usecwd=True), override=False)
-        except Exception:
-            pass
-        # Preferência: modelo local via sentence-transformers (recomendado para privacidade/custo)
-        # 1) Tenta o pacote recomendado sem warnings de depreciação
-        try:
-            from langchain_huggingface import HuggingFaceEmbeddings
-
-            return HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-        except Exception:
-            pass
-
-        # 2) Fallback para a implementação antiga do LangChain Community
-        try:
-            from langchain_community.embeddings import SentenceTransformerEmbeddings
-            return SentenceTransformerEmbeddings(model_name="all-MiniLM-L6-v2")
-        except Exception:
-            pass
-
-        # Fallback: OpenAI Embeddings
-        try:
-            if os.getenv("OPENAI_API_KEY"):
-                from langchain_openai import OpenAIEmbeddings
-
-                return OpenAIEmbeddings()
-        except Exception:
-            pass
-
-        # Sem embedder disponível (modo somente texto, não recomendado)
-        return None
+        """Retorna o embedder compartilhado do processo (carregado uma única vez)."""
+        return get_shared_embedding_function()
 
     def _ensure_embeddings_for_add(self, texts: list[str]) -> Optional[list[list[float]]]:
         """Para Chroma 1.x (sem embedder na coleção), calcula embeddings no cliente.
@@ -87,8 +318,30 @@ class RAGService:
             return self.embedding_function.embed_documents(texts)
         return None
 
-    def store_interaction(self, interaction_id: str, text: str, metadata: dict):
-        """Armazena uma interação (pergunta ou resposta) no ChromaDB."""
+    def _embedding_model_name(self) -> str:
+        emb = self.embedding_function
+        return str(getattr(emb, "model_name", None) or getattr(emb, "model", None) or type(emb).__name__)
+
+    def _embed_query(self, query_text: str) -> list[float]:
+        """Embedding da consulta, reutilizando o cache do processo quando possível."""
+        cache = get_shared_embedding_cache()
+        model = self._embedding_model_name()
+        if cache is not None:
+            cached = cache.get(model, query_text)
+            if cached is not None:
+                return cached
+        qvec = self.embedding_function.embed_query(query_text)
+        if cache is not None:
+            cache.set(model, query_text, qvec)
+        return qvec
+
+    def store_interaction(self, interaction_id: str, text: str, metadata: Optional[dict] = None):
+        """Armazena uma interação (pergunta ou resposta) no ChromaDB.
+
+        `metadata` segue o esquema de `interaction_metadata` (persona, user, channel, kind,
+        timestamp); o `timestamp` é normalizado para epoch para permitir filtros de período.
+        """
+        metadata = interaction_metadata(**(metadata or {}))
         add_kwargs = {}
         if not self._supports_collection_embedding:
             vectors = self._ensure_embeddings_for_add([text])
@@ -102,22 +355,197 @@ class RAGService:
             **add_kwargs,
         )
 
-    def search_similar_interactions(self, query_text: str, n_results: int = 3) -> list:
-        """Busca por interações similares no banco de dados (usa embeddings no cliente quando necessário)."""
-        if not self._supports_collection_embedding:
+    def _existing_ids(self, ids: list[str]) -> set[str]:
+        try:
+            return set(self.collection.get(ids=ids, include=[]).get("ids", []))
+        except Exception:
+            return set()
+
+    def store_interactions(
+        self,
+        interactions: Iterable[dict],
+        batch_size: int = 64,
+        write_chunk_size: int = 1000,
+        skip_existing: bool = True,
+    ) -> dict:
+        """Armazena interações em lote (backfill).
+
+        Cada item é um dicionário com `id`, `text` e, opcionalmente, `metadata`. O iterável é
+        consumido em lotes de `batch_size`: ids repetidos (no próprio lote, já vistos ou já
+        existentes na coleção) são ignorados e os textos restantes são vetorizados numa única
+        chamada. Os vetores se acumulam num buffer de escrita, gravado com `collection.add`
+        a cada `write_chunk_size` documentos (e o restante ao final), independentemente do
+        tamanho do lote do embedder.
+
+        Retorna estatísticas da ingestão (inclui `docs_per_sec` e `writes`).
+        """
+        batch_size = max(1, batch_size)
+        try:
+            max_write = int(self.client.get_max_batch_size())
+        except Exception:
+            max_write = write_chunk_size
+        write_chunk_size = max(1, min(write_chunk_size, max_write))
+
+        stats = {
+            "received": 0, "stored": 0, "skipped_existing": 0, "skipped_duplicate": 0, "invalid": 0, "writes": 0,
+        }
+        seen: set[str] = set()
+        started = time.perf_counter()
+        # Buffer de escrita: documentos já vetorizados aguardando o próximo `collection.add`
+        buffer: list[dict] = []
+        buffer_vectors: Optional[list] = None if self._supports_collection_embedding else []
+
+        def _write(count: int) -> None:
+            nonlocal buffer, buffer_vectors
+            chunk, buffer = buffer[:count], buffer[count:]
+            add_kwargs = {}
+            if buffer_vectors:
+                add_kwargs["embeddings"] = buffer_vectors[:count]
+                buffer_vectors = buffer_vectors[count:]
+            self.collection.add(
+                ids=[item["id"] for item in chunk],
+                documents=[item["text"] for item in chunk],
+                # Chroma 1.x rejeita metadados vazios ({}); None é aceito
+                metadatas=[item.get("metadata") or None for item in chunk],
+                **add_kwargs,
+            )
+            stats["writes"] += 1
+            stats["stored"] += len(chunk)
+
+        def _embed(batch: list[dict]) -> None:
+            nonlocal buffer_vectors
+            ids = [item["id"] for item in batch]
+            if skip_existing:
+                existing = self._existing_ids(ids)
+                if existing:
+                    stats["skipped_existing"] += len(existing)
+                    batch = [item for item in batch if item["id"] not in existing]
+            if not batch:
+                return
+            if buffer_vectors is not None:
+                vectors = self._ensure_embeddings_for_add([item["text"] for item in batch])
+                if vectors is None:
+                    buffer_vectors = None  # sem embedder no cliente: o Chroma vetoriza
+                else:
+                    buffer_vectors.extend(vectors)
+            buffer.extend(batch)
+            while len(buffer) >= write_chunk_size:
+                _write(write_chunk_size)
+
+        pending: list[dict] = []
+        for item in interactions:
+            stats["received"] += 1
+            if not isinstance(item, dict) or not item.get("id") or not isinstance(item.get("text"), str):
+                stats["invalid"] += 1
+                continue
+            # Todo item passa pelo esquema (com ou sem metadados): sempre há `timestamp`
+            try:
+                metadata = interaction_metadata(**(item.get("metadata") or {}))
+            except (TypeError, ValueError):
+                stats["invalid"] += 1
+                continue
+            item_id = str(item["id"])
+            if item_id in seen:
+                stats["skipped_duplicate"] += 1
+                continue
+            seen.add(item_id)
+            pending.append({"id": item_id, "text": item["text"], "metadata": metadata})
+            if len(pending) >= batch_size:
+                _embed(pending)
+                pending = []
+        if pending:
+            _embed(pending)
+        if buffer:
+            _write(len(buffer))
+
+        elapsed = time.perf_counter() - started
+        stats["seconds"] = round(elapsed, 3)
+        stats["docs_per_sec"] = round(stats["stored"] / elapsed, 2) if elapsed > 0 else None
+        return stats
+
+    def search_interactions(
+        self,
+        query_text: str,
+        n_results: int = 3,
+        max_distance: Optional[float] = None,
+        spread: Optional[float] = None,
+        persona: Optional[str] = None,
+        user: Optional[str] = None,
+        channel: Optional[str] = None,
+        since: Any = None,
+        until: Any = None,
+        where: Optional[dict] = None,
+    ) -> list[InteractionHit]:
+        """Busca por interações similares com id, distância e metadados de cada resultado.
+
+        Sempre que o embedder expõe `embed_query`, a consulta é vetorizada no cliente para
+        aproveitar o cache de embeddings (pergunta repetida não passa pelo encoder de novo).
+
+        `persona`, `user`, `channel` e o período `since`/`until` (epoch, `datetime` ou ISO)
+        viram um filtro `where` executado pelo próprio Chroma, antes do ranking: os
+        `n_results` vizinhos já saem do subconjunto filtrado.
+
+        `n_results` é o máximo; a quantidade devolvida se adapta à relevância:
+        - `max_distance`: descarta resultados mais distantes que o corte (na métrica da
+          coleção; `l2` do Chroma por padrão). Sem nada relevante, retorna lista vazia.
+        - `spread`: descarta resultados mais distantes que `melhor + spread`, para não
+          completar o top-n com vizinhos bem piores que o primeiro.
+        """
+        query_kwargs: dict = {"n_results": n_results, "include": ["documents", "distances", "metadatas"]}
+        filters = build_where(persona, user, channel, since, until, where)
+        if filters is not None:
+            query_kwargs["where"] = filters
+        if self.embedding_function is not None and hasattr(self.embedding_function, "embed_query"):
+            qvec = self._embed_query(query_text)
+            results = self.collection.query(query_embeddings=[qvec], **query_kwargs)
+        elif not self._supports_collection_embedding:
             if self.embedding_function is None:
                 raise RuntimeError(
                     "RAG indisponível: instale 'sentence-transformers' ou defina OPENAI_API_KEY para usar OpenAIEmbeddings."
                 )
-            # Preferir consulta com embeddings para compatibilidade com Chroma 1.x
-            if hasattr(self.embedding_function, "embed_query"):
-                qvec = self.embedding_function.embed_query(query_text)
-                results = self.collection.query(query_embeddings=[qvec], n_results=n_results)
-            else:
-                # Fallback extremo (não recomendado): tentar por texto
-                results = self.collection.query(query_texts=[query_text], n_results=n_results)
+            # Fallback extremo (não recomendado): tentar por texto
+            results = self.collection.query(query_texts=[query_text], **query_kwargs)
         else:
             # Versões antigas do Chroma aceitam query_texts com embedder acoplado à coleção
-            results = self.collection.query(query_texts=[query_text], n_results=n_results)
+            results = self.collection.query(query_texts=[query_text], **query_kwargs)
+
+        def _first(key: str) -> list:
+            values = results.get(key) or [[]]
+            return values[0] or []
+
+        ids, documents = _first("ids"), _first("documents")
+        distances, metadatas = _first("distances"), _first("metadatas")
+        hits = [
+            InteractionHit(
+                id=ids[i],
+                text=documents[i],
+                distance=float(distances[i]) if i < len(distances) else None,
+                metadata=(metadatas[i] if i < len(metadatas) else None) or {},
+            )
+            for i in range(len(ids))
+        ]
+        if max_distance is not None:
+            hits = [h for h in hits if h.distance is not None and h.distance <= max_distance]
+        if spread is not None and hits and hits[0].distance is not None:
+            limit = hits[0].distance + spread
+            hits = [h for h in hits if h.distance is not None and h.distance <= limit]
+        return hits
+
+    def search_similar_interactions(self, query_text: str, n_results: int = 3, **kwargs: Any) -> list:
+        """Textos das interações similares; aceita os mesmos filtros e cortes de `search_interactions`."""
+        return [hit.text for hit in self.search_interactions(query_text, n_results=n_results, **kwargs)]
+
+
+_shared_service: dict[str, RAGService] = {}
+
 
-        return results.get("documents", [[]])[0]
+def get_shared_rag_service() -> RAGService:
+    """`RAGService` único do processo (busca de contexto fora dos AgentManagers)."""
+    with _shared_lock:
+        service = _shared_service.get("default")
+    if service is None:
+        # Construído fora do lock: o __init__ usa os handles compartilhados (mesmo lock)
+        service = RAGService()
+        with _shared_lock:
+            service = _shared_service.setdefault("default", service)
+    return service
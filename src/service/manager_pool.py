@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterator, Optional, Tuple
+
+from src.agents.agent_manager import AgentManager
+from src.config_loader import load_persona_config
+from src.utils.metrics import Histogram
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+class PoolTimeout(RuntimeError):
+    """Nenhum AgentManager ficou disponível dentro do tempo limite."""
+
+
+class AgentManagerPool:
+    """Pool thread-safe de `AgentManager` pré-aquecidos.
+
+    Cada manager mantém seu LLM e o `RAGService` (que por sua vez usa o cliente Chroma e o
+    embedder compartilhados do processo). O pool cresce sob demanda até `max_size` e
+    reaproveita os managers devolvidos (LIFO, para manter os mais "quentes" em uso).
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], AgentManager],
+        max_size: int = 4,
+        checkout_timeout: Optional[float] = 30.0,
+    ):
+        self._factory = factory
+        self.max_size = max(1, max_size)
+        self.checkout_timeout = checkout_timeout
+        self._idle: "queue.LifoQueue[AgentManager]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        # Corrotinas em `acquire_async` esperando uma devolução (ou vaga liberada)
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]] = deque()
+        self.checkouts = 0
+        self.checkout_wait = Histogram()
+        self.warmup_time = Histogram()
+
+    def _create(self) -> AgentManager:
+        started = time.perf_counter()
+        manager = self._factory()
+        self.warmup_time.observe(time.perf_counter() - started)
+        return manager
+
+    def warmup(self, count: Optional[int] = None) -> int:
+        """Cria managers até `count` (padrão: `max_size`) e os deixa ociosos no pool."""
+        target = min(self.max_size, count if count is not None else self.max_size)
+        created = 0
+        while True:
+            with self._lock:
+                if self._created >= target:
+                    break
+                self._created += 1
+            try:
+                self._idle.put(self._create())
+                created += 1
+            except Exception:
+                self._unreserve()
+                raise
+        return created
+
+    def _reserve(self) -> bool:
+        """Reserva uma vaga para um manager novo; False se o pool já está em `max_size`."""
+        with self._lock:
+            if self._created >= self.max_size:
+                return False
+            self._created += 1
+            return True
+
+    def _unreserve(self) -> None:
+        with self._lock:
+            self._created -= 1
+        self._wake_one()
+
+    def _take_idle(self) -> Optional[AgentManager]:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _try_acquire(self) -> Optional[AgentManager]:
+        """Pega um manager ocioso ou cria um novo (se abaixo de `max_size`); None se esgotado."""
+        manager = self._take_idle()
+        if manager is not None or not self._reserve():
+            return manager
+        try:
+            return self._create()
+        except Exception:
+            self._unreserve()
+            raise
+
+    def _wake_one(self) -> None:
+        """Acorda a próxima corrotina em espera (chamável de qualquer thread)."""
+        with self._lock:
+            while self._waiters:
+                loop, waiter = self._waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(self._notify, waiter)
+                    return
+                except RuntimeError:  # loop já fechado
+                    continue
+
+    def _notify(self, waiter: "asyncio.Future[None]") -> None:
+        # Roda no loop da corrotina; se ela já desistiu, o aviso passa para a próxima
+        if waiter.done():
+            self._wake_one()
+        else:
+            waiter.set_result(None)
+
+    def _adopt(self, creation: "asyncio.Future[AgentManager]") -> None:
+        """Manager criado para uma espera cancelada: vai para o pool em vez de se perder."""
+        if creation.cancelled() or creation.exception() is not None:
+            self._unreserve()
+        else:
+            self._idle.put(creation.result())
+            self._wake_one()
+
+    async def _create_async(self) -> AgentManager:
+        """Cria o manager (LLM, RAG, encoder) numa thread, fora do event loop."""
+        creation = asyncio.ensure_future(asyncio.to_thread(self._create))
+        try:
+            return await asyncio.shield(creation)
+        except asyncio.CancelledError:
+            creation.add_done_callback(self._adopt)
+            raise
+        except BaseException:
+            self._unreserve()
+            raise
+
+    def _record_checkout(self, started: float) -> None:
+        self.checkout_wait.observe(time.perf_counter() - started)
+        with self._lock:
+            self._in_use += 1
+            self.checkouts += 1
+
+    def acquire(self, timeout: Optional[float] = None) -> AgentManager:
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.perf_counter()
+        manager = self._try_acquire()
+        if manager is None:
+            try:
+                manager = self._idle.get(timeout=timeout)
+            except queue.Empty:
+                raise PoolTimeout(
+                    f"Nenhum AgentManager disponível após {timeout}s (max_size={self.max_size})."
+                )
+        self._record_checkout(started)
+        return manager
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> AgentManager:
+        """Versão para o event loop: espera por um manager sem bloquear a thread do loop."""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        while True:
+            # Registra a espera antes de olhar o pool: uma devolução no meio não se perde
+            waiter: "asyncio.Future[None]" = loop.create_future()
+            with self._lock:
+                self._waiters.append((loop, waiter))
+            try:
+                manager = self._take_idle()
+                if manager is None and self._reserve():
+                    manager = await self._create_async()
+                    # Acordada durante a criação: o manager devolvido fica para a próxima
+                    if waiter.done() and self._idle.qsize() > 0:
+                        self._wake_one()
+                if manager is not None:
+                    self._record_checkout(started)
+                    return manager
+                remaining = None if timeout is None else timeout - (time.perf_counter() - started)
+                if remaining is not None and remaining <= 0:
+                    raise PoolTimeout(
+                        f"Nenhum AgentManager disponível após {timeout}s (max_size={self.max_size})."
+                    )
+                try:
+                    await asyncio.wait_for(waiter, remaining)
+                except asyncio.TimeoutError:
+                    pass
+            except BaseException:
+                # Desistindo (tempo esgotado, cancelamento, falha ao criar) depois de acordada
+                if waiter.done() and not waiter.cancelled():
+                    self._wake_one()
+                raise
+            finally:
+                with self._lock:
+                    try:
+                        self._waiters.remove((loop, waiter))
+                    except ValueError:
+                        pass
+                # Um aviso ainda a caminho desta espera encontra-a encerrada e é repassado
+                waiter.cancel()
+
+    def release(self, manager: AgentManager) -> None:
+        with self._lock:
+            self._in_use -= 1
+        self._idle.put(manager)
+        self._wake_one()
+
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = None) -> Iterator[AgentManager]:
+        manager = self.acquire(timeout)
+        try:
+            yield manager
+        finally:
+            self.release(manager)
+
+    @asynccontextmanager
+    async def acheckout(self, timeout: Optional[float] = None) -> AsyncIterator[AgentManager]:
+        manager = await self.acquire_async(timeout)
+        try:
+            yield manager
+        finally:
+            self.release(manager)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            created, in_use, checkouts = self._created, self._in_use, self.checkouts
+        return {
+            "max_size": self.max_size,
+            "size": created,
+            "in_use": in_use,
+            "idle": self._idle.qsize(),
+            "checkouts": checkouts,
+            "checkout_wait_seconds": self.checkout_wait.snapshot(),
+            "warmup_seconds": self.warmup_time.snapshot(),
+        }
+
+
+# Registro de pools por persona, indexado pelo hash do conteúdo da persona: editar o YAML
+# gera uma nova chave, então managers com persona desatualizada nunca são reutilizados.
+_MAX_POOLS = 16
+_pools: "OrderedDict[str, AgentManagerPool]" = OrderedDict()
+_pools_lock = threading.Lock()
+
+
+def persona_key(persona: dict) -> str:
+    """Chave estável para uma persona (hash do conteúdo)."""
+    raw = json.dumps(persona, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def get_pool(persona: Optional[dict] = None) -> AgentManagerPool:
+    """Retorna (criando se necessário) o pool de managers para a persona informada.
+
+    Sem persona, usa o conteúdo atual de `config/persona.yaml`. Mantém no máximo
+    `_MAX_POOLS` pools (LRU).
+    """
+    if persona is None:
+        persona = load_persona_config()
+    key = persona_key(persona)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is not None:
+            _pools.move_to_end(key)
+            return pool
+        pool = AgentManagerPool(
+            factory=lambda: AgentManager(persona_config=persona),
+            max_size=_env_int("AGENT_POOL_SIZE", 4),
+        )
+        _pools[key] = pool
+        while len(_pools) > _MAX_POOLS:
+            _pools.popitem(last=False)
+        return pool
+
+
+def warm_default_pool() -> AgentManagerPool:
+    """Pré-aquece o pool padrão (usado no startup da API)."""
+    pool = get_pool()
+    pool.warmup(_env_int("AGENT_POOL_WARMUP", pool.max_size))
+    return pool
+
+
+def pool_stats() -> Dict[str, Any]:
+    with _pools_lock:
+        items = list(_pools.items())
+    return {key: pool.stats() for key, pool in items}
@@ -1,7 +1,19 @@
 from __future__ import annotations
 
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
 from crewai import Crew, Process
-from src.agents.agent_manager import AgentManager
+from src.agents.agent_manager import AgentManager, llm_settings, response_mode
+from src.config_loader import load_persona_config
+from src.rag.rag_service import get_shared_rag_service, rag_search_settings
+from src.service.manager_pool import get_pool
+from src.service.response_cache import get_response_cache, make_response_key
+from src.service.semantic_cache import get_semantic_cache
+from src.service.single_flight import get_single_flight
 
 
 def is_safe_to_respond(question: str) -> bool:
@@ -11,69 +23,473 @@ def is_safe_to_respond(question: str) -> bool:
     return not any(w in lower for w in blocked_words)
 
 
-def run_single_interaction(question: str) -> str:
-    """Executa uma interação única com a Crew e retorna o texto final."""
-    if not is_safe_to_respond(question):
-        return "Desculpe, não posso responder a esse tipo de pergunta."
+# Nome de cada etapa da Crew, na ordem de `AgentManager.create_tasks`
+CREW_STAGES = ("context", "persona", "response")
+BLOCKED_ANSWER = "Desculpe, não posso responder a esse tipo de pergunta."
+
+
+def _search_context(question: str, persona: dict | None = None) -> List[str]:
+    """Interações passadas relevantes para a pergunta (lista vazia se o RAG falhar ou se
+    nada passar do corte de relevância).
+
+    Com `RAG_SCOPE_PERSONA=true`, só busca na memória da própria persona (metadado
+    `persona` = nome da persona), filtrado dentro do Chroma.
+    """
+    scoped = os.getenv("RAG_SCOPE_PERSONA", "false").strip().lower() in ("1", "true", "yes")
+    filters = {"persona": persona.get("name")} if scoped and persona else {}
+    try:
+        # Trechos pouco relevantes ficam de fora (`RAG_MAX_DISTANCE`/`RAG_SPREAD`): menos tokens no prompt
+        return get_shared_rag_service().search_similar_interactions(question, **rag_search_settings(), **filters)
+    except Exception:
+        return []
+
+
+@dataclass
+class _Prepared:
+    """Pergunta com persona resolvida, contexto do RAG e consulta ao cache de respostas."""
+
+    question: str
+    persona: dict
+    context: List[str]
+    mode: str
+    # parâmetros do LLM + modo de geração (entram nas chaves dos caches)
+    settings: Dict[str, Any]
+    cache_key: Optional[str] = None
+    cached: Optional[str] = None
+    # False quando há contexto externo: a resposta não vale para paráfrases soltas
+    semantic: bool = True
+
+
+def _prepare(
+    question: str, persona: dict | None, mode: str | None = None, extra_context: Optional[List[str]] = None
+) -> _Prepared:
+    persona = persona if persona is not None else load_persona_config()
+    # Contexto externo (ex.: thread do tweet) vem antes do RAG e entra na chave do cache
+    context = list(extra_context or []) + _search_context(question, persona)
+    mode = response_mode(mode)
+    settings = {**llm_settings(), "mode": mode}
+    prepared = _Prepared(question, persona, context, mode, settings, semantic=not extra_context)
+    # A chave também identifica gerações idênticas em andamento (single-flight)
+    prepared.cache_key = make_response_key(question, persona, settings, context)
+    cache = get_response_cache()
+    if cache is not None:
+        prepared.cached = cache.get(prepared.cache_key)
+    # Sem acerto exato: tenta uma pergunta equivalente (paráfrase) já respondida; com
+    # contexto externo a mesma pergunta pode pedir outra resposta, então não vale
+    semantic = get_semantic_cache()
+    if prepared.cached is None and semantic is not None and prepared.semantic:
+        try:
+            hit = semantic.lookup(question, persona, settings)
+        except Exception as e:
+            # Sem o cache semântico a pergunta só segue para a geração
+            semantic.errors += 1
+            print(f"AVISO: falha ao consultar o cache semântico: {e}")
+            hit = None
+        if hit is not None:
+            prepared.cached = hit[0]
+    return prepared
+
 
-    manager = AgentManager()
+def _remember(prepared: _Prepared, answer: Any) -> None:
+    if not isinstance(answer, str) or not answer.strip():
+        return
+    cache = get_response_cache()
+    if cache is not None and prepared.cache_key:
+        cache.set(prepared.cache_key, answer)
+    semantic = get_semantic_cache()
+    if semantic is not None and prepared.semantic:
+        try:
+            semantic.store(prepared.question, prepared.persona, prepared.settings, answer)
+        except Exception as e:
+            semantic.errors += 1
+            print(f"AVISO: falha ao gravar no cache semântico: {e}")
+
+
+def _build_crew(manager: AgentManager, question: str, context: List[str], stream: bool = False) -> Crew:
+    """Monta a Crew com os agentes do manager e injeta a pergunta + contexto do RAG."""
     memory_agent = manager.create_memory_agent()
     persona_agent = manager.create_persona_agent()
     response_agent = manager.create_response_agent()
     tasks = manager.create_tasks(memory_agent, persona_agent, response_agent)
 
     # injeta a pergunta e contexto do RAG na primeira task
-    try:
-        similar = manager.rag_service.search_similar_interactions(question, n_results=5)
-    except Exception:
-        similar = []
-    rag_snippets = "\n- " + "\n- ".join(similar) if similar else "\n- (nenhum contexto relevante)"
+    rag_snippets = "\n- " + "\n- ".join(context) if context else "\n- (nenhum contexto relevante)"
     tasks[0].description = (
         f'A pergunta do usuário é: "{question}". '
         'Busque no RAG por interações passadas que sejam relevantes para essa pergunta.'
         f"\nContexto do RAG (se houver):{rag_snippets}"
     )
 
-    crew = Crew(
+    kwargs: Dict[str, Any] = {}
+    if stream:
+        kwargs["stream"] = True
+    return Crew(
         agents=[memory_agent, persona_agent, response_agent],
         tasks=tasks,
         process=Process.sequential,
         verbose=False,
+        **kwargs,
     )
 
-    result = crew.kickoff()
+
+def _run_crew(manager: AgentManager, question: str, context: List[str]) -> str:
+    """Executa a Crew completa e retorna o texto final."""
+    result = _build_crew(manager, question, context).kickoff()
     # CrewOutput tem .raw; fallback ao próprio objeto (tests já cobrem)
     return getattr(result, "raw", result)
 
 
-def run_single_interaction_with_persona(question: str, persona: dict) -> str:
-    """Executa uma interação usando uma persona específica (override)."""
+def _generate(manager: AgentManager, prepared: _Prepared) -> str:
+    """Gera a resposta no modo escolhido: Crew completa (`quality`) ou chamada única (`fast`)."""
+    if prepared.mode == "fast":
+        return manager.run_fast_path(prepared.question, prepared.context)
+    return _run_crew(manager, prepared.question, prepared.context)
+
+
+class _FinalAnswerFilter:
+    """Remove o preâmbulo ReAct ("Thought: ... Final Answer:") dos tokens da última etapa.
+
+    Se a saída não começa com "Thought", os tokens passam direto; caso contrário, são
+    retidos até o marcador "Final Answer:" aparecer.
+    """
+
+    MARKER = "Final Answer:"
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._passthrough = False
+
+    def feed(self, text: str) -> str:
+        if self._passthrough:
+            return text
+        self._buffer += text
+        head = self._buffer.lstrip()
+        idx = self._buffer.find(self.MARKER)
+        if idx >= 0:
+            self._passthrough = True
+            return self._buffer[idx + len(self.MARKER):].lstrip()
+        if len(head) >= len("Thought") and not head.startswith("Thought"):
+            self._passthrough = True
+            return self._buffer
+        return ""
+
+
+def _supports_crew_streaming() -> bool:
+    fields = getattr(Crew, "model_fields", {}) or {}
+    return "stream" in fields
+
+
+class _StreamTracker:
+    """Converte chunks do CrewStreamingOutput em eventos (`stage`, `token`, `done`)."""
+
+    def __init__(self, started: float, last_index: int):
+        self.started = started
+        self.last_index = last_index
+        self.ttft_ms: float | None = None
+        self._current: int | None = None
+        self._filter = _FinalAnswerFilter()
+        self._parts: list[str] = []
+
+    def on_chunk(self, chunk: Any) -> List[Dict[str, Any]]:
+        events: List[Dict[str, Any]] = []
+        index = getattr(chunk, "task_index", 0)
+        if index != self._current:
+            self._current = index
+            stage = CREW_STAGES[index] if 0 <= index < len(CREW_STAGES) else f"task_{index}"
+            events.append(
+                {"event": "stage", "data": {"stage": stage, "index": index, "agent": getattr(chunk, "agent_role", "")}}
+            )
+        if index == self.last_index:
+            text = self._filter.feed(getattr(chunk, "content", ""))
+            if text:
+                if self.ttft_ms is None:
+                    self.ttft_ms = (time.perf_counter() - self.started) * 1000
+                self._parts.append(text)
+                events.append({"event": "token", "data": {"text": text}})
+        return events
+
+    def on_answer(self, answer: str) -> Dict[str, Any]:
+        """Resposta inteira de uma vez (CrewAI sem streaming)."""
+        self.ttft_ms = (time.perf_counter() - self.started) * 1000
+        self._parts.append(answer)
+        return {"event": "token", "data": {"text": answer}}
+
+    def answer(self, result: Any) -> str:
+        return getattr(result, "raw", None) or "".join(self._parts)
+
+    def done(self, answer: str, cached: bool = False, coalesced: bool = False) -> Dict[str, Any]:
+        return {
+            "event": "done",
+            "data": {
+                "answer": answer,
+                "elapsed_ms": round((time.perf_counter() - self.started) * 1000, 1),
+                "ttft_ms": round(self.ttft_ms, 1) if self.ttft_ms is not None else None,
+                "cached": cached,
+                "coalesced": coalesced,
+            },
+        }
+
+
+def _blocked_events() -> List[Dict[str, Any]]:
+    return [
+        {"event": "token", "data": {"text": BLOCKED_ANSWER}},
+        {
+            "event": "done",
+            "data": {"answer": BLOCKED_ANSWER, "elapsed_ms": 0.0, "ttft_ms": 0.0, "cached": False, "coalesced": False},
+        },
+    ]
+
+
+def _answer_events(started: float, answer: str, cached: bool = False, coalesced: bool = False) -> List[Dict[str, Any]]:
+    """Resposta pronta (cache ou geração compartilhada) como `token` + `done`."""
+    tracker = _StreamTracker(started, len(CREW_STAGES) - 1)
+    return [tracker.on_answer(answer), tracker.done(answer, cached=cached, coalesced=coalesced)]
+
+
+def stream_interaction(
+    question: str, persona: dict | None = None, mode: str | None = None
+) -> Iterator[Dict[str, Any]]:
+    """Executa uma interação emitindo eventos incrementais.
+
+    Eventos (dicionários com `event` e `data`):
+    - `stage`: início de cada etapa (`rag`, `context`, `persona`, `response`; `fast` no modo rápido);
+    - `token`: trecho da resposta final, conforme o LLM gera;
+    - `done`: resposta completa, tempo total, tempo até o primeiro token (ms) e se veio do
+      cache ou de uma geração idêntica já em andamento (`coalesced`).
+
+    Se a versão do CrewAI não suportar streaming, a resposta final é emitida de uma vez.
+    """
+    started = time.perf_counter()
     if not is_safe_to_respond(question):
-        return "Desculpe, não posso responder a esse tipo de pergunta."
+        yield from _blocked_events()
+        return
 
-    manager = AgentManager(persona_config=persona)
-    memory_agent = manager.create_memory_agent()
-    persona_agent = manager.create_persona_agent()
-    response_agent = manager.create_response_agent()
-    tasks = manager.create_tasks(memory_agent, persona_agent, response_agent)
+    yield {"event": "stage", "data": {"stage": "rag", "index": -1}}
+    prepared = _prepare(question, persona, mode)
+    if prepared.cached is not None:
+        yield from _answer_events(started, prepared.cached, cached=True)
+        return
 
+    flight = get_single_flight()
+    if flight is None:
+        yield from _stream_generate(prepared, started)
+        return
+    call, leader = flight.join(prepared.cache_key)
+    if not leader:
+        yield from _answer_events(started, call.result(), coalesced=True)
+        return
+    answer, error = None, None
     try:
-        similar = manager.rag_service.search_similar_interactions(question, n_results=5)
-    except Exception:
-        similar = []
-    rag_snippets = "\n- " + "\n- ".join(similar) if similar else "\n- (nenhum contexto relevante)"
-    tasks[0].description = (
-        f'A pergunta do usuário é: "{question}". '
-        'Busque no RAG por interações passadas que sejam relevantes para essa pergunta.'
-        f"\nContexto do RAG (se houver):{rag_snippets}"
-    )
+        for ev in _stream_generate(prepared, started):
+            if ev["event"] == "done":
+                answer = ev["data"]["answer"]
+            yield ev
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        flight.finish(prepared.cache_key, call, answer, error)
 
-    crew = Crew(
-        agents=[memory_agent, persona_agent, response_agent],
-        tasks=tasks,
-        process=Process.sequential,
-        verbose=False,
-    )
 
-    result = crew.kickoff()
+def _stream_generate(prepared: _Prepared, started: float) -> Iterator[Dict[str, Any]]:
+    question = prepared.question
+    if prepared.mode == "fast":
+        tracker = _StreamTracker(started, 0)
+        yield {"event": "stage", "data": {"stage": "fast", "index": 0}}
+        with get_pool(prepared.persona).checkout() as manager:
+            answer = manager.run_fast_path(question, prepared.context)
+        yield tracker.on_answer(answer)
+        _remember(prepared, answer)
+        yield tracker.done(answer)
+        return
+
+    with get_pool(prepared.persona).checkout() as manager:
+        streaming = _supports_crew_streaming()
+        crew = _build_crew(manager, question, prepared.context, stream=streaming)
+        tracker = _StreamTracker(started, len(crew.tasks) - 1)
+
+        if not streaming:
+            yield {"event": "stage", "data": {"stage": CREW_STAGES[-1], "index": tracker.last_index}}
+            result = crew.kickoff()
+            yield tracker.on_answer(getattr(result, "raw", str(result)))
+        else:
+            # kickoff(stream=True) liga `llm.stream` nos agentes; o LLM é do manager (reutilizado
+            # pelo pool), então o estado original é restaurado ao final.
+            previous = getattr(manager.llm, "stream", False)
+            try:
+                output = crew.kickoff()
+                for chunk in output:
+                    yield from tracker.on_chunk(chunk)
+                result = output.result
+            finally:
+                try:
+                    manager.llm.stream = previous
+                except Exception:
+                    pass
+
+    answer = tracker.answer(result)
+    _remember(prepared, answer)
+    yield tracker.done(answer)
+
+
+async def _kickoff_async(crew: Crew) -> Any:
+    """Usa o kickoff nativamente assíncrono (`akickoff`) quando disponível."""
+    if hasattr(crew, "akickoff"):
+        return await crew.akickoff()
+    return await crew.kickoff_async()
+
+
+async def astream_interaction(
+    question: str, persona: dict | None = None, mode: str | None = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Versão assíncrona de `stream_interaction` (mesmos eventos)."""
+    started = time.perf_counter()
+    if not is_safe_to_respond(question):
+        for ev in _blocked_events():
+            yield ev
+        return
+
+    yield {"event": "stage", "data": {"stage": "rag", "index": -1}}
+    # A busca no RAG (embedder + Chroma) é bloqueante: roda fora do event loop
+    prepared = await asyncio.to_thread(_prepare, question, persona, mode)
+    if prepared.cached is not None:
+        for ev in _answer_events(started, prepared.cached, cached=True):
+            yield ev
+        return
+
+    flight = get_single_flight()
+    if flight is None:
+        async for ev in _astream_generate(prepared, started):
+            yield ev
+        return
+    call, leader = flight.join(prepared.cache_key)
+    if not leader:
+        answer = await asyncio.wrap_future(call)
+        for ev in _answer_events(started, answer, coalesced=True):
+            yield ev
+        return
+    answer, error = None, None
+    try:
+        async for ev in _astream_generate(prepared, started):
+            if ev["event"] == "done":
+                answer = ev["data"]["answer"]
+            yield ev
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        flight.finish(prepared.cache_key, call, answer, error)
+
+
+async def _astream_generate(prepared: _Prepared, started: float) -> AsyncIterator[Dict[str, Any]]:
+    question = prepared.question
+    if prepared.mode == "fast":
+        tracker = _StreamTracker(started, 0)
+        yield {"event": "stage", "data": {"stage": "fast", "index": 0}}
+        async with get_pool(prepared.persona).acheckout() as manager:
+            answer = await manager.arun_fast_path(question, prepared.context)
+        yield tracker.on_answer(answer)
+        await asyncio.to_thread(_remember, prepared, answer)
+        yield tracker.done(answer)
+        return
+
+    async with get_pool(prepared.persona).acheckout() as manager:
+        streaming = _supports_crew_streaming()
+        crew = _build_crew(manager, question, prepared.context, stream=streaming)
+        tracker = _StreamTracker(started, len(crew.tasks) - 1)
+
+        if not streaming:
+            yield {"event": "stage", "data": {"stage": CREW_STAGES[-1], "index": tracker.last_index}}
+            result = await _kickoff_async(crew)
+            yield tracker.on_answer(getattr(result, "raw", str(result)))
+        else:
+            previous = getattr(manager.llm, "stream", False)
+            try:
+                output = await _kickoff_async(crew)
+                async for chunk in output:
+                    for ev in tracker.on_chunk(chunk):
+                        yield ev
+                result = output.result
+            finally:
+                try:
+                    manager.llm.stream = previous
+                except Exception:
+                    pass
+
+    answer = tracker.answer(result)
+    # Cache em SQLite e, com o cache semântico, encoder + Chroma: fora do event loop
+    await asyncio.to_thread(_remember, prepared, answer)
+    yield tracker.done(answer)
+
+
+def _answer(
+    question: str, persona: dict | None, mode: str | None = None, extra_context: Optional[List[str]] = None
+) -> str:
+    if not is_safe_to_respond(question):
+        return BLOCKED_ANSWER
+
+    prepared = _prepare(question, persona, mode, extra_context)
+    if prepared.cached is not None:
+        return prepared.cached
+
+    def _work() -> str:
+        # Reutiliza um AgentManager pré-aquecido (RAG/embedder já carregados)
+        with get_pool(prepared.persona).checkout() as manager:
+            answer = _generate(manager, prepared)
+        _remember(prepared, answer)
+        return answer
+
+    flight = get_single_flight()
+    # Perguntas idênticas simultâneas aguardam a mesma execução em vez de rodar a Crew de novo
+    return flight.do(prepared.cache_key, _work) if flight is not None else _work()
+
+
+async def _agenerate(manager: AgentManager, prepared: _Prepared) -> str:
+    if prepared.mode == "fast":
+        return await manager.arun_fast_path(prepared.question, prepared.context)
+    result = await _kickoff_async(_build_crew(manager, prepared.question, prepared.context))
     return getattr(result, "raw", result)
+
+
+async def _aanswer(question: str, persona: dict | None, mode: str | None = None) -> str:
+    if not is_safe_to_respond(question):
+        return BLOCKED_ANSWER
+
+    prepared = await asyncio.to_thread(_prepare, question, persona, mode)
+    if prepared.cached is not None:
+        return prepared.cached
+
+    async def _work() -> str:
+        async with get_pool(prepared.persona).acheckout() as manager:
+            answer = await _agenerate(manager, prepared)
+        await asyncio.to_thread(_remember, prepared, answer)
+        return answer
+
+    flight = get_single_flight()
+    return await flight.ado(prepared.cache_key, _work) if flight is not None else await _work()
+
+
+def run_single_interaction(
+    question: str, mode: str | None = None, extra_context: Optional[List[str]] = None
+) -> str:
+    """Executa uma interação única com a Crew e retorna o texto final.
+
+    `mode`: `quality` (Crew completa) ou `fast` (uma chamada); padrão via `RESPONSE_MODE`.
+    `extra_context`: trechos somados ao contexto do RAG (ex.: a thread de uma menção).
+    """
+    return _answer(question, None, mode, extra_context)
+
+
+def run_single_interaction_with_persona(question: str, persona: dict, mode: str | None = None) -> str:
+    """Executa uma interação usando uma persona específica (override)."""
+    return _answer(question, persona, mode)
+
+
+async def arun_single_interaction(question: str, mode: str | None = None) -> str:
+    """Versão assíncrona de `run_single_interaction` (não ocupa uma thread durante o LLM)."""
+    return await _aanswer(question, None, mode)
+
+
+async def arun_single_interaction_with_persona(question: str, persona: dict, mode: str | None = None) -> str:
+    """Versão assíncrona de `run_single_interaction_with_persona`."""
+    return await _aanswer(question, persona, mode)
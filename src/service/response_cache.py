@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Protocol
+
+from src.utils.lru import LRUCache
+
+
+# Incrementar quando prompts/tarefas mudarem de forma que invalide respostas antigas
+KEY_VERSION = 1
+_WS = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """Normaliza a pergunta para a chave (NFC, casefold, espaços colapsados)."""
+    return _WS.sub(" ", unicodedata.normalize("NFC", question)).strip().casefold()
+
+
+def make_response_key(
+    question: str,
+    persona: Dict[str, Any],
+    llm_settings: Dict[str, Any],
+    rag_context: list[str],
+) -> str:
+    """Hash de (pergunta normalizada, persona, parâmetros do LLM, contexto do RAG)."""
+    payload = {
+        "v": KEY_VERSION,
+        "q": normalize_question(question),
+        "persona": persona,
+        "llm": llm_settings,
+        "rag": hashlib.sha1("\x1e".join(rag_context).encode("utf-8")).hexdigest(),
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(Protocol):
+    def get(self, key: str) -> Optional[str]: ...
+
+    def set(self, key: str, value: str) -> None: ...
+
+    def stats(self) -> Dict[str, Any]: ...
+
+
+class MemoryResponseCache:
+    """Backend em memória (LRU + TTL)."""
+
+    def __init__(
+        self, max_items: int = 1000, ttl: Optional[float] = 3600, clock: Callable[[], float] = time.monotonic
+    ):
+        self._cache: LRUCache[str] = LRUCache(max_items=max_items, ttl=ttl, clock=clock)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        self._cache.set(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        data = self._cache.stats()
+        data["backend"] = "memory"
+        return data
+
+
+class SQLiteResponseCache:
+    """Backend em disco (SQLite/WAL): sobrevive a reinícios e pode ser compartilhado
+    entre processos (ex.: API web e daemon de menções).
+
+    O limite de tamanho é aplicado descartando as entradas acessadas há mais tempo.
+    """
+
+    def __init__(self, path: Path | str, max_items: int = 10_000, ttl: Optional[float] = 3600):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_items = max_items
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)")
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (row[1] is not None and row[1] <= now):
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            if count > self.max_items:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                    (count - self.max_items,),
+                )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "backend": "sqlite",
+            "path": str(self.path),
+            "items": count,
+            "max_items": self.max_items,
+            "ttl": self.ttl,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+        }
+
+
+_cache_lock = threading.Lock()
+_cache: Dict[str, Optional[ResponseCache]] = {}
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Cache de respostas do processo, conforme `RESPONSE_CACHE_BACKEND` (memory|sqlite|off).
+
+    Outras variáveis: `RESPONSE_CACHE_TTL` (segundos, 0 = sem expiração),
+    `RESPONSE_CACHE_MAX_ITEMS` e `RESPONSE_CACHE_PATH` (backend sqlite).
+    """
+    with _cache_lock:
+        if "default" not in _cache:
+            backend = os.getenv("RESPONSE_CACHE_BACKEND", "memory").strip().lower()
+            try:
+                ttl: Optional[float] = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+            except ValueError:
+                ttl = 3600.0
+            ttl = ttl if ttl and ttl > 0 else None
+            try:
+                max_items = int(os.getenv("RESPONSE_CACHE_MAX_ITEMS", "1000"))
+            except ValueError:
+                max_items = 1000
+            cache: Optional[ResponseCache] = None
+            if backend == "memory":
+                cache = MemoryResponseCache(max_items=max_items, ttl=ttl)
+            elif backend == "sqlite":
+                default_path = Path(__file__).parents[2] / "data" / "response_cache.sqlite"
+                cache = SQLiteResponseCache(
+                    os.getenv("RESPONSE_CACHE_PATH") or default_path, max_items=max_items, ttl=ttl
+                )
+            _cache["default"] = cache
+        return _cache["default"]
+
+
+def response_cache_stats() -> Optional[Dict[str, Any]]:
+    cache = _cache.get("default")
+    return cache.stats() if cache is not None else None
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from src.rag.rag_service import RAGService, get_shared_rag_service
+from src.service.response_cache import normalize_question
+from src.utils.metrics import Histogram
+
+
+# Distribuição das distâncias de cosseno observadas (0 = idêntico, 2 = oposto)
+DISTANCE_BUCKETS = (0.01, 0.02, 0.05, 0.08, 0.1, 0.15, 0.2, 0.3, 0.5, 1.0, 2.0)
+
+
+def _fingerprint(data: Any) -> str:
+    raw = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class SemanticResponseCache:
+    """Cache semântico de respostas sobre o Chroma, uma coleção por persona.
+
+    Cada pergunta respondida é gravada com seu embedding (o mesmo embedder do RAG, com
+    o cache de embeddings do processo) e a resposta em metadados. Uma nova pergunta cuja
+    distância de cosseno até a mais próxima for `<= max_distance` reaproveita a resposta,
+    desde que os parâmetros do LLM coincidam e a entrada não tenha expirado.
+    """
+
+    def __init__(
+        self,
+        rag_service: RAGService,
+        max_distance: float = 0.08,
+        ttl: Optional[float] = 24 * 3600,
+        collection_prefix: str = "semcache",
+    ):
+        self.rag_service = rag_service
+        self.max_distance = max_distance
+        self.ttl = ttl
+        self.collection_prefix = collection_prefix
+        self._collections: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0  # falhas de consulta/gravação (contadas por quem chama)
+        self.distances = Histogram(DISTANCE_BUCKETS)
+
+    def _collection(self, persona: dict) -> Any:
+        key = _fingerprint(persona)
+        with self._lock:
+            col = self._collections.get(key)
+            if col is None:
+                col = self.rag_service.client.get_or_create_collection(
+                    name=f"{self.collection_prefix}_{key}",
+                    metadata={"hnsw:space": "cosine"},
+                )
+                self._collections[key] = col
+            return col
+
+    def lookup(self, question: str, persona: dict, llm_settings: dict) -> Optional[Tuple[str, float]]:
+        """Retorna `(resposta, distância)` da pergunta equivalente mais próxima, ou None."""
+        col = self._collection(persona)
+        where: Dict[str, Any] = {"llm": _fingerprint(llm_settings)}
+        if self.ttl is not None:
+            where = {"$and": [where, {"created_at": {"$gte": time.time() - self.ttl}}]}
+        # Embedding da pergunta original: é o mesmo já calculado (e cacheado) na busca do RAG
+        qvec = self.rag_service._embed_query(question)
+        try:
+            res = col.query(query_embeddings=[qvec], n_results=1, where=where, include=["metadatas", "distances"])
+        except Exception:
+            res = {}
+        distances = (res.get("distances") or [[]])[0]
+        metadatas = (res.get("metadatas") or [[]])[0]
+        if not distances:
+            self._count(hit=False)
+            return None
+        distance = float(distances[0])
+        self.distances.observe(distance)
+        if distance > self.max_distance:
+            self._count(hit=False)
+            return None
+        self._count(hit=True)
+        return metadatas[0]["answer"], distance
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def store(self, question: str, persona: dict, llm_settings: dict, answer: str) -> None:
+        col = self._collection(persona)
+        normalized = normalize_question(question)
+        llm_fp = _fingerprint(llm_settings)
+        doc_id = hashlib.sha1(f"{llm_fp}\0{normalized}".encode("utf-8")).hexdigest()
+        col.upsert(
+            ids=[doc_id],
+            documents=[normalized],
+            embeddings=[self.rag_service._embed_query(question)],
+            metadatas=[{"answer": answer, "llm": llm_fp, "created_at": time.time()}],
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "max_distance": self.max_distance,
+            "ttl": self.ttl,
+            "personas": len(self._collections),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "errors": self.errors,
+            "distance": self.distances.snapshot(),
+        }
+
+
+_semantic_lock = threading.Lock()
+_semantic: Dict[str, Optional[SemanticResponseCache]] = {}
+
+
+def get_semantic_cache() -> Optional[SemanticResponseCache]:
+    """Cache semântico do processo; desativado por padrão (`SEMANTIC_CACHE=true` para ligar).
+
+    Outras variáveis: `SEMANTIC_CACHE_MAX_DISTANCE` (distância de cosseno, padrão 0.08) e
+    `SEMANTIC_CACHE_TTL` (segundos, 0 = sem expiração).
+    """
+    with _semantic_lock:
+        if "default" not in _semantic:
+            cache = None
+            if os.getenv("SEMANTIC_CACHE", "false").strip().lower() in ("1", "true", "yes"):
+                rag = get_shared_rag_service()
+                if rag.embedding_function is not None and hasattr(rag.embedding_function, "embed_query"):
+                    try:
+                        max_distance = float(os.getenv("SEMANTIC_CACHE_MAX_DISTANCE", "0.08"))
+                    except ValueError:
+                        max_distance = 0.08
+                    try:
+                        ttl: Optional[float] = float(os.getenv("SEMANTIC_CACHE_TTL", str(24 * 3600)))
+                    except ValueError:
+                        ttl = 24 * 3600.0
+                    cache = SemanticResponseCache(rag, max_distance=max_distance, ttl=ttl if ttl and ttl > 0 else None)
+                else:
+                    print("AVISO: SEMANTIC_CACHE ativo, mas não há embedder disponível; cache semântico desligado.")
+            _semantic["default"] = cache
+        return _semantic["default"]
+
+
+def semantic_cache_stats() -> Optional[Dict[str, Any]]:
+    cache = _semantic.get("default")
+    return cache.stats() if cache is not None else None
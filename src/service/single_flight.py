@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalescência de chamadas concorrentes com a mesma chave ("single-flight").
+
+    O primeiro chamador de uma chave (líder) executa o trabalho; os demais que chegam
+    enquanto ele está em andamento aguardam e recebem o mesmo resultado (ou a mesma
+    exceção). Funciona entre threads e event loops: a chamada em andamento é um
+    `concurrent.futures.Future`, aguardado com `.result()` ou `asyncio.wrap_future`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def join(self, key: str) -> Tuple[Future, bool]:
+        """Retorna `(chamada, é_líder)`; o líder deve encerrar a chamada com `finish`."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                return call, False
+            call = Future()
+            # "running": cancelar a espera de um seguidor não cancela a chamada compartilhada
+            call.set_running_or_notify_cancel()
+            self._calls[key] = call
+            self.executions += 1
+            return call, True
+
+    def finish(self, key: str, call: Future, result: Any = None, error: BaseException | None = None) -> None:
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        if call.done():
+            return
+        if error is not None:
+            if not isinstance(error, Exception):
+                # GeneratorExit/CancelledError do líder não devem vazar para os seguidores
+                error = RuntimeError("a geração compartilhada foi interrompida")
+            call.set_exception(error)
+        else:
+            call.set_result(result)
+
+    def do(self, key: Optional[str], fn: Callable[[], T]) -> T:
+        """Executa `fn` uma única vez por chave entre chamadores simultâneos."""
+        if key is None:
+            return fn()
+        call, leader = self.join(key)
+        if not leader:
+            return call.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result)
+        return result
+
+    async def ado(self, key: Optional[str], fn: Callable[[], Awaitable[T]]) -> T:
+        """Versão assíncrona de `do`.
+
+        O trabalho do líder roda em uma task própria: se o líder for cancelado (ex.:
+        cliente desconectou), a geração continua para os seguidores.
+        """
+        if key is None:
+            return await fn()
+        call, leader = self.join(key)
+        if not leader:
+            return await asyncio.wrap_future(call)
+        task = asyncio.ensure_future(fn())
+
+        def _done(t: asyncio.Future) -> None:
+            if t.cancelled():
+                self.finish(key, call, error=asyncio.CancelledError())
+            elif t.exception() is not None:
+                self.finish(key, call, error=t.exception())
+            else:
+                self.finish(key, call, t.result())
+
+        task.add_done_callback(_done)
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            inflight = len(self._calls)
+            executions, coalesced = self.executions, self.coalesced
+        total = executions + coalesced
+        return {
+            "inflight": inflight,
+            "executions": executions,
+            "coalesced": coalesced,
+            "coalesce_rate": round(coalesced / total, 4) if total else None,
+        }
+
+
+_flight_lock = threading.Lock()
+_flight: Dict[str, Optional[SingleFlight]] = {}
+
+
+def get_single_flight() -> Optional[SingleFlight]:
+    """Single-flight do processo; `SINGLE_FLIGHT=false` desliga a coalescência."""
+    with _flight_lock:
+        if "default" not in _flight:
+            enabled = os.getenv("SINGLE_FLIGHT", "true").strip().lower() not in ("0", "false", "no")
+            _flight["default"] = SingleFlight() if enabled else None
+        return _flight["default"]
+
+
+def single_flight_stats() -> Optional[Dict[str, Any]]:
+    flight = _flight.get("default")
+    return flight.stats() if flight is not None else None
@@ -3,6 +3,8 @@ from __future__ import annotations
 from typing import Any
 from langchain.tools import BaseTool
 
+from src.rag.rag_service import rag_search_settings
+
 
 class RAGSearchTool(BaseTool):
     """Ferramenta de busca no RAG integrada como LangChain BaseTool."""
@@ -17,7 +19,7 @@ class RAGSearchTool(BaseTool):
 
     def _run(self, query: str) -> str:
         try:
-            docs = self.rag_service.search_similar_interactions(query, n_results=5) or []
+            docs = self.rag_service.search_similar_interactions(query, **rag_search_settings()) or []
             if not docs:
                 return "Nenhum contexto relevante encontrado."
             return "\n".join(f"- {d}" for d in docs)
@@ -0,0 +1,235 @@
+"""Cliente assíncrono do Twitter sobre `tweepy.asynchronous.AsyncClient` (API v2).
+
+Todas as chamadas usam uma única `aiohttp.ClientSession` com keep-alive (o `AsyncClient`
+do tweepy abre e fecha uma sessão por requisição quando nenhuma é fornecida), então um
+só event loop mantém dezenas de buscas, lookups e posts em andamento. As chamadas passam
+pelo mesmo `RateLimitScheduler` do cliente síncrono (`acall`), que também lê os headers
+`x-rate-limit-*` de cada resposta.
+
+Requer `tweepy>=4.10` com o extra `async` (`aiohttp`, `async-lru`).
+
+Uso:
+    async with AsyncTwitterClient() as client:
+        mentions = await client.get_recent_mentions(since_id)
+        await asyncio.gather(*(client.post_reply(text, m.id) for m in mentions))
+
+Código síncrono (o daemon de menções e o `ContextResolver`) usa `AsyncClientThread`,
+que roda o cliente num event loop em thread própria (`python -m src.pipeline.daemon --async`).
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from typing import Any, Callable, Iterable, List, Optional
+
+import aiohttp
+from yarl import URL
+
+from src.twitter.client import (
+    LOOKUP_BATCH_SIZE,
+    TWITTER_API_HOST,
+    Mention,
+    load_credentials,
+    mentions_page_params,
+    parse_mentions_page,
+)
+from src.twitter.rate_limit import RateLimitScheduler, classify_endpoint, get_shared_scheduler
+
+
+class _BaseURLSession:
+    """Envolve a `ClientSession` e redireciona as URLs do tweepy para outro host."""
+
+    def __init__(self, session: aiohttp.ClientSession, base_url: str):
+        self._session = session
+        self.base_url = base_url.rstrip("/")
+
+    @property
+    def closed(self) -> bool:
+        return self._session.closed
+
+    def request(self, method: str, url: Any, **kwargs: Any):
+        encoded = isinstance(url, URL)
+        rewritten = self.base_url + str(url)[len(TWITTER_API_HOST):]
+        return self._session.request(method, URL(rewritten, encoded=True) if encoded else rewritten, **kwargs)
+
+    async def close(self) -> None:
+        await self._session.close()
+
+
+def _chunks(ids: Iterable[str], size: int = LOOKUP_BATCH_SIZE) -> List[List[str]]:
+    unique = list(dict.fromkeys(str(i) for i in ids))
+    return [unique[i:i + size] for i in range(0, len(unique), size)]
+
+
+class AsyncTwitterClient:
+    """Variante assíncrona do `TwitterClient` para alta concorrência.
+
+    A sessão HTTP é criada no primeiro uso (dentro do loop) e reaproveitada até `close()`;
+    `max_connections` limita as conexões simultâneas do pool do aiohttp.
+    """
+
+    def __init__(
+        self,
+        scheduler: Optional[RateLimitScheduler] = None,
+        credentials: Optional[dict] = None,
+        base_url: Optional[str] = None,
+        max_connections: int = 100,
+    ):
+        try:
+            from tweepy.asynchronous import AsyncClient
+        except ImportError as e:
+            raise RuntimeError("AsyncTwitterClient requer tweepy>=4.10 com aiohttp (pip install 'tweepy[async]')") from e
+
+        creds = credentials if credentials is not None else load_credentials()
+        self.scheduler = scheduler if scheduler is not None else get_shared_scheduler()
+        self.base_url = base_url or os.getenv("TWITTER_API_BASE_URL")
+        self.max_connections = max_connections
+        self._session: Optional[aiohttp.ClientSession] = None
+        if creds:
+            self.api = AsyncClient(
+                bearer_token=creds.get('bearer_token'),
+                consumer_key=creds['consumer_key'],
+                consumer_secret=creds['consumer_secret'],
+                access_token=creds['access_token'],
+                access_token_secret=creds['access_token_secret'],
+            )
+            self._user_id: Optional[str] = str(creds['user_id']) if creds.get('user_id') else None
+        else:
+            self.api = None
+            self._user_id = None
+
+    async def __aenter__(self) -> "AsyncTwitterClient":
+        self._ensure_session()
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        await self.close()
+
+    def _ensure_session(self) -> None:
+        if self.api is None or (self._session is not None and not self._session.closed):
+            return
+        trace = aiohttp.TraceConfig()
+        trace.on_request_end.append(self._on_request_end)
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60),
+            trace_configs=[trace],
+        )
+        self.api.session = _BaseURLSession(self._session, self.base_url) if self.base_url else self._session
+
+    async def _on_request_end(self, _session: Any, _ctx: Any, params: Any) -> None:
+        # Equivalente assíncrono do hook de `requests` do cliente síncrono
+        if self.scheduler is None:
+            return
+        endpoint = classify_endpoint(params.method, str(params.url))
+        if endpoint is not None:
+            self.scheduler.observe_headers(endpoint, params.response.headers)
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        if self.api is not None:
+            self.api.session = None
+
+    async def _call(self, endpoint: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        self._ensure_session()
+        if self.scheduler is None:
+            return await fn(*args, **kwargs)
+        return await self.scheduler.acall(endpoint, fn, *args, **kwargs)
+
+    async def user_id(self) -> Optional[str]:
+        """Id da conta do bot (de `user_id` nas credenciais ou via `GET /2/users/me`)."""
+        if self._user_id is None and self.api is not None:
+            me = await self._call("lookup", self.api.get_me, user_auth=True)
+            self._user_id = str(me.data.id)
+        return self._user_id
+
+    async def get_recent_mentions(
+        self, last_tweet_id: Optional[str] = None, max_pages: Optional[int] = None
+    ) -> List[Mention]:
+        """Mesma semântica de `TwitterClient.get_recent_mentions` (todas as páginas, mais antiga primeiro)."""
+        if self.api is None:
+            print("API do Twitter não inicializada. Impossível buscar menções.")
+            return []
+        user_id = await self.user_id()
+        mentions: List[Mention] = []
+        token = None
+        pages = 0
+        while True:
+            resp = await self._call(
+                "mentions", self.api.get_users_mentions, user_id, **mentions_page_params(last_tweet_id, token)
+            )
+            page, token = parse_mentions_page(resp)
+            mentions.extend(page)
+            pages += 1
+            if not token or not last_tweet_id:
+                break
+            if max_pages is not None and pages >= max_pages:
+                print(f"AVISO: busca de menções cortada em {max_pages} páginas; menções mais antigas ficaram de fora.")
+                break
+        mentions.sort(key=lambda m: int(m.id))
+        return mentions
+
+    async def post_reply(self, text: str, in_reply_to_tweet_id: str) -> Any:
+        """Posta a resposta via `POST /2/tweets`; erros sobem para quem chamou."""
+        return await self._call(
+            "post", self.api.create_tweet, text=text, in_reply_to_tweet_id=in_reply_to_tweet_id, user_auth=True
+        )
+
+    async def get_tweets(self, ids: Iterable[str], **params: Any) -> List[Any]:
+        """Lookup de tweets em lotes de 100, com os lotes em paralelo; retorna as respostas."""
+        return await asyncio.gather(*(
+            self._call("lookup", self.api.get_tweets, chunk, user_auth=True, **params) for chunk in _chunks(ids)
+        ))
+
+    async def get_users(self, ids: Iterable[str], **params: Any) -> List[Any]:
+        """Lookup de usuários em lotes de 100, com os lotes em paralelo; retorna as respostas."""
+        return await asyncio.gather(*(
+            self._call("lookup", self.api.get_users, ids=chunk, user_auth=True, **params) for chunk in _chunks(ids)
+        ))
+
+
+class AsyncClientThread:
+    """Fachada síncrona: um `AsyncTwitterClient` rodando num event loop em thread própria.
+
+    Expõe a interface de leitura do `TwitterClient` (`get_recent_mentions`,
+    `lookup_tweets`, `lookup_users`), então serve de `client` para o `MentionDaemon` e o
+    `ContextResolver`. Chamadas vindas de várias threads (fetcher, workers) ficam em
+    andamento ao mesmo tempo no mesmo loop e na mesma sessão keep-alive, e os lotes de
+    cada lookup correm em paralelo. Argumentos extras vão para o `AsyncTwitterClient`.
+    """
+
+    def __init__(self, client: Optional[AsyncTwitterClient] = None, timeout: Optional[float] = 120.0, **kwargs: Any):
+        self.client = client if client is not None else AsyncTwitterClient(**kwargs)
+        self.timeout = timeout
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="twitter-async", daemon=True)
+        self._thread.start()
+
+    @property
+    def api(self) -> Any:
+        return self.client.api
+
+    def _run(self, coro: Any) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(self.timeout)
+
+    def get_recent_mentions(
+        self, last_tweet_id: Optional[str] = None, max_pages: Optional[int] = None
+    ) -> List[Mention]:
+        return self._run(self.client.get_recent_mentions(last_tweet_id, max_pages))
+
+    def lookup_tweets(self, ids: Iterable[str], **params: Any) -> List[Any]:
+        return self._run(self.client.get_tweets(ids, **params))
+
+    def lookup_users(self, ids: Iterable[str], **params: Any) -> List[Any]:
+        return self._run(self.client.get_users(ids, **params))
+
+    def close(self) -> None:
+        """Fecha a sessão HTTP e encerra o loop."""
+        if self._loop.is_closed():
+            return
+        if self._thread.is_alive():
+            self._run(self.client.close())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(5)
+        self._loop.close()
@@ -1,6 +1,14 @@
+import os
+
+import requests
 import tweepy
 import yaml
+from concurrent.futures import Future
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+from src.twitter.rate_limit import RateLimitScheduler, get_shared_scheduler
 
 def load_credentials() -> dict:
     """Carrega as credenciais do arquivo credentials.yaml."""
@@ -15,36 +23,216 @@ def load_credentials() -> dict:
         print(f"Erro ao carregar credenciais: {e}")
         return None
 
+TWITTER_API_HOST = "https://api.twitter.com"
+
+
+class _BaseURLAdapter(requests.adapters.HTTPAdapter):
+    """Redireciona as requisições do tweepy para outro host (ex.: o servidor falso local)."""
+
+    def __init__(self, base_url: str):
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+
+    def send(self, request, **kwargs):
+        request.url = self.base_url + request.url[len(TWITTER_API_HOST):]
+        return super().send(request, **kwargs)
+
+
+# Campos pedidos à API v2 para cada menção
+MENTION_FIELDS = ["author_id", "conversation_id", "created_at", "in_reply_to_user_id", "referenced_tweets"]
+# Expansão do autor, para priorizar menções pelo número de seguidores sem chamadas extras
+MENTION_EXPANSIONS = ["author_id"]
+MENTION_USER_FIELDS = ["public_metrics"]
+# Limite da API v2 por página do timeline de menções
+MENTIONS_PAGE_SIZE = 100
+# Limite da API v2 de ids por lookup de tweets/usuários
+LOOKUP_BATCH_SIZE = 100
+
+
+def replied_to_id(tweet) -> Optional[str]:
+    """Id do tweet respondido (de `referenced_tweets`), objeto do tweepy ou dict."""
+    for ref in getattr(tweet, "referenced_tweets", None) or []:
+        kind = ref.get("type") if isinstance(ref, dict) else getattr(ref, "type", None)
+        if kind == "replied_to":
+            return str(ref.get("id") if isinstance(ref, dict) else ref.id)
+    return None
+
+
+@dataclass
+class Mention:
+    """Menção ao bot (subconjunto dos campos do tweet na API v2)."""
+
+    id: str
+    text: str
+    author_id: Optional[str] = None
+    conversation_id: Optional[str] = None
+    in_reply_to_user_id: Optional[str] = None
+    created_at: Optional[str] = None
+    author_followers: Optional[int] = None
+    author_username: Optional[str] = None
+    in_reply_to_id: Optional[str] = None
+
+    @classmethod
+    def from_tweet(cls, tweet, users: Optional[dict] = None) -> "Mention":
+        """`users`: id -> usuário (de `includes.users`), para o número de seguidores do autor."""
+        created = getattr(tweet, "created_at", None)
+        author = (users or {}).get(str(getattr(tweet, "author_id", None)))
+        metrics = getattr(author, "public_metrics", None) or {}
+        return cls(
+            id=str(tweet.id),
+            text=tweet.text,
+            author_id=str(tweet.author_id) if getattr(tweet, "author_id", None) else None,
+            conversation_id=str(tweet.conversation_id) if getattr(tweet, "conversation_id", None) else None,
+            in_reply_to_user_id=(
+                str(tweet.in_reply_to_user_id) if getattr(tweet, "in_reply_to_user_id", None) else None
+            ),
+            created_at=created.isoformat() if hasattr(created, "isoformat") else created,
+            author_followers=metrics.get("followers_count"),
+            author_username=getattr(author, "username", None),
+            in_reply_to_id=replied_to_id(tweet),
+        )
+
+
+def mentions_page_params(last_tweet_id: Optional[str], token: Optional[str]) -> dict:
+    """Parâmetros de uma página do timeline de menções (compartilhados com o cliente assíncrono)."""
+    params = {
+        "max_results": MENTIONS_PAGE_SIZE,
+        "tweet_fields": MENTION_FIELDS,
+        "expansions": MENTION_EXPANSIONS,
+        "user_fields": MENTION_USER_FIELDS,
+        "user_auth": True,
+    }
+    if last_tweet_id:
+        params["since_id"] = last_tweet_id
+    if token:
+        params["pagination_token"] = token
+    return params
+
+
+def parse_mentions_page(resp) -> tuple:
+    """(menções da página, `next_token`) de uma resposta de `get_users_mentions`."""
+    users = {str(u.id): u for u in (getattr(resp, "includes", None) or {}).get("users", [])}
+    mentions = [Mention.from_tweet(t, users) for t in (resp.data or [])]
+    return mentions, (resp.meta or {}).get("next_token")
+
+
 class TwitterClient:
-    def __init__(self):
-        """Inicializa o cliente Tweepy."""
-        creds = load_credentials()
+    def __init__(
+        self,
+        scheduler: Optional[RateLimitScheduler] = None,
+        credentials: Optional[dict] = None,
+        base_url: Optional[str] = None,
+    ):
+        """Inicializa o cliente Tweepy.
+
+        As chamadas passam pelo `RateLimitScheduler` (o compartilhado do processo, por
+        padrão), que lê os headers de rate limit de cada resposta e espaça as chamadas.
+        `base_url` (ou `TWITTER_API_BASE_URL`) aponta o cliente para outro servidor, como
+        o `src/twitter/fake_server.py` em testes de carga.
+        """
+        creds = credentials if credentials is not None else load_credentials()
+        self.scheduler = scheduler if scheduler is not None else get_shared_scheduler()
         if creds:
-            # A autenticação com a API v2 é um pouco diferente
-            # Usaremos a v1.1 para postar e a v2 para ler, se necessário.
-            # Para este exemplo, focamos na estrutura.
+            # v1.1 (OAuth 1.0a) para postar; v2 para ler menções. O `bearer_token` é opcional:
+            # com as chaves de usuário o tweepy.Client também autentica as leituras.
             auth = tweepy.OAuth1UserHandler(
                 creds['consumer_key'], creds['consumer_secret'],
                 creds['access_token'], creds['access_token_secret']
             )
             self.api_v1 = tweepy.API(auth)
-            self.api_v2 = tweepy.Client(bearer_token="SUA_BEARER_TOKEN_AQUI") # Bearer token é necessário para a v2
+            self.api_v2 = tweepy.Client(
+                bearer_token=creds.get('bearer_token'),
+                consumer_key=creds['consumer_key'],
+                consumer_secret=creds['consumer_secret'],
+                access_token=creds['access_token'],
+                access_token_secret=creds['access_token_secret'],
+            )
+            self._user_id: Optional[str] = str(creds['user_id']) if creds.get('user_id') else None
+            base_url = base_url or os.getenv("TWITTER_API_BASE_URL")
+            if base_url:
+                for session in (self.api_v1.session, self.api_v2.session):
+                    session.mount(TWITTER_API_HOST, _BaseURLAdapter(base_url))
+            if self.scheduler is not None:
+                self.scheduler.attach(self.api_v1.session)
+                self.scheduler.attach(self.api_v2.session)
         else:
             self.api_v1 = None
             self.api_v2 = None
+            self._user_id = None
 
-    def get_recent_mentions(self, last_tweet_id: str = None):
-        """Busca menções recentes ao bot."""
-        if not self.api_v1:
+    def _call(self, endpoint: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        scheduler = getattr(self, "scheduler", None)
+        if scheduler is None:
+            return fn(*args, **kwargs)
+        return scheduler.call(endpoint, fn, *args, **kwargs)
+
+    @property
+    def user_id(self) -> Optional[str]:
+        """Id da conta do bot (de `user_id` nas credenciais ou via `GET /2/users/me`)."""
+        if self._user_id is None and self.api_v2 is not None:
+            me = self._call("lookup", self.api_v2.get_me, user_auth=True)
+            self._user_id = str(me.data.id)
+        return self._user_id
+
+    def get_recent_mentions(self, last_tweet_id: str = None, max_pages: Optional[int] = None) -> List[Mention]:
+        """Busca as menções ao bot mais novas que `last_tweet_id`, da mais antiga para a mais nova.
+
+        Percorre as páginas do timeline até o `next_token` acabar: a API pagina da mais
+        nova para a mais antiga, então parar antes perderia justamente as mais antigas,
+        e o checkpoint passaria por cima delas. `max_pages` só existe para depuração (um
+        aviso é emitido se o limite cortar o backlog). Sem `last_tweet_id`, retorna apenas
+        a página mais recente.
+        """
+        if not self.api_v2:
             print("API do Twitter não inicializada. Impossível buscar menções.")
             return []
-        
-        print(f"Buscando menções desde o tweet ID: {last_tweet_id}")
-        # Lógica para buscar menções usando self.api_v1.mentions_timeline
-        # Exemplo:
-        # mentions = self.api_v1.mentions_timeline(since_id=last_tweet_id)
-        # return mentions
-        return [] # Placeholder
+
+        mentions: List[Mention] = []
+        token = None
+        pages = 0
+        while True:
+            kwargs = mentions_page_params(last_tweet_id, token)
+            resp = self._call("mentions", self.api_v2.get_users_mentions, self.user_id, **kwargs)
+            page, token = parse_mentions_page(resp)
+            mentions.extend(page)
+            pages += 1
+            if not token or not last_tweet_id:
+                break
+            if max_pages is not None and pages >= max_pages:
+                print(f"AVISO: busca de menções cortada em {max_pages} páginas; menções mais antigas ficaram de fora.")
+                break
+        # A API devolve da mais nova para a mais antiga; ids são crescentes no tempo
+        mentions.sort(key=lambda m: int(m.id))
+        return mentions
+
+    def lookup_tweets(self, ids: List[str], **params: Any) -> List[Any]:
+        """Lookup de tweets em lotes de `LOOKUP_BATCH_SIZE`; uma resposta da API por lote."""
+        ids = list(dict.fromkeys(str(i) for i in ids))
+        return [
+            self._call("lookup", self.api_v2.get_tweets, ids[i:i + LOOKUP_BATCH_SIZE], user_auth=True, **params)
+            for i in range(0, len(ids), LOOKUP_BATCH_SIZE)
+        ]
+
+    def lookup_users(self, ids: List[str], **params: Any) -> List[Any]:
+        """Lookup de usuários em lotes de `LOOKUP_BATCH_SIZE`; uma resposta da API por lote."""
+        ids = list(dict.fromkeys(str(i) for i in ids))
+        return [
+            self._call("lookup", self.api_v2.get_users, ids=ids[i:i + LOOKUP_BATCH_SIZE], user_auth=True, **params)
+            for i in range(0, len(ids), LOOKUP_BATCH_SIZE)
+        ]
+
+    def submit_reply(self, text: str, in_reply_to_tweet_id: str) -> Future:
+        """Agenda a resposta no scheduler e retorna um `Future` (erros ficam no Future)."""
+        kwargs = dict(status=text, in_reply_to_status_id=in_reply_to_tweet_id, auto_populate_reply_metadata=True)
+        scheduler = getattr(self, "scheduler", None)
+        if scheduler is not None:
+            return scheduler.submit("post", self.api_v1.update_status, **kwargs)
+        future: Future = Future()
+        try:
+            future.set_result(self.api_v1.update_status(**kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
 
     def post_reply(self, text: str, in_reply_to_tweet_id: str):
         """Posta uma resposta a um tweet específico."""
@@ -53,11 +241,7 @@ class TwitterClient:
             return
 
         try:
-            self.api_v1.update_status(
-                status=text,
-                in_reply_to_status_id=in_reply_to_tweet_id,
-                auto_populate_reply_metadata=True
-            )
+            self.submit_reply(text, in_reply_to_tweet_id).result()
             print(f"Resposta postada para o tweet {in_reply_to_tweet_id}")
         except Exception as e:
             print(f"Erro ao postar no Twitter: {e}")
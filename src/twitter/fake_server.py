@@ -0,0 +1,447 @@
+"""Servidor local que imita os endpoints da API do Twitter usados pelo bot.
+
+Implementa o timeline de menções (v2), lookups de tweets/usuários (v2) e a publicação
+de respostas (v1.1 `statuses/update` e v2 `POST /2/tweets`), com latência, rate limit
+(headers `x-rate-limit-*` e 429) e injeção de erros (503) configuráveis. Endpoints
+`/_fake/*` permitem injetar menções e inspecionar as respostas recebidas.
+
+Também faz o papel da Account Activity API: registrar um webhook
+(`POST /1.1/account_activity/all/{env}/webhooks.json?url=...`) dispara o desafio CRC e,
+a partir daí, cada nova menção é entregue por POST assinado com o consumer secret
+(`webhook_drop_rate` simula entregas perdidas).
+
+Uso:
+    python -m src.twitter.fake_server --port 8765 --latency 0.05 --error-rate 0.01
+    TWITTER_API_BASE_URL=http://127.0.0.1:8765 python -m src.pipeline.daemon
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import queue
+import random
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from src.twitter.webhook import SIGNATURE_HEADER, V1_DATE_FORMAT, crc_response_token, sign
+from src.web.server import ServerThread
+
+
+BOT_ID = "1000"
+BOT_USERNAME = "personabot"
+# Mesmos padrões do scheduler de rate limit (requisições, janela em segundos)
+FAKE_LIMITS: Dict[str, Tuple[int, float]] = {
+    "mentions": (180, 15 * 60),
+    "post": (200, 15 * 60),
+    "lookup": (900, 15 * 60),
+}
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class FakeTwitterState:
+    """Estado do servidor falso: tweets, respostas recebidas e janelas de rate limit."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        limits: Optional[Dict[str, Tuple[int, float]]] = None,
+        seed: Optional[int] = None,
+        consumer_secret: str = "fake-consumer-secret",
+        webhook_drop_rate: float = 0.0,
+    ):
+        self.latency = latency
+        self.consumer_secret = consumer_secret
+        self.webhook_drop_rate = webhook_drop_rate
+        self.webhook_url: Optional[str] = None
+        self._deliveries: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._delivery_thread: Optional[threading.Thread] = None
+        self.error_rate = error_rate
+        self.limits = dict(limits or FAKE_LIMITS)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._next_id = 1_500_000_000_000_000_000
+        self.tweets: Dict[str, Dict[str, Any]] = {}
+        self.mention_ids: List[str] = []
+        self.replies: List[Dict[str, Any]] = []
+        self.users: Dict[str, Dict[str, Any]] = {
+            BOT_ID: {"id": BOT_ID, "username": BOT_USERNAME, "name": "PersonaBot", "followers_count": 0}
+        }
+        self._windows: Dict[str, List[float]] = {}
+        self.requests = 0
+        self.throttled = 0
+        self.injected_errors = 0
+        self.duplicate_replies = 0
+        self.webhook_delivered = 0
+        self.webhook_dropped = 0
+        self.webhook_failed = 0
+
+    def _new_id(self) -> str:
+        self._next_id += self._random.randint(1, 1000)
+        return str(self._next_id)
+
+    def add_user(self, user_id: str, username: Optional[str] = None, followers_count: int = 0) -> Dict[str, Any]:
+        with self._lock:
+            user = {"id": str(user_id), "username": username or f"user{user_id}", "name": username or f"User {user_id}",
+                    "followers_count": followers_count}
+            self.users[str(user_id)] = user
+            return user
+
+    def add_tweet(
+        self,
+        text: str,
+        author_id: str = "2000",
+        in_reply_to: Optional[str] = None,
+        mention_bot: bool = True,
+        deliver: bool = True,
+    ) -> Dict[str, Any]:
+        """Cria um tweet (menção ao bot por padrão) e retorna sua representação v2.
+
+        Com um webhook registrado, a menção também é entregue por push, a menos que
+        `deliver=False` (ou o sorteio de `webhook_drop_rate`) simule uma entrega perdida.
+        """
+        with self._lock:
+            tweet_id = self._new_id()
+            parent = self.tweets.get(in_reply_to) if in_reply_to else None
+            tweet = {
+                "id": tweet_id,
+                "text": text,
+                "author_id": str(author_id),
+                "conversation_id": parent["conversation_id"] if parent else tweet_id,
+                "edit_history_tweet_ids": [tweet_id],
+                "created_at": _iso(time.time()),
+                "_injected_at": time.time(),
+            }
+            if parent:
+                tweet["in_reply_to_user_id"] = parent["author_id"]
+                tweet["referenced_tweets"] = [{"type": "replied_to", "id": parent["id"]}]
+            self.users.setdefault(str(author_id), {
+                "id": str(author_id), "username": f"user{author_id}", "name": f"User {author_id}", "followers_count": 0,
+            })
+            self.tweets[tweet_id] = tweet
+            is_mention = mention_bot and str(author_id) != BOT_ID
+            if is_mention:
+                self.mention_ids.append(tweet_id)
+        if is_mention and self.webhook_url:
+            if not deliver or (self.webhook_drop_rate and self._random.random() < self.webhook_drop_rate):
+                with self._lock:
+                    self.webhook_dropped += 1
+            else:
+                self._enqueue_delivery(tweet)
+        return tweet
+
+    def v1_tweet(self, tweet: Dict[str, Any]) -> Dict[str, Any]:
+        """Representação v1.1 (formato dos eventos da Account Activity API)."""
+        author = self.users.get(tweet["author_id"], {})
+        parent = self.tweets.get((tweet.get("referenced_tweets") or [{}])[0].get("id", ""))
+        return {
+            "id": int(tweet["id"]),
+            "id_str": tweet["id"],
+            "text": tweet["text"],
+            "created_at": datetime.fromtimestamp(tweet["_injected_at"], tz=timezone.utc).strftime(V1_DATE_FORMAT),
+            "user": {
+                "id_str": tweet["author_id"],
+                "screen_name": author.get("username"),
+                "followers_count": author.get("followers_count", 0),
+            },
+            "in_reply_to_status_id_str": parent["id"] if parent else None,
+            "in_reply_to_user_id_str": tweet.get("in_reply_to_user_id"),
+            "entities": {"user_mentions": [{"id_str": BOT_ID, "screen_name": BOT_USERNAME}]},
+        }
+
+    def register_webhook(self, url: str) -> None:
+        """Valida o webhook com o desafio CRC (como o Twitter) e passa a entregar eventos."""
+        import requests
+
+        token = secrets.token_urlsafe(16)
+        resp = requests.get(url, params={"crc_token": token}, timeout=5)
+        if resp.status_code != 200 or resp.json().get("response_token") != crc_response_token(token, self.consumer_secret):
+            raise ValueError(f"CRC do webhook falhou ({resp.status_code})")
+        self.webhook_url = url
+
+    def _enqueue_delivery(self, tweet: Dict[str, Any]) -> None:
+        self._deliveries.put({"for_user_id": BOT_ID, "tweet_create_events": [self.v1_tweet(tweet)]})
+        with self._lock:
+            if self._delivery_thread is None:
+                self._delivery_thread = threading.Thread(target=self._deliver_loop, name="fake-webhook", daemon=True)
+                self._delivery_thread.start()
+
+    def _deliver_loop(self) -> None:
+        import requests
+
+        session = requests.Session()
+        while True:
+            event = self._deliveries.get()
+            body = json.dumps(event).encode("utf-8")
+            headers = {"content-type": "application/json", SIGNATURE_HEADER: sign(body, self.consumer_secret)}
+            try:
+                ok = session.post(self.webhook_url, data=body, headers=headers, timeout=5).status_code == 200
+            except Exception:
+                ok = False
+            with self._lock:
+                if ok:
+                    self.webhook_delivered += 1
+                else:
+                    self.webhook_failed += 1
+            self._deliveries.task_done()
+
+    def wait_for_deliveries(self) -> None:
+        """Aguarda as entregas de webhook pendentes (testes)."""
+        self._deliveries.join()
+
+    def rate_limit(self, endpoint: str) -> Tuple[bool, Dict[str, str]]:
+        """Janela fixa por endpoint: retorna (permitido, headers x-rate-limit-*)."""
+        limit, window = self.limits.get(endpoint, (10_000, 900))
+        now = time.time()
+        with self._lock:
+            self.requests += 1
+            start, used = self._windows.get(endpoint, [now, 0])
+            if now - start >= window:
+                start, used = now, 0
+            allowed = used < limit
+            if allowed:
+                used += 1
+            else:
+                self.throttled += 1
+            self._windows[endpoint] = [start, used]
+        headers = {
+            "x-rate-limit-limit": str(limit),
+            "x-rate-limit-remaining": str(max(0, limit - used)),
+            "x-rate-limit-reset": str(int(start + window)),
+        }
+        return allowed, headers
+
+    def inject_error(self) -> bool:
+        if self.error_rate and self._random.random() < self.error_rate:
+            with self._lock:
+                self.injected_errors += 1
+            return True
+        return False
+
+    def public(self, tweet: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in tweet.items() if not k.startswith("_")}
+
+    def record_reply(self, text: str, in_reply_to: Optional[str]) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Registra a resposta do bot; retorna (tweet, duplicada)."""
+        with self._lock:
+            duplicate = any(r["in_reply_to"] == in_reply_to and r["text"] == text for r in self.replies)
+            if duplicate:
+                self.duplicate_replies += 1
+                return None, True
+        tweet = self.add_tweet(text, author_id=BOT_ID, in_reply_to=in_reply_to, mention_bot=False)
+        parent = self.tweets.get(in_reply_to or "")
+        now = time.time()
+        with self._lock:
+            self.replies.append({
+                "id": tweet["id"],
+                "in_reply_to": in_reply_to,
+                "text": text,
+                "posted_at": now,
+                # Latência de ponta a ponta: menção criada -> resposta recebida
+                "latency": now - parent["_injected_at"] if parent else None,
+            })
+        return tweet, False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mentions": len(self.mention_ids),
+                "replies": len(self.replies),
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "injected_errors": self.injected_errors,
+                "duplicate_replies": self.duplicate_replies,
+                "webhook_delivered": self.webhook_delivered,
+                "webhook_dropped": self.webhook_dropped,
+                "webhook_failed": self.webhook_failed,
+            }
+
+
+def create_app(state: Optional[FakeTwitterState] = None) -> FastAPI:
+    state = state or FakeTwitterState()
+    app = FastAPI(title="Fake Twitter API")
+    app.state.fake = state
+
+    async def guard(endpoint: str) -> Tuple[Optional[JSONResponse], Dict[str, str]]:
+        if state.latency:
+            await asyncio.sleep(state.latency)
+        allowed, headers = state.rate_limit(endpoint)
+        if not allowed:
+            return JSONResponse({"title": "Too Many Requests", "status": 429}, status_code=429, headers=headers), headers
+        if state.inject_error():
+            return JSONResponse({"title": "Service Unavailable", "status": 503}, status_code=503, headers=headers), headers
+        return None, headers
+
+    @app.get("/2/users/me")
+    async def users_me():
+        error, headers = await guard("lookup")
+        if error:
+            return error
+        user = state.users[BOT_ID]
+        return JSONResponse({"data": {"id": user["id"], "name": user["name"], "username": user["username"]}}, headers=headers)
+
+    @app.get("/2/users/{user_id}/mentions")
+    async def users_mentions(
+        user_id: str,
+        since_id: Optional[str] = None,
+        max_results: int = 10,
+        pagination_token: Optional[str] = None,
+        expansions: Optional[str] = None,
+    ):
+        error, headers = await guard("mentions")
+        if error:
+            return error
+        ids = [i for i in state.mention_ids if since_id is None or int(i) > int(since_id)]
+        ids.sort(key=int, reverse=True)  # mais novas primeiro, como a API
+        offset = int(pagination_token or 0)
+        page = ids[offset:offset + max(5, min(100, max_results))]
+        meta: Dict[str, Any] = {"result_count": len(page)}
+        if page:
+            meta.update(newest_id=page[0], oldest_id=page[-1])
+        if offset + len(page) < len(ids):
+            meta["next_token"] = str(offset + len(page))
+        body: Dict[str, Any] = {"meta": meta}
+        if page:
+            body["data"] = [state.public(state.tweets[i]) for i in page]
+            if expansions and "author_id" in expansions:
+                authors = {t["author_id"] for t in body["data"]}
+                body["includes"] = {"users": [_public_user(state.users[a]) for a in authors if a in state.users]}
+        return JSONResponse(body, headers=headers)
+
+    @app.get("/2/tweets")
+    async def tweets_lookup(ids: str, expansions: Optional[str] = None):
+        error, headers = await guard("lookup")
+        if error:
+            return error
+        found = [state.public(state.tweets[i]) for i in ids.split(",") if i in state.tweets]
+        body: Dict[str, Any] = {"data": found}
+        if expansions and "author_id" in expansions:
+            authors = {t["author_id"] for t in found}
+            body["includes"] = {"users": [_public_user(state.users[a]) for a in authors if a in state.users]}
+        return JSONResponse(body, headers=headers)
+
+    @app.get("/2/users")
+    async def users_lookup(ids: str):
+        error, headers = await guard("lookup")
+        if error:
+            return error
+        found = [_public_user(state.users[i]) for i in ids.split(",") if i in state.users]
+        return JSONResponse({"data": found}, headers=headers)
+
+    @app.post("/1.1/statuses/update.json")
+    async def statuses_update(request: Request):
+        error, headers = await guard("post")
+        if error:
+            return error
+        params = dict(request.query_params)
+        params.update(dict(await request.form()))
+        tweet, duplicate = state.record_reply(params.get("status", ""), params.get("in_reply_to_status_id"))
+        if duplicate:
+            return JSONResponse({"errors": [{"code": 187, "message": "Status is a duplicate."}]}, status_code=403)
+        return JSONResponse({"id": int(tweet["id"]), "id_str": tweet["id"], "text": tweet["text"]}, headers=headers)
+
+    @app.post("/2/tweets")
+    async def create_tweet(request: Request):
+        error, headers = await guard("post")
+        if error:
+            return error
+        payload = await request.json()
+        reply_to = (payload.get("reply") or {}).get("in_reply_to_tweet_id")
+        tweet, duplicate = state.record_reply(payload.get("text", ""), reply_to)
+        if duplicate:
+            return JSONResponse(
+                {"title": "Forbidden", "detail": "You are not allowed to create a Tweet with duplicate content."},
+                status_code=403,
+            )
+        return JSONResponse({"data": {"id": tweet["id"], "text": tweet["text"]}}, status_code=201, headers=headers)
+
+    @app.post("/1.1/account_activity/all/{env}/webhooks.json")
+    async def register_webhook(env: str, url: str):
+        try:
+            await asyncio.to_thread(state.register_webhook, url)
+        except Exception as e:
+            return JSONResponse({"errors": [{"code": 214, "message": str(e)}]}, status_code=400)
+        return {"id": "1", "url": url, "valid": True, "environment": env}
+
+    @app.post("/_fake/mentions")
+    async def fake_add_mentions(request: Request):
+        payload = await request.json()
+        items = payload if isinstance(payload, list) else [payload]
+        created = [
+            state.public(state.add_tweet(i["text"], author_id=str(i.get("author_id", "2000")), in_reply_to=i.get("in_reply_to")))
+            for i in items
+        ]
+        return {"data": created}
+
+    @app.get("/_fake/replies")
+    async def fake_replies():
+        return {"data": state.replies}
+
+    @app.get("/_fake/stats")
+    async def fake_stats():
+        return state.stats()
+
+    return app
+
+
+def _public_user(user: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": user["id"],
+        "name": user["name"],
+        "username": user["username"],
+        "public_metrics": {"followers_count": user.get("followers_count", 0)},
+    }
+
+
+class FakeServerThread(ServerThread):
+    """Servidor falso rodando em uma thread (uvicorn), para testes e o harness de replay."""
+
+    def __init__(self, state: Optional[FakeTwitterState] = None, host: str = "127.0.0.1", port: int = 0):
+        self.state = state or FakeTwitterState()
+        super().__init__(create_app(self.state), host=host, port=port, name="fake-twitter")
+
+
+def main(argv: list[str] | None = None) -> int:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Servidor local que imita a API do Twitter.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="latência por requisição (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fração de respostas 503")
+    parser.add_argument("--consumer-secret", default="fake-consumer-secret", help="assina os eventos do webhook")
+    parser.add_argument("--webhook-drop-rate", type=float, default=0.0, help="fração de entregas de webhook perdidas")
+    parser.add_argument(
+        "--limit", action="append", default=[], metavar="ENDPOINT=N/JANELA",
+        help="rate limit por endpoint, ex.: mentions=180/900 (repetível)",
+    )
+    args = parser.parse_args(argv)
+
+    limits = dict(FAKE_LIMITS)
+    for spec in args.limit:
+        name, _, value = spec.partition("=")
+        count, _, window = value.partition("/")
+        limits[name] = (int(count), float(window or 900))
+    state = FakeTwitterState(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        limits=limits,
+        consumer_secret=args.consumer_secret,
+        webhook_drop_rate=args.webhook_drop_rate,
+    )
+    uvicorn.run(create_app(state), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Mapping, Optional, Tuple
+
+from src.utils.metrics import Histogram
+
+
+# Limites padrão por endpoint (requisições, janela em segundos), contexto de usuário da
+# API v2. Servem até o primeiro header `x-rate-limit-*` chegar; depois valem os do servidor.
+DEFAULT_LIMITS: Dict[str, Tuple[int, float]] = {
+    "mentions": (180, 15 * 60),
+    "post": (200, 15 * 60),
+    "lookup": (900, 15 * 60),
+    "default": (180, 15 * 60),
+}
+
+# (método, padrão da URL) -> endpoint lógico; a primeira regra que casar vence
+ENDPOINT_RULES = (
+    (None, re.compile(r"/2/users/[^/]+/mentions")),
+    ("POST", re.compile(r"/2/tweets/?$|/1\.1/statuses/update")),
+    ("GET", re.compile(r"/2/tweets|/2/users")),
+)
+_RULE_NAMES = ("mentions", "post", "lookup")
+
+
+def classify_endpoint(method: str, url: str) -> Optional[str]:
+    for (rule_method, pattern), name in zip(ENDPOINT_RULES, _RULE_NAMES):
+        if (rule_method is None or rule_method == method.upper()) and pattern.search(url):
+            return name
+    return None
+
+
+def _is_rate_limited(error: BaseException) -> bool:
+    # `requests` expõe `status_code`; `aiohttp` (cliente assíncrono), `status`
+    response = getattr(error, "response", None)
+    return (getattr(response, "status_code", None) or getattr(response, "status", None)) == 429
+
+
+def _permit() -> None:
+    """Chamada vazia: usada por `acall` só para ocupar a vez no bucket."""
+
+
+class EndpointBucket:
+    """Token bucket que modela a janela de rate limit de um endpoint.
+
+    A cota restante da janela (`remaining` até `reset_at`) é distribuída uniformemente
+    pelo tempo que falta para o reset, com rajadas de até `burst` chamadas. Assim a cota
+    inteira é usada sem esgotá-la antes do fim da janela (o que geraria 429).
+    """
+
+    def __init__(self, limit: int, window: float, burst: Optional[int] = None, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        now = clock()
+        self.limit = limit
+        self.window = window
+        self.burst = burst or max(1, limit // 10)
+        self.remaining = limit
+        self.reset_at = now + window
+        self.tokens = float(self.burst)
+        self._updated = now
+
+    def _rate(self, now: float) -> float:
+        return self.remaining / max(self.reset_at - now, 1e-3)
+
+    def _refill(self, now: float) -> None:
+        if now >= self.reset_at:
+            # Nova janela; o reset exato é corrigido pelo próximo header
+            self.remaining = self.limit
+            self.reset_at = now + self.window
+        self.tokens = min(self.burst, self.remaining, self.tokens + (now - self._updated) * self._rate(now))
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """Segundos até a próxima chamada ser permitida (0 = já)."""
+        now = self._clock()
+        self._refill(now)
+        if self.remaining < 1:
+            return max(0.0, self.reset_at - now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self._rate(now)
+
+    def consume(self) -> None:
+        self._refill(self._clock())
+        self.tokens -= 1
+        self.remaining -= 1
+
+    def update(self, limit: int, remaining: int, reset_at: float) -> None:
+        """Sincroniza com os headers `x-rate-limit-{limit,remaining,reset}`."""
+        now = self._clock()
+        self._refill(now)
+        same_window = abs(reset_at - self.reset_at) < 1.0
+        self.limit = limit
+        # Na mesma janela, chamadas em andamento já foram descontadas localmente
+        self.remaining = min(self.remaining, remaining) if same_window else remaining
+        self.reset_at = reset_at
+        self.tokens = min(self.tokens, self.remaining)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = self._clock()
+        return {
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "reset_in_s": round(max(0.0, self.reset_at - now), 1),
+            "tokens": round(self.tokens, 2),
+        }
+
+
+class _Call:
+    __slots__ = ("fn", "args", "kwargs", "future", "submitted_at", "attempts")
+
+    def __init__(self, fn: Callable[..., Any], args: tuple, kwargs: dict):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future: Future = Future()
+        self.submitted_at = time.perf_counter()
+        self.attempts = 0
+
+
+class RateLimitScheduler:
+    """Agenda chamadas à API do Twitter respeitando o rate limit de cada endpoint.
+
+    `submit(endpoint, fn, ...)` enfileira a chamada e retorna um `Future`. Uma thread
+    despachante libera as chamadas de cada fila conforme o `EndpointBucket` permite e as
+    executa em um pool de threads. Respostas (via hook da sessão `requests` do tweepy,
+    veja `attach`) e erros 429 atualizam os buckets com os headers do servidor; uma
+    chamada que recebe 429 volta para o início da fila até `max_retries` vezes.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Mapping[str, Tuple[int, float]]] = None,
+        max_workers: int = 4,
+        max_retries: int = 2,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._limits = dict(limits or DEFAULT_LIMITS)
+        self._clock = clock
+        self.max_retries = max_retries
+        self._buckets: Dict[str, EndpointBucket] = {}
+        self._queues: Dict[str, Deque[_Call]] = {}
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="twitter-api")
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.submitted = 0
+        self.dispatched = 0
+        self.throttled = 0
+        self.queue_wait: Dict[str, Histogram] = {}
+
+    def _bucket(self, endpoint: str) -> EndpointBucket:
+        bucket = self._buckets.get(endpoint)
+        if bucket is None:
+            limit, window = self._limits.get(endpoint, self._limits["default"])
+            bucket = self._buckets[endpoint] = EndpointBucket(limit, window, clock=self._clock)
+            self._queues[endpoint] = deque()
+            self.queue_wait[endpoint] = Histogram()
+        return bucket
+
+    def submit(self, endpoint: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        call = _Call(fn, args, kwargs)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("scheduler encerrado")
+            self._bucket(endpoint)
+            self._queues[endpoint].append(call)
+            self.submitted += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="twitter-rate-limit", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return call.future
+
+    def call(self, endpoint: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Atalho síncrono: agenda e espera o resultado."""
+        return self.submit(endpoint, fn, *args, **kwargs).result()
+
+    async def acall(self, endpoint: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Versão assíncrona: aguarda a vez no bucket sem bloquear o loop e então executa
+        a corrotina `fn(...)` no loop atual. Um 429 atualiza o bucket e retenta."""
+        for attempt in range(self.max_retries + 1):
+            await asyncio.wrap_future(self.submit(endpoint, _permit))
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                if not _is_rate_limited(e) or attempt >= self.max_retries:
+                    raise
+                with self._cond:
+                    self.throttled += 1
+                    self._observe(endpoint, e.response.headers, reset_if_missing=True)
+
+    def _loop(self) -> None:
+        with self._cond:
+            while not self._closed:
+                next_wait: Optional[float] = None
+                for endpoint, pending in self._queues.items():
+                    while pending:
+                        wait = self._buckets[endpoint].wait_time()
+                        if wait > 0:
+                            next_wait = wait if next_wait is None else min(next_wait, wait)
+                            break
+                        call = pending.popleft()
+                        self._buckets[endpoint].consume()
+                        self.dispatched += 1
+                        self.queue_wait[endpoint].observe(time.perf_counter() - call.submitted_at)
+                        self._executor.submit(self._run, endpoint, call)
+                self._cond.wait(next_wait)
+
+    def _run(self, endpoint: str, call: _Call) -> None:
+        # Retentativas reaproveitam o Future, que já está "running"
+        if call.attempts == 0 and not call.future.set_running_or_notify_cancel():
+            return
+        call.attempts += 1
+        try:
+            result = call.fn(*call.args, **call.kwargs)
+        except Exception as e:
+            if _is_rate_limited(e):
+                with self._cond:
+                    self.throttled += 1
+                    self._observe(endpoint, e.response.headers, reset_if_missing=True)
+                    if call.attempts <= self.max_retries and not self._closed:
+                        self._queues[endpoint].appendleft(call)
+                        self._cond.notify()
+                        return
+            call.future.set_exception(e)
+            return
+        call.future.set_result(result)
+
+    def _observe(self, endpoint: str, headers: Mapping[str, str], reset_if_missing: bool = False) -> None:
+        bucket = self._bucket(endpoint)
+        try:
+            limit = int(headers.get("x-rate-limit-limit", bucket.limit))
+            remaining = int(headers.get("x-rate-limit-remaining", 0 if reset_if_missing else bucket.remaining))
+            reset_at = float(headers.get("x-rate-limit-reset", bucket.reset_at))
+        except (TypeError, ValueError):
+            return
+        bucket.update(limit, remaining, reset_at)
+
+    def observe_headers(self, endpoint: str, headers: Mapping[str, str]) -> None:
+        if "x-rate-limit-remaining" not in headers:
+            return
+        with self._cond:
+            self._observe(endpoint, headers)
+            self._cond.notify()
+
+    def response_hook(self, response: Any, *args: Any, **kwargs: Any) -> Any:
+        """Hook de `requests`: lê os headers de rate limit de toda resposta da API."""
+        request = getattr(response, "request", None)
+        endpoint = classify_endpoint(getattr(request, "method", "GET") or "GET", getattr(response, "url", "") or "")
+        if endpoint is not None:
+            self.observe_headers(endpoint, response.headers)
+        return response
+
+    def attach(self, session: Any) -> None:
+        """Registra `response_hook` em uma `requests.Session` (tweepy.API / tweepy.Client)."""
+        hooks = session.hooks.setdefault("response", [])
+        if self.response_hook not in hooks:
+            hooks.append(self.response_hook)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            pending = [c for q in self._queues.values() for c in q]
+            for q in self._queues.values():
+                q.clear()
+            self._cond.notify_all()
+        for call in pending:
+            call.future.cancel()
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "submitted": self.submitted,
+                "dispatched": self.dispatched,
+                "throttled": self.throttled,
+                "endpoints": {
+                    name: {
+                        **bucket.snapshot(),
+                        "queued": len(self._queues[name]),
+                        "queue_wait": self.queue_wait[name].snapshot(),
+                    }
+                    for name, bucket in self._buckets.items()
+                },
+            }
+
+
+_scheduler_lock = threading.Lock()
+_scheduler: Dict[str, Optional[RateLimitScheduler]] = {}
+
+
+def get_shared_scheduler() -> Optional[RateLimitScheduler]:
+    """Scheduler do processo; `TWITTER_RATE_LIMIT=false` chama a API diretamente."""
+    with _scheduler_lock:
+        if "default" not in _scheduler:
+            enabled = os.getenv("TWITTER_RATE_LIMIT", "true").strip().lower() not in ("0", "false", "no")
+            _scheduler["default"] = RateLimitScheduler() if enabled else None
+        return _scheduler["default"]
@@ -0,0 +1,161 @@
+"""Recepção de menções por webhook, no modelo da Account Activity API do Twitter.
+
+- CRC: o Twitter chama `GET ?crc_token=...` ao registrar o webhook (e periodicamente) e
+  espera `{"response_token": "sha256=<base64(HMAC-SHA256(consumer_secret, crc_token))>"}`.
+- Eventos: `POST` com o corpo assinado no header `x-twitter-webhooks-signature`
+  (`sha256=<base64(HMAC-SHA256(consumer_secret, corpo))>`). Tweets chegam no formato
+  v1.1 em `tweet_create_events`.
+
+As menções válidas são entregues ao `WebhookHub`, onde o pipeline (ex.:
+`MentionDaemon.ingest`) se registra.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from src.twitter.client import Mention, load_credentials
+
+
+SIGNATURE_HEADER = "x-twitter-webhooks-signature"
+V1_DATE_FORMAT = "%a %b %d %H:%M:%S %z %Y"
+
+
+def _hmac_b64(secret: str, payload: bytes) -> str:
+    digest = hmac.new(secret.encode("utf-8"), payload, hashlib.sha256).digest()
+    return "sha256=" + base64.b64encode(digest).decode("ascii")
+
+
+def crc_response_token(crc_token: str, secret: str) -> str:
+    return _hmac_b64(secret, crc_token.encode("utf-8"))
+
+
+def sign(body: bytes, secret: str) -> str:
+    """Assinatura que o Twitter envia em `x-twitter-webhooks-signature`."""
+    return _hmac_b64(secret, body)
+
+
+def verify_signature(body: bytes, header: Optional[str], secret: str) -> bool:
+    return bool(header) and hmac.compare_digest(sign(body, secret), header)
+
+
+def consumer_secret() -> Optional[str]:
+    """`TWITTER_CONSUMER_SECRET` ou o `consumer_secret` de `config/credentials.yaml`."""
+    secret = os.getenv("TWITTER_CONSUMER_SECRET")
+    if secret:
+        return secret
+    creds = load_credentials() or {}
+    return creds.get("consumer_secret")
+
+
+def mention_from_v1(tweet: Dict[str, Any]) -> Mention:
+    """Converte um tweet v1.1 (payload da Account Activity API) em `Mention`."""
+    user = tweet.get("user") or {}
+    text = (tweet.get("extended_tweet") or {}).get("full_text") or tweet.get("full_text") or tweet.get("text", "")
+    created = tweet.get("created_at")
+    if created:
+        try:
+            created = datetime.strptime(created, V1_DATE_FORMAT).isoformat()
+        except ValueError:
+            pass
+    return Mention(
+        id=str(tweet.get("id_str") or tweet.get("id")),
+        text=text,
+        author_id=str(user["id_str"]) if user.get("id_str") else None,
+        in_reply_to_user_id=tweet.get("in_reply_to_user_id_str"),
+        created_at=created,
+        author_followers=user.get("followers_count"),
+        author_username=user.get("screen_name"),
+        in_reply_to_id=tweet.get("in_reply_to_status_id_str"),
+    )
+
+
+def mentions_from_event(payload: Dict[str, Any], bot_user_id: Optional[str] = None) -> List[Mention]:
+    """Menções ao bot em um evento; ignora tweets do próprio bot e de outros usuários assinados."""
+    bot = str(bot_user_id or payload.get("for_user_id") or "")
+    if payload.get("for_user_id") and bot and str(payload["for_user_id"]) != bot:
+        return []
+    mentions = []
+    for tweet in payload.get("tweet_create_events", []):
+        if str((tweet.get("user") or {}).get("id_str")) == bot:
+            continue
+        mentioned = {str(m.get("id_str")) for m in (tweet.get("entities") or {}).get("user_mentions", [])}
+        if bot and bot not in mentioned:
+            continue
+        mentions.append(mention_from_v1(tweet))
+    return mentions
+
+
+class WebhookHub:
+    """Ponto de encontro entre o endpoint HTTP e o pipeline.
+
+    `register(sink)` conecta um consumidor `sink(mentions) -> int` (quantas aceitou);
+    `deliver([])` também é chamado em cada CRC, servindo de sinal de vida do webhook.
+    Sem consumidor registrado os eventos são só contados: o polling de reconciliação
+    do daemon busca essas menções depois.
+    """
+
+    def __init__(self):
+        self._sink: Optional[Callable[[List[Mention]], int]] = None
+        self._lock = threading.Lock()
+        self.bot_user_id: Optional[str] = None
+        self.events = 0
+        self.mentions = 0
+        self.accepted = 0
+        self.unrouted = 0
+        self.rejected = 0
+        self.crc_checks = 0
+        self.last_event_at: Optional[float] = None
+
+    def register(self, sink: Optional[Callable[[List[Mention]], int]], bot_user_id: Optional[str] = None) -> None:
+        with self._lock:
+            self._sink = sink
+            self.bot_user_id = str(bot_user_id) if bot_user_id is not None else None
+
+    def deliver(self, mentions: List[Mention]) -> int:
+        with self._lock:
+            sink = self._sink
+            self.last_event_at = time.time()
+            self.mentions += len(mentions)
+            if sink is None:
+                self.unrouted += len(mentions)
+        if sink is None:
+            return 0
+        accepted = sink(mentions)
+        with self._lock:
+            self.accepted += accepted
+        return accepted
+
+    def note(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "connected": self._sink is not None,
+                "events": self.events,
+                "mentions": self.mentions,
+                "accepted": self.accepted,
+                "unrouted": self.unrouted,
+                "rejected": self.rejected,
+                "crc_checks": self.crc_checks,
+                "last_event_at": self.last_event_at,
+            }
+
+
+_hub = WebhookHub()
+
+
+def get_webhook_hub() -> WebhookHub:
+    return _hub
+
+
+def webhook_stats() -> Dict[str, Any]:
+    return _hub.stats()
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+from typing import Any, Dict, Iterable
+
+
+class BloomFilter:
+    """Bloom filter de tamanho fixo, dimensionado por capacidade e taxa de falso positivo.
+
+    `key in bloom` é False apenas para chaves nunca adicionadas; True pode ser falso
+    positivo (com probabilidade ~`error_rate` enquanto `len(bloom) <= capacity`). Usa
+    double hashing sobre um único blake2b de 16 bytes: custo O(k) por operação.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("capacity > 0 e 0 < error_rate < 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, key: str) -> None:
+        positions = list(self._positions(key))
+        with self._lock:
+            for pos in positions:
+                self._bits[pos >> 3] |= 1 << (pos & 7)
+            self.count += 1
+
+    def __contains__(self, key: object) -> bool:
+        positions = list(self._positions(str(key)))
+        with self._lock:
+            return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in positions)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bits = bytearray(len(self._bits))
+            self.count = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "items": self.count,
+            "bits": self.num_bits,
+            "hashes": self.num_hashes,
+            "bytes": len(self._bits),
+            "error_rate": self.error_rate,
+        }
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """Cache LRU thread-safe com TTL opcional e limite por itens e/ou bytes.
+
+    - `max_items`: número máximo de entradas (None = ilimitado).
+    - `max_bytes`: orçamento de memória estimado via `sizeof(key, value)` (None = ilimitado).
+    - `ttl`: validade de cada entrada em segundos (None = sem expiração).
+    """
+
+    def __init__(
+        self,
+        max_items: Optional[int] = 1024,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        sizeof: Optional[Callable[[Hashable, Any], int]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._sizeof = sizeof or (lambda _k, _v: 0)
+        self._clock = clock
+        # key -> (valor, expira_em, tamanho)
+        self._data: "OrderedDict[Hashable, Tuple[V, Optional[float], int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            value, expires_at, size = item
+            if expires_at is not None and expires_at <= self._clock():
+                del self._data[key]
+                self.bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        size = self._sizeof(key, value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # nunca caberia; não vale a pena descartar o cache inteiro por ele
+        expires_at = self._clock() + ttl if ttl is not None else None
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[2]
+            self._data[key] = (value, expires_at, size)
+            self.bytes += size
+            self._evict()
+
+    def pop(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            item = self._data.pop(key, None)
+            if item is None:
+                return None
+            self.bytes -= item[2]
+            return item[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def _evict(self) -> None:
+        while self._data and (
+            (self.max_items is not None and len(self._data) > self.max_items)
+            or (self.max_bytes is not None and self.bytes > self.max_bytes)
+        ):
+            _, (_, _, size) = self._data.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "items": len(self._data),
+                "bytes": self.bytes,
+                "max_items": self.max_items,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
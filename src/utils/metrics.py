@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Any, Sequence
+
+
+# Buckets padrão em segundos (latências de ms até dezenas de segundos)
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    """Percentil `p` (0–100) por vizinho mais próximo; 0.0 sem valores."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(p / 100 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+class Histogram:
+    """Histograma simples e thread-safe com buckets fixos (estilo Prometheus).
+
+    Guarda apenas contagens por bucket, soma, mínimo e máximo: o custo de memória é
+    constante, independentemente do número de observações.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # último slot = +Inf
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+
+    def observe(self, value: float) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self.count += 1
+            self.total += value
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Retorna um dicionário serializável (JSON) com o estado atual."""
+        with self._lock:
+            counts = list(self._counts)
+            count, total = self.count, self.total
+            vmin, vmax = self.min, self.max
+        labels = [f"le_{b:g}" for b in self.buckets] + ["le_inf"]
+        cumulative: list[int] = []
+        running = 0
+        for c in counts:
+            running += c
+            cumulative.append(running)
+        return {
+            "count": count,
+            "sum": round(total, 6),
+            "avg": round(total / count, 6) if count else None,
+            "min": vmin,
+            "max": vmax,
+            "buckets": dict(zip(labels, cumulative)),
+        }
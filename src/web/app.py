@@ -1,30 +1,57 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 from pathlib import Path
 from typing import Any, Dict
-import concurrent.futures as futures
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 import yaml
 
 from dotenv import load_dotenv, find_dotenv
 
-from src.service.personabot_service import run_single_interaction, run_single_interaction_with_persona
+from src.rag.rag_service import shared_embedding_cache_stats, shared_embedding_stats
+from src.service.manager_pool import pool_stats, warm_default_pool
+from src.service.response_cache import response_cache_stats
+from src.service.semantic_cache import semantic_cache_stats
+from src.service.single_flight import single_flight_stats
+from src.twitter.webhook import webhook_stats
+from src.web.twitter_webhook import router as twitter_webhook_router
+from src.service.personabot_service import (
+    arun_single_interaction,
+    arun_single_interaction_with_persona,
+    astream_interaction,
+)
 
 
 load_dotenv(find_dotenv(usecwd=True), override=False)
 
-app = FastAPI(title="PersonaBot UI", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Pré-aquece o pool de AgentManagers (cliente Chroma + embedder) antes da 1ª requisição
+    if os.getenv("AGENT_POOL_PREWARM", "true").strip().lower() in ("1", "true", "yes"):
+        try:
+            warm_default_pool()
+        except Exception as e:
+            print(f"AVISO: falha ao pré-aquecer o pool de agentes: {e}")
+    yield
+
+
+app = FastAPI(title="PersonaBot UI", version="0.1.0", lifespan=lifespan)
 
 # Servir assets estáticos (index.html + css/js)
 static_dir = Path(__file__).parent / "static"
 app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
+# Webhook da Account Activity API (menções por push; veja `src/web/twitter_webhook.py`)
+app.include_router(twitter_webhook_router)
+
 
 @app.get("/", response_class=HTMLResponse)
 def index() -> Any:
@@ -39,19 +66,63 @@ def health() -> Dict[str, Any]:
     return {"status": "ok"}
 
 
+@app.get("/api/metrics")
+def metrics() -> Dict[str, Any]:
+    return {
+        "ok": True,
+        "metrics": {
+            "agent_pools": pool_stats(),
+            "embedding_engine": shared_embedding_stats(),
+            "embedding_cache": shared_embedding_cache_stats(),
+            "response_cache": response_cache_stats(),
+            "semantic_cache": semantic_cache_stats(),
+            "single_flight": single_flight_stats(),
+            "twitter_webhook": webhook_stats(),
+        },
+    }
+
+
 class AskRequest(BaseModel):
     question: str
+    mode: str | None = None  # "quality" (Crew completa) ou "fast" (uma chamada); padrão: RESPONSE_MODE
 
 
 @app.post("/api/ask")
-def api_ask(payload: AskRequest) -> Dict[str, Any]:
+async def api_ask(payload: AskRequest) -> Dict[str, Any]:
+    # async: a espera pelo LLM não ocupa um worker do threadpool do Starlette
     try:
-        answer = run_single_interaction(payload.question)
+        answer = await arun_single_interaction(payload.question, payload.mode)
         return {"ok": True, "answer": answer}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/api/ask/stream")
+async def api_ask_stream(payload: AskRequest) -> StreamingResponse:
+    """Versão em streaming (Server-Sent Events) de `/api/ask`.
+
+    Emite `stage` no início de cada etapa da Crew, `token` com trechos da resposta final
+    e `done` com a resposta completa; falhas viram um evento `error`.
+    """
+
+    async def _events():
+        try:
+            async for ev in astream_interaction(payload.question, mode=payload.mode):
+                yield _sse(ev["event"], ev["data"])
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # Persona config endpoints
 PERSONA_PATH = Path(__file__).parents[2] / "config" / "persona.yaml"
 PERSONAS_DIR = Path(__file__).parents[2] / "config" / "personas"
@@ -168,10 +239,11 @@ def create_persona(payload: PersonaCreate) -> Dict[str, Any]:
 class AskMultiRequest(BaseModel):
     question: str
     persona_keys: list[str] | None = None  # "default" e/ou nomes de arquivos em config/personas (sem .yaml)
+    mode: str | None = None
 
 
 @app.post("/api/ask-multi")
-def api_ask_multi(payload: AskMultiRequest) -> Dict[str, Any]:
+async def api_ask_multi(payload: AskMultiRequest) -> Dict[str, Any]:
     # Mapeia keys para paths
     keys = payload.persona_keys or ["default"]
     results: dict[str, str] = {}
@@ -185,20 +257,19 @@ def api_ask_multi(payload: AskMultiRequest) -> Dict[str, Any]:
             continue
         key_to_path[k] = PERSONAS_DIR / f"{k}.yaml"
 
-    def _do(k: str, path: Path) -> tuple[str, str]:
+    async def _do(k: str, path: Path) -> tuple[str, str]:
         if not path.exists():
             return k, "[erro] persona não encontrada"
         try:
             persona = _load_yaml(path)
-            ans = run_single_interaction_with_persona(payload.question, persona)
+            ans = await arun_single_interaction_with_persona(payload.question, persona, payload.mode)
             return k, ans
         except Exception as e:
             return k, f"[erro] {e}"
 
-    # Executa em paralelo para acelerar múltiplas personas
-    with futures.ThreadPoolExecutor(max_workers=min(8, max(1, len(key_to_path)))) as ex:
-        for k, ans in ex.map(lambda item: _do(*item), key_to_path.items()):
-            results[k] = ans
+    # Executa as personas concorrentemente no event loop
+    for k, ans in await asyncio.gather(*(_do(k, p) for k, p in key_to_path.items())):
+        results[k] = ans
 
     return {"ok": True, "answers": results}
 
@@ -215,6 +286,7 @@ ENV_KEYS = [
     "LLM_TOP_P",
     "LLM_MAX_TOKENS",
     "USE_RAG_TOOL",
+    "RESPONSE_MODE",
 ]
 
 
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+
+class ServerThread:
+    """App ASGI servida por uvicorn em uma thread (webhook do daemon, API falsa em testes)."""
+
+    def __init__(self, app: Any, host: str = "127.0.0.1", port: int = 0, name: str = "uvicorn"):
+        import uvicorn
+
+        config = uvicorn.Config(app, host=host, port=port, log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, name=name, daemon=True)
+        self.url = ""
+
+    def start(self, timeout: float = 10.0) -> "ServerThread":
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() >= deadline or not self._thread.is_alive():
+                raise RuntimeError("servidor HTTP não iniciou")
+            time.sleep(0.02)
+        host, port = self._server.servers[0].sockets[0].getsockname()[:2]
+        self.url = f"http://{host}:{port}"
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(5)
@@ -0,0 +1,73 @@
+"""Endpoint de webhook do Twitter (Account Activity API), montado em `src/web/app.py`.
+
+`GET  /webhooks/twitter?crc_token=...` responde o desafio CRC;
+`POST /webhooks/twitter` valida a assinatura e entrega as menções ao `WebhookHub`.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Request
+
+from src.twitter.webhook import (
+    SIGNATURE_HEADER,
+    WebhookHub,
+    consumer_secret,
+    crc_response_token,
+    get_webhook_hub,
+    mentions_from_event,
+    verify_signature,
+)
+
+
+WEBHOOK_PATH = "/webhooks/twitter"
+
+
+def create_webhook_router(
+    hub: Optional[WebhookHub] = None,
+    secret: Optional[str] = None,
+    get_secret: Callable[[], Optional[str]] = consumer_secret,
+) -> APIRouter:
+    """Router do webhook; `secret` fixa o consumer secret (padrão: env/credentials, lido uma vez)."""
+    router = APIRouter()
+    resolved: Dict[str, Optional[str]] = {"secret": secret}
+
+    def _hub() -> WebhookHub:
+        return hub if hub is not None else get_webhook_hub()
+
+    def _secret() -> str:
+        if resolved["secret"] is None:
+            resolved["secret"] = get_secret()
+        if not resolved["secret"]:
+            raise HTTPException(status_code=503, detail="consumer secret do Twitter não configurado")
+        return resolved["secret"]
+
+    @router.get(WEBHOOK_PATH)
+    def twitter_crc(crc_token: str) -> Dict[str, Any]:
+        token = crc_response_token(crc_token, _secret())
+        _hub().note("crc_checks")
+        _hub().deliver([])  # sinal de vida: o Twitter ainda fala com o webhook
+        return {"response_token": token}
+
+    @router.post(WEBHOOK_PATH)
+    async def twitter_events(request: Request) -> Dict[str, Any]:
+        body = await request.body()
+        current = _hub()
+        if not verify_signature(body, request.headers.get(SIGNATURE_HEADER), _secret()):
+            current.note("rejected")
+            raise HTTPException(status_code=401, detail="assinatura inválida")
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPException(status_code=400, detail="JSON inválido")
+        current.note("events")
+        mentions = mentions_from_event(payload, current.bot_user_id)
+        # Responde rápido (o Twitter espera < 3 s): o hub só enfileira no pipeline
+        accepted = current.deliver(mentions)
+        return {"ok": True, "mentions": len(mentions), "accepted": accepted}
+
+    return router
+
+
+router = create_webhook_router()
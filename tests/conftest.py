@@ -0,0 +1,18 @@
+import pytest
+
+
+class FakeEmbedder:
+    """Embedder determinístico (sem modelo) para testes que não dependem de semântica."""
+
+    model_name = "fake"
+
+    def embed_documents(self, texts):
+        return [[float(len(t)), float(sum(map(ord, t)) % 97), 1.0] for t in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+@pytest.fixture
+def fake_embedder():
+    return FakeEmbedder()
@@ -0,0 +1,37 @@
+from unittest.mock import MagicMock
+
+from src.agents.agent_manager import AgentManager, response_mode
+
+
+PERSONA = {
+    "name": "Barista",
+    "bio": "Apaixonado por café.",
+    "tone_of_voice": ["leve"],
+    "favorite_topics": ["café"],
+    "avoided_topics": ["política"],
+    "style_params": {"emojis": "poucos"},
+}
+
+
+def test_response_mode_defaults_to_quality(monkeypatch):
+    monkeypatch.delenv("RESPONSE_MODE", raising=False)
+    assert response_mode() == "quality"
+    assert response_mode("FAST") == "fast"
+    assert response_mode("desconhecido") == "quality"
+    monkeypatch.setenv("RESPONSE_MODE", "fast")
+    assert response_mode() == "fast"
+
+
+def test_fast_path_prompt_has_persona_and_context():
+    manager = AgentManager.__new__(AgentManager)
+    manager.persona_config = PERSONA
+    manager.llm = MagicMock()
+    manager.llm.call.return_value = "  Café é vida.  "
+
+    assert manager.run_fast_path("O que acha de café?", ["já falamos de espresso"]) == "Café é vida."
+    (messages,), _ = manager.llm.call.call_args
+    system, user = messages
+    assert "Barista" in system["content"] and "política" in system["content"]
+    assert "Emojis" in system["content"]
+    assert "já falamos de espresso" in user["content"]
+    assert "O que acha de café?" in user["content"]
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+tweepy_async = pytest.importorskip("tweepy.asynchronous")
+if not hasattr(tweepy_async, "AsyncClient"):
+    pytest.skip("tweepy.asynchronous.AsyncClient requer tweepy>=4.10", allow_module_level=True)
+
+from src.pipeline.checkpoint import Checkpoint  # noqa: E402
+from src.pipeline.context import ContextResolver  # noqa: E402
+from src.pipeline.daemon import MentionDaemon  # noqa: E402
+from src.twitter.async_client import AsyncClientThread, AsyncTwitterClient  # noqa: E402
+from src.twitter.fake_server import BOT_ID, FakeServerThread, FakeTwitterState  # noqa: E402
+from src.twitter.rate_limit import RateLimitScheduler  # noqa: E402
+
+
+CREDS = {
+    "consumer_key": "k", "consumer_secret": "s", "access_token": "t", "access_token_secret": "ts", "user_id": BOT_ID,
+}
+
+
+def test_async_client_overlaps_calls_on_one_session():
+    server = FakeServerThread(FakeTwitterState(latency=0.05)).start()
+    scheduler = RateLimitScheduler(limits={"default": (1000, 900)})
+    ids = [server.state.add_tweet(f"@personabot pergunta {i}")["id"] for i in range(30)]
+
+    async def scenario():
+        async with AsyncTwitterClient(scheduler=scheduler, credentials=CREDS, base_url=server.url) as client:
+            mentions = await client.get_recent_mentions(ids[0])
+            assert [m.id for m in mentions] == ids[1:]
+            session = client._session
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            await asyncio.gather(*(client.post_reply(f"resposta {m.id}", m.id) for m in mentions))
+            elapsed = loop.time() - started
+            pages = await client.get_tweets(ids * 5)  # ids repetidos: um lote só
+            assert client._session is session  # mesma sessão (keep-alive) do início ao fim
+            return elapsed, pages
+
+    try:
+        elapsed, pages = asyncio.run(scenario())
+    finally:
+        scheduler.close()
+        server.stop()
+
+    assert len(server.state.replies) == 29
+    assert elapsed < 29 * 0.05  # os posts correram sobrepostos, não em série
+    assert len(pages) == 1 and len(pages[0].data) == 30
+    assert scheduler.stats()["endpoints"]["post"]["limit"] == 200  # headers lidos via trace do aiohttp
+
+
+def test_daemon_polls_and_resolves_context_through_async_client(tmp_path):
+    """Com `--async`, o fetcher e o `ContextResolver` usam o cliente assíncrono num loop próprio."""
+    server = FakeServerThread(FakeTwitterState()).start()
+    scheduler = RateLimitScheduler(limits={"default": (1000, 900)})
+    state = server.state
+    state.add_user("3000", username="ana")
+    root = state.add_tweet("Qual o melhor café?", author_id="3000", mention_bot=False)
+    first = state.add_tweet("@personabot começo", author_id="4000")
+    for i in range(5):
+        state.add_tweet(f"@personabot e você? #{i}", author_id=str(4001 + i), in_reply_to=root["id"])
+
+    reader = AsyncClientThread(scheduler=scheduler, credentials=CREDS, base_url=server.url)
+    resolver = ContextResolver(reader)
+    contexts = []
+    try:
+        Checkpoint(tmp_path / "p.sqlite").set("mentions.since_id", first["id"])
+        daemon = MentionDaemon(
+            reader, lambda m: contexts.append(resolver.context_for(m)), Checkpoint(tmp_path / "p.sqlite"),
+            workers=2, resolver=resolver,
+        )
+        assert daemon.run_once() == 5
+        daemon.drain()
+        daemon.pool.close()
+        session = reader.client._session
+    finally:
+        reader.close()
+        scheduler.close()
+        server.stop()
+
+    assert session is not None and session.closed
+    assert len(contexts) == 5
+    assert all([t["id"] for t in ctx.thread] == [root["id"]] for ctx in contexts)
+    assert contexts[0].lines()[1] == "Tweet respondido (@ana): Qual o melhor café?"
+    assert resolver.stats()["api_calls"] == 1
@@ -0,0 +1,55 @@
+import pytest
+
+from src.rag.compaction import DAY, MemoryCompactor
+from src.rag.rag_service import RAGService
+
+
+@pytest.fixture
+def persistent_rag_service(tmp_path, fake_embedder):
+    chromadb = pytest.importorskip("chromadb")
+    service = RAGService(
+        client=chromadb.PersistentClient(path=str(tmp_path / "chroma")),
+        embedding_function=fake_embedder,
+        collection_name="test_compaction",
+    )
+    return service, tmp_path / "chroma"
+
+
+def test_compaction_expires_old_interactions_into_digests(persistent_rag_service):
+    service, db_dir = persistent_rag_service
+    now = 1_000 * DAY
+    items = [
+        {"id": f"old-{i}", "text": f"pergunta antiga {i}",
+         "metadata": {"persona": "Rony", "user": "1", "timestamp": now - (40 + i) * DAY}}
+        for i in range(5)
+    ]
+    items += [
+        {"id": f"new-{i}", "text": f"pergunta recente {i}", "metadata": {"persona": "Rony", "timestamp": now - i * DAY}}
+        for i in range(3)
+    ]
+    service.store_interactions(items)
+    # Documentos anteriores ao esquema de metadados, gravados direto na coleção
+    service.collection.add(
+        ids=["legacy-none", "legacy-text"],
+        documents=["sem timestamp", "timestamp em texto"],
+        embeddings=service.embedding_function.embed_documents(["sem timestamp", "timestamp em texto"]),
+        metadatas=[{"persona": "Rony"}, {"persona": "Rony", "timestamp": "2020-01-01"}],
+    )
+
+    compactor = MemoryCompactor(service, db_dir=db_dir, clock=lambda: now)
+    dry = compactor.run(max_age_days=30, dry_run=True)
+    assert (dry["expired"], dry["digests"], dry["after"]["documents"]) == (5, 1, 10)
+
+    report = compactor.run(max_age_days=30)
+    assert report["before"]["documents"] == 10
+    assert report["after"]["documents"] == 6  # 3 recentes + 2 legados + 1 resumo
+    assert len(service.collection.get(ids=["legacy-none", "legacy-text"])["ids"]) == 2
+    assert report["vacuumed"] is True
+    assert report["before"]["disk_bytes"] > 0 and report["after"]["query_p50_ms"] >= 0
+
+    digest = service.collection.get(where={"kind": "digest"}, include=["documents", "metadatas"])
+    meta = digest["metadatas"][0]
+    assert (meta["persona"], meta["user"], meta["count"]) == ("Rony", "1", 5)
+    assert "pergunta antiga 0" in digest["documents"][0]
+    # Resumos não expiram de novo nem são duplicados numa segunda rodada
+    assert compactor.run(max_age_days=30)["expired"] == 0
@@ -0,0 +1,59 @@
+import pytest
+
+from src.pipeline.context import ContextResolver
+from src.twitter.client import TwitterClient
+from src.twitter.fake_server import BOT_ID, FakeServerThread, FakeTwitterState
+from src.twitter.rate_limit import RateLimitScheduler
+
+
+CREDS = {
+    "consumer_key": "k", "consumer_secret": "s", "access_token": "t", "access_token_secret": "ts", "user_id": BOT_ID,
+}
+
+
+@pytest.fixture
+def fake_api():
+    server = FakeServerThread(FakeTwitterState()).start()
+    scheduler = RateLimitScheduler(limits={"default": (1000, 900)})
+    client = TwitterClient(scheduler=scheduler, credentials=CREDS, base_url=server.url)
+    yield server.state, client
+    scheduler.close()
+    server.stop()
+
+
+def test_resolver_batches_thread_lookups_and_caches(fake_api):
+    state, client = fake_api
+    state.add_user("3000", username="ana", followers_count=1200)
+    root = state.add_tweet("Qual o melhor café da cidade?", author_id="3000", mention_bot=False)
+    parent = state.add_tweet("Eu gosto do da esquina", author_id="3001", in_reply_to=root["id"], mention_bot=False)
+    for i in range(10):
+        state.add_tweet(f"@personabot e você? #{i}", author_id=str(4000 + i), in_reply_to=parent["id"])
+    state.add_tweet("@personabot oi", author_id="5000")
+
+    mentions = client.get_recent_mentions(None)
+    resolver = ContextResolver(client)
+    before = state.stats()["requests"]
+    contexts = resolver.resolve(mentions)
+
+    # Raiz + tweet respondido num lote; autores já vieram na expansão: uma chamada só
+    assert state.stats()["requests"] - before == 1
+    threaded = contexts[mentions[0].id]
+    assert [t["id"] for t in threaded.thread] == [root["id"], parent["id"]]
+    lines = threaded.lines()
+    assert lines[0] == "Menção enviada por @user4000 (0 seguidores)"
+    assert lines[1] == "Tweet anterior da conversa (@ana): Qual o melhor café da cidade?"
+    assert lines[2] == "Tweet respondido (@user3001): Eu gosto do da esquina"
+    assert contexts[mentions[-1].id].thread == []
+
+    stats = resolver.stats()
+    # Ingênuo: raiz + tweet respondido para cada uma das 10 respostas; a menção solta não custa nada
+    assert stats["api_calls"] == 1
+    assert stats["naive_calls"] == 20
+    assert stats["saved_calls"] == 19
+
+    # Nova menção na mesma thread: tudo vem do cache
+    state.add_tweet("@personabot concordo", author_id="4000", in_reply_to=parent["id"])
+    latest = client.get_recent_mentions(mentions[-1].id)
+    before = state.stats()["requests"]
+    assert resolver.context_for(latest[0]).thread[-1]["id"] == parent["id"]
+    assert state.stats()["requests"] == before
@@ -0,0 +1,71 @@
+import sqlite3
+
+from src.rag.embedding_cache import EmbeddingCache, cache_key
+from src.utils.lru import LRUCache
+
+
+def test_lru_cache_ttl_and_byte_budget():
+    """Entradas expiram pelo TTL e as menos usadas saem quando o orçamento estoura."""
+    now = [0.0]
+    cache = LRUCache(max_items=None, max_bytes=30, ttl=10, sizeof=lambda k, v: 10, clock=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert cache.get("a") == 1  # "a" passa a ser o mais recente
+    cache.set("d", 4)           # estoura 30 bytes -> descarta "b"
+    assert cache.get("b") is None
+    assert cache.bytes == 30
+
+    now[0] = 11.0
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["expirations"] == 1
+
+
+def test_embedding_cache_normalizes_and_counts():
+    cache = EmbeddingCache(max_items=10)
+    cache.set("minilm", "O que acha de café?", [0.1, 0.2])
+    assert cache.get("minilm", "  O que  acha de\ncafé? ") == [0.1, 0.2]
+    assert cache.get("outro-modelo", "O que acha de café?") is None
+    assert cache_key("m", "a  b") == cache_key("m", "a b")
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_embedding_cache_persists_to_disk(tmp_path):
+    """Com `path`, o cache sobrevive a um reinício (nova instância)."""
+    db = tmp_path / "emb.sqlite"
+    EmbeddingCache(path=db).set("minilm", "olá", [1.0, 2.0, 3.0])
+
+    warm = EmbeddingCache(path=db)
+    assert warm.get("minilm", "olá") == [1.0, 2.0, 3.0]
+    assert warm.stats()["disk_hits"] == 1
+
+
+def test_embedding_cache_disk_is_bounded_and_keeps_remaining_ttl(tmp_path):
+    """O SQLite tem teto de linhas, perde as expiradas na abertura e o hit de disco não ganha TTL novo."""
+    db = tmp_path / "emb.sqlite"
+    now = [0.0]
+    cache = EmbeddingCache(path=db, ttl=100, max_disk_items=3, clock=lambda: now[0])
+    for i in range(5):
+        now[0] = float(i)
+        cache.set("minilm", f"texto {i}", [float(i)])
+
+    # Reabertura: só as 3 mais recentes continuam no disco
+    now[0] = 80.0
+    warm = EmbeddingCache(path=db, ttl=100, max_disk_items=3, clock=lambda: now[0])
+    assert warm.get("minilm", "texto 0") is None
+    assert warm.get("minilm", "texto 4") == [4.0]
+    assert warm.stats()["disk_pruned"] == 2
+
+    # Gravada em t=4: na memória vale até t=104, não até 80 + 100
+    now[0] = 103.0
+    assert warm.get("minilm", "texto 4") == [4.0]
+    now[0] = 105.0
+    assert warm.get("minilm", "texto 4") is None
+
+    # Expiradas somem do arquivo na abertura seguinte
+    EmbeddingCache(path=db, ttl=100, max_disk_items=3, clock=lambda: now[0])
+    assert sqlite3.connect(str(db)).execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] == 0
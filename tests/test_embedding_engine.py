@@ -0,0 +1,49 @@
+import threading
+from src.rag.embedding_engine import EmbeddingEngine
+
+
+class CountingEmbedder:
+    """Embedder falso que registra o tamanho de cada chamada a embed_documents."""
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self.lock:
+            self.calls.append(len(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def test_concurrent_queries_are_batched():
+    """Consultas concorrentes dentro da janela viram um único forward pass."""
+    embedder = CountingEmbedder()
+    engine = EmbeddingEngine(embedder, max_batch_size=64, max_wait_ms=50)
+    texts = [f"pergunta {'x' * i}" for i in range(8)]
+
+    futures = [engine.submit_query(t) for t in texts]
+    vectors = [f.result(timeout=5) for f in futures]
+
+    assert vectors == [[float(len(t)), 1.0] for t in texts]
+    assert sum(embedder.calls) == len(texts)
+    assert len(embedder.calls) < len(texts)
+    stats = engine.stats()
+    assert stats["batch_size"]["count"] == len(embedder.calls)
+    assert stats["queue_latency_seconds"]["count"] == len(texts)
+    engine.close()
+
+
+def test_errors_propagate_to_callers():
+    class Broken:
+        def embed_documents(self, texts):
+            raise ValueError("falhou")
+
+    engine = EmbeddingEngine(Broken(), max_wait_ms=1)
+    future = engine.submit(["a", "b"])
+    try:
+        future.result(timeout=5)
+    except ValueError as e:
+        assert str(e) == "falhou"
+    else:
+        raise AssertionError("esperava ValueError")
+    engine.close()
@@ -0,0 +1,45 @@
+import pytest
+
+from src.twitter.fake_server import BOT_ID, FakeServerThread, FakeTwitterState
+from src.twitter.rate_limit import RateLimitScheduler
+from src.twitter.client import TwitterClient
+
+
+CREDS = {
+    "consumer_key": "k", "consumer_secret": "s", "access_token": "t", "access_token_secret": "ts", "user_id": BOT_ID,
+}
+
+
+@pytest.fixture
+def fake_api():
+    server = FakeServerThread(FakeTwitterState(limits={"post": (2, 900)})).start()
+    scheduler = RateLimitScheduler(limits={"post": (100, 900), "mentions": (100, 900), "default": (100, 900)})
+    client = TwitterClient(scheduler=scheduler, credentials=CREDS, base_url=server.url)
+    yield server.state, client, scheduler
+    scheduler.close()
+    server.stop()
+
+
+def test_client_reads_mentions_and_posts_against_fake_api(fake_api):
+    state, client, scheduler = fake_api
+    first = state.add_tweet("@personabot oi")
+    state.add_tweet("@personabot tudo bem?")
+
+    mentions = client.get_recent_mentions(None)
+    assert [m.text for m in mentions] == ["@personabot oi", "@personabot tudo bem?"]
+    assert [m.text for m in client.get_recent_mentions(first["id"])] == ["@personabot tudo bem?"]
+
+    client.submit_reply("Oi!", first["id"]).result(timeout=5)
+    assert state.replies[0]["in_reply_to"] == first["id"]
+    # O hook da sessão sincronizou o bucket com os headers do servidor
+    assert scheduler.stats()["endpoints"]["post"]["limit"] == 2
+
+
+def test_fake_api_rejects_duplicate_replies(fake_api):
+    state, client, _ = fake_api
+    tweet = state.add_tweet("@personabot oi")
+    client.submit_reply("Oi!", tweet["id"]).result(timeout=5)
+    with pytest.raises(Exception) as excinfo:
+        client.submit_reply("Oi!", tweet["id"]).result(timeout=5)
+    assert excinfo.value.response.status_code == 403
+    assert state.stats()["duplicate_replies"] == 1
@@ -0,0 +1,79 @@
+import threading
+import pytest
+from src.service.manager_pool import AgentManagerPool, PoolTimeout
+
+
+class FakeManager:
+    pass
+
+
+def test_pool_reuses_managers():
+    """Managers devolvidos ao pool são reutilizados em vez de recriados."""
+    created = []
+
+    def factory():
+        m = FakeManager()
+        created.append(m)
+        return m
+
+    pool = AgentManagerPool(factory=factory, max_size=2)
+    assert pool.warmup(1) == 1
+
+    with pool.checkout() as first:
+        pass
+    with pool.checkout() as second:
+        pass
+
+    assert first is second
+    assert len(created) == 1
+    stats = pool.stats()
+    assert stats["size"] == 1
+    assert stats["checkouts"] == 2
+    assert stats["in_use"] == 0
+    assert stats["warmup_seconds"]["count"] == 1
+    assert stats["checkout_wait_seconds"]["count"] == 2
+
+
+def test_pool_grows_until_max_size_and_times_out():
+    """O pool cresce sob demanda até `max_size` e depois espera por devolução."""
+    pool = AgentManagerPool(factory=FakeManager, max_size=2, checkout_timeout=0.05)
+    a = pool.acquire()
+    b = pool.acquire()
+    assert a is not b
+
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+
+    threading.Timer(0.02, pool.release, args=(a,)).start()
+    assert pool.acquire(timeout=1.0) is a
+
+
+def test_acquire_async_creates_off_the_loop_and_wakes_on_release():
+    """A criação roda fora do event loop e quem espera acorda com a devolução, sem polling."""
+    import asyncio
+
+    threads = []
+
+    def factory():
+        threads.append(threading.get_ident())
+        return FakeManager()
+
+    pool = AgentManagerPool(factory=factory, max_size=1, checkout_timeout=0.05)
+
+    async def scenario():
+        loop_thread = threading.get_ident()
+        first = await pool.acquire_async()
+        assert threads and threads[0] != loop_thread
+
+        with pytest.raises(PoolTimeout):
+            await pool.acquire_async()
+
+        # Devolução vinda de outra thread acorda a corrotina em espera
+        threading.Timer(0.02, pool.release, args=(first,)).start()
+        second = await pool.acquire_async(timeout=1.0)
+        assert second is first
+        pool.release(second)
+
+    asyncio.run(scenario())
+    assert len(threads) == 1
+    assert pool.stats()["in_use"] == 0
@@ -0,0 +1,128 @@
+from types import SimpleNamespace
+
+from src.pipeline.checkpoint import Checkpoint
+from src.pipeline.daemon import MentionDaemon, strip_mentions
+from src.twitter.client import Mention, TwitterClient
+
+
+class FakeClient:
+    """Timeline em memória; `get_recent_mentions` respeita o since_id como a API."""
+
+    def __init__(self, ids):
+        self.mentions = [Mention(id=str(i), text=f"@bot pergunta {i}") for i in ids]
+
+    def get_recent_mentions(self, last_tweet_id=None):
+        if last_tweet_id is None:
+            return list(self.mentions)
+        return [m for m in self.mentions if int(m.id) > int(last_tweet_id)]
+
+
+def test_daemon_processes_oldest_first_and_resumes_after_restart(tmp_path):
+    db = tmp_path / "pipeline.sqlite"
+    client = FakeClient([10, 11, 12])
+    seen = []
+    MentionDaemon(client, lambda m: seen.append(m.id), Checkpoint(db), backfill=True).run_once()
+    assert seen == ["10", "11", "12"]
+
+    # "Reinício": novo daemon, mesmo banco; só a menção nova é tratada
+    client.mentions.append(Mention(id="13", text="@bot mais uma"))
+    daemon = MentionDaemon(client, lambda m: seen.append(m.id), Checkpoint(db))
+    assert daemon.run_once() == 1
+    assert seen == ["10", "11", "12", "13"]
+    assert daemon.since_id == "13"
+
+
+def test_first_run_without_backfill_only_sets_checkpoint(tmp_path):
+    seen = []
+    daemon = MentionDaemon(FakeClient([5, 6]), seen.append, Checkpoint(tmp_path / "p.sqlite"))
+    assert daemon.run_once() == 0
+    assert seen == []
+    assert daemon.since_id == "6"
+
+
+def test_failed_mention_is_retried_then_given_up(tmp_path):
+    attempts = []
+
+    def handler(m):
+        attempts.append(m.id)
+        if m.id == "2":
+            raise RuntimeError("LLM indisponível")
+
+    daemon = MentionDaemon(FakeClient([1, 2, 3]), handler, Checkpoint(tmp_path / "p.sqlite"), max_attempts=2, backfill=True)
+    daemon.run_once()
+    assert daemon.since_id == "1"  # parou antes da menção com falha
+    daemon.run_once()
+    assert attempts == ["1", "2", "2", "3"]
+    assert daemon.since_id == "3"
+    stats = daemon.stats()
+    assert (stats["failed"], stats["gave_up"], stats["dropped"]) == (2, 1, 0)
+
+
+def test_dry_run_leaves_checkpoint_and_seen_index_untouched(tmp_path):
+    from src.pipeline.seen import SeenIndex
+
+    db = tmp_path / "p.sqlite"
+    Checkpoint(db).set("mentions.since_id", "1")
+    handled = []
+    daemon = MentionDaemon(
+        FakeClient([1, 2, 3]), lambda m: handled.append(m.id), Checkpoint(db), seen=SeenIndex(db), dry_run=True
+    )
+    assert daemon.run_once() == 2
+    assert daemon.run_once() == 0  # o progresso em memória evita repetir no mesmo processo
+    assert handled == ["2", "3"]
+
+    # A execução real seguinte ainda responde as menções
+    daemon = MentionDaemon(FakeClient([1, 2, 3]), lambda m: handled.append(m.id), Checkpoint(db), seen=SeenIndex(db))
+    assert daemon.since_id == "1"
+    assert daemon.run_once() == 2
+    assert handled == ["2", "3", "2", "3"]
+
+
+def test_get_recent_mentions_paginates_and_sorts_oldest_first():
+    tweet = lambda i: SimpleNamespace(id=i, text=f"t{i}", author_id=1, conversation_id=i, in_reply_to_user_id=None)
+    pages = [
+        SimpleNamespace(data=[tweet(30), tweet(29)], meta={"next_token": "p2"}),
+        SimpleNamespace(data=[tweet(28)], meta={}),
+    ]
+    calls = []
+
+    def get_users_mentions(user_id, **kwargs):
+        calls.append(kwargs)
+        return pages[len(calls) - 1]
+
+    client = TwitterClient.__new__(TwitterClient)
+    client.api_v2 = SimpleNamespace(get_users_mentions=get_users_mentions)
+    client._user_id = "42"
+
+    mentions = client.get_recent_mentions("27")
+    assert [m.id for m in mentions] == ["28", "29", "30"]
+    assert calls[0]["since_id"] == "27" and calls[1]["pagination_token"] == "p2"
+
+
+def test_strip_mentions():
+    assert strip_mentions("@bot @outro  O que acha de café?") == "O que acha de café?"
+
+
+def test_daemon_fetches_backlog_larger_than_old_page_cap(tmp_path):
+    """900 menções após o checkpoint (mais que 8 páginas de 100): nenhuma pode se perder."""
+    from src.twitter.fake_server import BOT_ID, FakeServerThread, FakeTwitterState
+    from src.twitter.rate_limit import RateLimitScheduler
+
+    server = FakeServerThread(FakeTwitterState()).start()
+    scheduler = RateLimitScheduler(limits={"default": (1000, 900)})
+    creds = {"consumer_key": "k", "consumer_secret": "s", "access_token": "t", "access_token_secret": "ts", "user_id": BOT_ID}
+    try:
+        client = TwitterClient(scheduler=scheduler, credentials=creds, base_url=server.url)
+        start = server.state.add_tweet("@personabot início")
+        for i in range(900):
+            server.state.add_tweet(f"@personabot q{i}")
+        checkpoint = Checkpoint(tmp_path / "p.sqlite")
+        checkpoint.set("mentions.since_id", start["id"])
+        seen = []
+        daemon = MentionDaemon(client, lambda m: seen.append(m.text), checkpoint)
+        assert daemon.run_once() == 900
+        assert seen == [f"@personabot q{i}" for i in range(900)]
+        assert daemon.since_id == server.state.mention_ids[-1]
+    finally:
+        scheduler.close()
+        server.stop()
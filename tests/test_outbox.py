@@ -0,0 +1,82 @@
+import time
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+from src.pipeline.outbox import Outbox, OutboxSender, backoff_delay
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message=""):
+        super().__init__(message)
+        self.response = SimpleNamespace(status_code=status)
+
+
+def test_enqueue_is_idempotent_per_mention(tmp_path):
+    outbox = Outbox(tmp_path / "p.sqlite")
+    assert outbox.enqueue("100", "primeira") is True
+    assert outbox.enqueue("100", "de novo") is False
+    assert "100" in outbox
+    assert outbox.counts()["pending"] == 1
+
+
+def test_sender_retries_transient_errors_and_fails_permanent(tmp_path):
+    outbox = Outbox(tmp_path / "p.sqlite")
+    for key in ("1", "2", "3"):
+        outbox.enqueue(key, f"resposta {key}")
+    calls = []
+
+    def send(text, in_reply_to):
+        calls.append(in_reply_to)
+        future = Future()
+        if in_reply_to == "2" and calls.count("2") == 1:
+            future.set_exception(HTTPError(503))
+        elif in_reply_to == "3":
+            future.set_exception(HTTPError(403, "not allowed"))
+        else:
+            future.set_result(SimpleNamespace(id=f"r{in_reply_to}"))
+        return future
+
+    sender = OutboxSender(outbox, send, base_delay=0.0)
+    assert sender.flush() == 3
+    assert sender.flush() == 1  # retentativa do "2" (backoff zero)
+    stats = sender.stats()
+    assert (stats["sent"], stats["retried"], stats["failed"]) == (2, 1, 1)
+    assert stats["queue"]["sent"] == 2 and stats["queue"]["failed"] == 1
+
+
+def test_in_flight_entries_return_to_queue_after_crash(tmp_path):
+    path = tmp_path / "p.sqlite"
+    outbox = Outbox(path)
+    outbox.enqueue("7", "oi")
+    assert len(outbox.claim_due(10)) == 1  # "crash" durante o envio
+    assert Outbox(path).counts()["pending"] == 1
+
+
+def test_backoff_has_jitter_and_cap():
+    delays = [backoff_delay(10, base=1.0, max_delay=5.0) for _ in range(50)]
+    assert all(0 <= d <= 5.0 for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_sender_clears_timers_of_sent_and_stale_entries(tmp_path):
+    """O SQLite decide o que sai; o heap de prazos não guarda avisos de entradas já resolvidas."""
+    outbox = Outbox(tmp_path / "p.sqlite")
+    outbox.enqueue("1", "oi")
+    sender = OutboxSender(outbox, lambda text, in_reply_to: SimpleNamespace(id="r1"), poll_interval=0.05)
+    sender.schedule("1", time.time())
+    assert sender.flush() == 1
+    assert len(sender.timers) == 0
+
+    # Prazo vencido de uma resposta que outro processo já postou
+    outbox.enqueue("2", "tchau")
+    outbox.mark_sent("2", "r2")
+    sender.schedule("2", time.time())
+    sender.start()
+    try:
+        deadline = time.time() + 2
+        while len(sender.timers) and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        sender.stop(timeout=1)
+    assert len(sender.timers) == 0
+    assert sender.stats()["sent"] == 1
@@ -0,0 +1,142 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.service import personabot_service as service
+from src.service.manager_pool import AgentManagerPool
+from src.service.response_cache import MemoryResponseCache
+from src.service.single_flight import SingleFlight
+
+
+class FakeStreamingOutput:
+    """Imita o CrewStreamingOutput: iterável de chunks + `.result` ao final."""
+
+    def __init__(self, chunks, raw):
+        self._chunks = chunks
+        self.result = SimpleNamespace(raw=raw)
+
+    def __iter__(self):
+        return iter(self._chunks)
+
+
+@pytest.fixture
+def fake_pool(mocker):
+    manager = MagicMock()
+    manager.llm.stream = False
+    pool = AgentManagerPool(factory=lambda: manager, max_size=1)
+    mocker.patch.object(service, "get_pool", return_value=pool)
+    mocker.patch.object(service, "_search_context", return_value=["interação antiga"])
+    mocker.patch.object(service, "get_response_cache", return_value=MemoryResponseCache())
+    mocker.patch.object(service, "get_semantic_cache", return_value=None)
+    mocker.patch.object(service, "get_single_flight", return_value=SingleFlight())
+    return pool, manager
+
+
+def test_stream_interaction_emits_stages_and_final_tokens(fake_pool, mocker):
+    """Eventos de etapa para cada task e tokens apenas da resposta final (sem preâmbulo ReAct)."""
+    _, manager = fake_pool
+    chunk = lambda i, text: SimpleNamespace(task_index=i, content=text, agent_role=f"agent{i}")
+    chunks = [
+        chunk(0, "contexto..."),
+        chunk(1, "diretrizes..."),
+        chunk(2, "Thought: pronto\nFinal "),
+        chunk(2, "Answer: Café "),
+        chunk(2, "é vida."),
+    ]
+    crew = MagicMock()
+    crew.tasks = [1, 2, 3]
+    crew.kickoff.return_value = FakeStreamingOutput(chunks, "Café é vida.")
+    mocker.patch.object(service, "_build_crew", return_value=crew)
+    mocker.patch.object(service, "_supports_crew_streaming", return_value=True)
+
+    events = list(service.stream_interaction("O que acha de café?"))
+
+    stages = [e["data"]["stage"] for e in events if e["event"] == "stage"]
+    tokens = "".join(e["data"]["text"] for e in events if e["event"] == "token")
+    assert stages == ["rag", "context", "persona", "response"]
+    assert tokens == "Café é vida."
+    assert events[-1]["event"] == "done"
+    assert events[-1]["data"]["answer"] == "Café é vida."
+    assert events[-1]["data"]["ttft_ms"] is not None
+    assert manager.llm.stream is False
+
+
+def test_stream_interaction_blocks_unsafe_question(fake_pool):
+    events = list(service.stream_interaction("fale de política"))
+    assert events[-1]["data"]["answer"] == service.BLOCKED_ANSWER
+
+
+def test_identical_question_is_served_from_response_cache(fake_pool, mocker):
+    """A mesma pergunta (persona/LLM/contexto iguais) não executa a Crew de novo."""
+    pool, _ = fake_pool
+    run = mocker.patch.object(service, "_run_crew", return_value="Café é vida.")
+
+    first = service.run_single_interaction("O que acha de café?")
+    second = service.run_single_interaction("  o que acha   de CAFÉ? ")
+
+    assert first == second == "Café é vida."
+    assert run.call_count == 1
+    assert pool.stats()["checkouts"] == 1
+
+
+def test_fast_mode_uses_single_llm_call(fake_pool, mocker):
+    """No modo rápido a Crew não é montada; a resposta vem de uma chamada ao LLM."""
+    _, manager = fake_pool
+    manager.run_fast_path.return_value = "Café é vida."
+    build = mocker.patch.object(service, "_build_crew")
+
+    answer = service.run_single_interaction("O que acha de café?", mode="fast")
+
+    assert answer == "Café é vida."
+    manager.run_fast_path.assert_called_once_with("O que acha de café?", ["interação antiga"])
+    build.assert_not_called()
+    # Modos diferentes não compartilham entradas do cache de respostas
+    run = mocker.patch.object(service, "_run_crew", return_value="Resposta da Crew.")
+    assert service.run_single_interaction("O que acha de café?", mode="quality") == "Resposta da Crew."
+    assert run.call_count == 1
+
+
+def test_concurrent_identical_questions_share_one_execution(fake_pool, mocker):
+    """Chamadas simultâneas com a mesma chave aguardam a mesma geração."""
+    import asyncio
+
+    _, manager = fake_pool
+    flight = SingleFlight()
+    mocker.patch.object(service, "get_single_flight", return_value=flight)
+    mocker.patch.object(service, "get_response_cache", return_value=None)
+
+    async def slow_fast_path(question, context):
+        await asyncio.sleep(0.05)
+        return "Café é vida."
+
+    manager.arun_fast_path.side_effect = slow_fast_path
+
+    async def main():
+        return await asyncio.gather(
+            *(service.arun_single_interaction("O que acha de café?", mode="fast") for _ in range(5))
+        )
+
+    answers = asyncio.run(main())
+
+    assert answers == ["Café é vida."] * 5
+    assert manager.arun_fast_path.call_count == 1
+    assert flight.stats()["executions"] == 1
+    assert flight.stats()["coalesced"] == 4
+
+
+def test_semantic_cache_failures_are_reported_not_swallowed(fake_pool, mocker, capsys):
+    """Falhas do cache semântico não derrubam a resposta, mas aparecem no log e nas métricas."""
+    semantic = MagicMock(errors=0)
+    semantic.lookup.side_effect = RuntimeError("chroma fora")
+    semantic.store.side_effect = RuntimeError("chroma fora")
+    mocker.patch.object(service, "get_semantic_cache", return_value=semantic)
+
+    prepared = service._prepare("O que acha de café?", {"name": "Rony"}, "fast")
+    assert prepared.cached is None
+    service._remember(prepared, "Café é vida.")
+
+    assert semantic.errors == 2
+    out = capsys.readouterr().out
+    assert "AVISO: falha ao consultar o cache semântico: chroma fora" in out
+    assert "AVISO: falha ao gravar no cache semântico: chroma fora" in out
@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from src.pipeline.precompute import PostQueue, PrecomputeJob, in_window, parse_hours
+
+
+PERSONAS = {
+    "default": {"name": "Rony", "favorite_topics": ["café", "tecnologia"]},
+    "minimalista": {"name": "Lia", "favorite_topics": ["arquitetura"]},
+}
+
+
+def test_job_fills_queue_per_persona_and_rotates_topics(tmp_path):
+    calls = []
+
+    def generate(persona, topic, recent):
+        calls.append((persona["name"], topic, list(recent)))
+        return f"{persona['name']} sobre {topic} #{len(calls)}"
+
+    job = PrecomputeJob(PostQueue(tmp_path / "p.sqlite"), PERSONAS, generate=generate, per_persona=3, model="m")
+    assert job.run_once() == 6
+    assert [c[1] for c in calls[:3]] == ["café", "tecnologia", "café"]
+    assert calls[1][2] == ["Rony sobre café #1"]  # posts anteriores vão no prompt
+    # Fila cheia: nada a gerar na próxima rodada
+    assert job.run_once() == 0
+
+    # Os candidatos sobrevivem a um reinício, com os metadados
+    queue = PostQueue(tmp_path / "p.sqlite")
+    assert queue.counts() == {"default": {"pending": 3}, "minimalista": {"pending": 3}}
+    first = queue.take("default")
+    assert (first["topic"], first["text"], first["model"]) == ("café", "Rony sobre café #1", "m")
+    assert queue.pending("default") == 2
+
+
+def test_job_stops_when_system_is_busy(tmp_path):
+    busy = iter([True, True, False])
+    job = PrecomputeJob(
+        PostQueue(tmp_path / "p.sqlite"), PERSONAS,
+        generate=lambda persona, topic, recent: "post", per_persona=5, idle=lambda: next(busy, False),
+    )
+    assert job.run_once() == 2
+    assert job.stats()["interrupted"] == 1
+
+
+def test_off_peak_window():
+    assert parse_hours("") is None
+    assert in_window(parse_hours("2-6"), datetime(2024, 1, 1, 3))
+    assert not in_window(parse_hours("2-6"), datetime(2024, 1, 1, 6))
+    assert in_window(parse_hours("22-4"), datetime(2024, 1, 1, 23))
+    assert in_window(parse_hours("22-4"), datetime(2024, 1, 1, 1))
+    assert not in_window(parse_hours("22-4"), datetime(2024, 1, 1, 12))
@@ -0,0 +1,47 @@
+import time
+
+from src.pipeline.priority import MentionScorer, priority_class
+from src.pipeline.workers import WorkerPool
+from src.twitter.client import Mention
+
+
+def _run_in_order(pool, items):
+    for item in items:
+        pool.submit(item)
+    order = []
+    pool.handler = order.append
+    pool.start()
+    pool.join()
+    pool.close()
+    return order
+
+
+def test_priority_pool_serves_highest_score_first_with_class_metrics():
+    scores = {"a": 0.1, "b": 2.0, "c": 1.0}
+    pool = WorkerPool(None, workers=1, priority=scores.get, classify=priority_class)
+    assert _run_in_order(pool, ["a", "b", "c"]) == ["b", "c", "a"]
+    by_class = pool.stats()["priority"]["queue_wait_by_class"]
+    assert {k: v["count"] for k, v in by_class.items()} == {"high": 1, "normal": 1, "low": 1}
+
+
+def test_aging_prevents_starvation():
+    scores = {"velha": 0.0, "nova": 1.0}
+    pool = WorkerPool(None, workers=1, priority=scores.get, aging=100.0)
+    pool.submit("velha")
+    time.sleep(0.05)  # 0.05 s x 100 pontos/s > diferença de pontuação
+    assert _run_in_order(pool, ["nova"]) == ["velha", "nova"]
+
+
+def test_mention_scorer_components():
+    now = 1_700_000_000.0
+    scorer = MentionScorer(half_life=60, clock=lambda: now)
+    fresh = Mention(id="10", text="oi", created_at="2023-11-14T22:13:20+00:00")
+    stale = Mention(id="11", text="oi", created_at="2023-11-14T22:03:20Z")
+    famous = Mention(id="12", text="oi", author_followers=1_000_000)
+    assert scorer(fresh) > scorer(stale)
+    assert scorer(famous) == scorer(Mention(id="13", text="oi")) + 1.0
+
+    reply = Mention(id="20", text="e aí?", conversation_id="5")
+    before = scorer(reply)
+    scorer.note_handled(Mention(id="6", text="", conversation_id="5"))
+    assert scorer(reply) == before + 1.0
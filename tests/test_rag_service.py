@@ -1,5 +1,6 @@
 import pytest
 import shutil
+import uuid
 from pathlib import Path
 from src.rag.rag_service import RAGService
 
@@ -13,27 +14,22 @@ def rag_service_fixture():
     if test_db_path.exists():
         shutil.rmtree(test_db_path)
     
-    # Monkeypatch o caminho do DB no RAGService para usar o diretório de teste
-    original_path = RAGService.__init__
-    def patched_init(self):
-        # Se não houver sentence_transformers instalado, pula o teste
-        pytest.importorskip('sentence_transformers')
-        self.client = pytest.importorskip('chromadb').PersistentClient(path=str(test_db_path))
-        from langchain_community.embeddings import SentenceTransformerEmbeddings
-        self.embedding_function = SentenceTransformerEmbeddings(model_name="all-MiniLM-L6-v2")
-        # Para manter compatibilidade com Chroma 1.x, evitamos passar embedding_function na coleção
-        # e sinalizamos para o serviço calcular embeddings no cliente.
-        self._supports_collection_embedding = False
-        self.collection = self.client.get_or_create_collection(name="test_interactions")
-    
-    RAGService.__init__ = patched_init
-    service = RAGService()
+    # Se não houver sentence_transformers instalado, pula o teste
+    pytest.importorskip('sentence_transformers')
+    chromadb = pytest.importorskip('chromadb')
+    from langchain_community.embeddings import SentenceTransformerEmbeddings
+
+    # Cliente e coleção de teste; com Chroma 1.x os embeddings são calculados no cliente
+    service = RAGService(
+        client=chromadb.PersistentClient(path=str(test_db_path)),
+        embedding_function=SentenceTransformerEmbeddings(model_name="all-MiniLM-L6-v2"),
+        collection_name="test_interactions",
+    )
     
     yield service
     
     # Limpeza após o teste
     shutil.rmtree(test_db_path)
-    RAGService.__init__ = original_path
 
 def test_store_and_search(rag_service_fixture: RAGService):
     """Testa se o serviço consegue armazenar e depois buscar uma interação."""
@@ -54,3 +50,127 @@ def test_store_and_search(rag_service_fixture: RAGService):
     # Verifica se o resultado é o esperado
     assert len(results) == 1
     assert results[0] == text
+
+
+@pytest.fixture
+def fake_rag_service(fake_embedder):
+    """RAGService com Chroma em memória e embedder falso."""
+    chromadb = pytest.importorskip('chromadb')
+    service = RAGService(
+        client=chromadb.EphemeralClient(),
+        embedding_function=fake_embedder,
+        collection_name=f"test_bulk_{uuid.uuid4().hex[:8]}",
+    )
+    yield service
+    service.client.delete_collection(service.collection.name)
+
+
+def test_store_interactions_bulk_dedupes(fake_rag_service: RAGService):
+    """A ingestão em lote grava em blocos e ignora ids repetidos ou já existentes."""
+    service = fake_rag_service
+    service.store_interaction("existing", "já estava lá", {"user": "a"})
+
+    items = [{"id": f"id_{i}", "text": f"interação {i}", "metadata": {"user": "u"}} for i in range(10)]
+    items.append({"id": "id_3", "text": "repetida"})
+    items.append({"id": "existing", "text": "já estava lá"})
+    items.append({"text": "sem id"})
+
+    stats = service.store_interactions(items, batch_size=4, write_chunk_size=3)
+
+    assert stats["received"] == 13
+    assert stats["stored"] == 10
+    assert stats["skipped_duplicate"] == 1
+    assert stats["skipped_existing"] == 1
+    assert stats["invalid"] == 1
+    assert service.collection.count() == 11
+
+
+
+def test_store_interactions_buffers_writes_across_embed_batches(fake_rag_service: RAGService):
+    """Lotes de 4 no embedder, escritas de 10: 25 docs viram 3 `collection.add` (10, 10, 5)."""
+    service = fake_rag_service
+    embed_calls, add_sizes = [], []
+    embed_documents = service.embedding_function.embed_documents
+    add = service.collection.add
+
+    def counting_embed(texts):
+        embed_calls.append(len(texts))
+        return embed_documents(texts)
+
+    def counting_add(**kwargs):
+        add_sizes.append(len(kwargs["ids"]))
+        assert len(kwargs["embeddings"]) == len(kwargs["ids"])
+        return add(**kwargs)
+
+    service.embedding_function.embed_documents = counting_embed
+    service.collection.add = counting_add
+    items = [{"id": f"id_{i}", "text": f"interação {i}"} for i in range(25)]
+
+    stats = service.store_interactions(items, batch_size=4, write_chunk_size=10)
+
+    assert embed_calls == [4, 4, 4, 4, 4, 4, 1]
+    assert add_sizes == [10, 10, 5]
+    assert stats["writes"] == 3 and stats["stored"] == 25
+    assert service.collection.count() == 25
+
+def test_search_filters_by_metadata_inside_chroma(fake_rag_service: RAGService):
+    """Filtros de persona, usuário, canal e período restringem os vizinhos no próprio Chroma."""
+    service = fake_rag_service
+    docs = [
+        ("a", "café de manhã", {"persona": "Rony", "user": "1", "channel": "twitter", "timestamp": "2025-01-01T12:00:00Z"}),
+        ("b", "café de tarde", {"persona": "Lia", "user": "1", "channel": "web", "timestamp": "2025-02-01T12:00:00Z"}),
+        ("c", "café à noite", {"persona": "Rony", "user": "2", "channel": "twitter", "timestamp": "2025-03-01T12:00:00Z"}),
+    ]
+    for doc_id, text, metadata in docs:
+        service.store_interaction(doc_id, text, metadata)
+
+    assert service.collection.get(ids=["a"])["metadatas"][0]["timestamp"] == 1735732800.0
+    assert sorted(service.search_similar_interactions("café", n_results=5, persona="Rony")) == [
+        "café de manhã", "café à noite",
+    ]
+    assert service.search_similar_interactions("café", n_results=5, persona="Rony", user="2") == ["café à noite"]
+    assert service.search_similar_interactions("café", n_results=5, channel="web") == ["café de tarde"]
+    assert service.search_similar_interactions(
+        "café", n_results=5, since="2025-01-15T00:00:00Z", until="2025-02-15T00:00:00Z"
+    ) == ["café de tarde"]
+    assert service.search_similar_interactions("café", n_results=5, persona="Ninguém") == []
+
+
+
+def test_store_interactions_applies_metadata_schema_to_every_item(fake_rag_service: RAGService):
+    """Itens sem metadados também ganham `timestamp`; timestamp ilegível é inválido, não "agora"."""
+    service = fake_rag_service
+    stats = service.store_interactions([
+        {"id": "sem_meta", "text": "sem metadados"},
+        {"id": "ruim", "text": "data ruim", "metadata": {"timestamp": "ontem à tarde"}},
+        {"id": "ok", "text": "com data", "metadata": {"user": 7, "timestamp": "2025-01-01T00:00:00Z"}},
+    ])
+    assert (stats["stored"], stats["invalid"]) == (2, 1)
+    got = service.collection.get(ids=["sem_meta", "ok"], include=["metadatas"])
+    meta = dict(zip(got["ids"], got["metadatas"]))
+    assert isinstance(meta["sem_meta"]["timestamp"], float)
+    assert meta["ok"] == {"user": "7", "timestamp": 1735689600.0}
+    with pytest.raises(ValueError):
+        service.store_interaction("ruim", "data ruim", {"timestamp": "ontem à tarde"})
+
+def test_search_interactions_returns_rich_hits_and_applies_cutoffs(fake_rag_service: RAGService):
+    """Resultados trazem id, distância e metadados; o corte de distância pode zerar a lista."""
+    service = fake_rag_service
+    service.store_interaction("igual", "café", {"persona": "Rony", "timestamp": 1000})
+    service.store_interaction("perto", "cafe", {"persona": "Rony", "timestamp": 2000})
+    service.store_interaction("longe", "uma pergunta bem diferente e comprida", {"persona": "Lia", "timestamp": 3000})
+
+    hits = service.search_interactions("café", n_results=3)
+    assert [h.id for h in hits] == ["igual", "perto", "longe"]
+    assert hits[0].distance == 0.0
+    assert hits[0].metadata == {"persona": "Rony", "timestamp": 1000.0}
+    assert hits[1].distance < hits[2].distance
+
+    assert [h.id for h in service.search_interactions("café", n_results=3, max_distance=hits[1].distance)] == [
+        "igual", "perto",
+    ]
+    # Adaptativo: vizinhos muito piores que o melhor não completam o top-n
+    near = service.search_interactions("café", n_results=3, spread=hits[1].distance)
+    assert [h.id for h in near] == ["igual", "perto"]
+    # Nada relevante: nenhum trecho vai para o prompt
+    assert service.search_similar_interactions("xyz" * 30, n_results=3, max_distance=1.0) == []
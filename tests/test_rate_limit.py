@@ -0,0 +1,60 @@
+from concurrent.futures import wait
+from types import SimpleNamespace
+
+from src.twitter.rate_limit import EndpointBucket, RateLimitScheduler, classify_endpoint
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_paces_remaining_quota_until_reset():
+    clock = Clock()
+    bucket = EndpointBucket(limit=100, window=100, burst=2, clock=clock)
+    bucket.consume()
+    bucket.consume()
+    # Rajada esgotada: próxima chamada após ~1s (98 restantes / 100s)
+    assert 0.9 < bucket.wait_time() < 1.1
+
+    # O servidor informa que restam 0 chamadas até o reset em 30s
+    bucket.update(limit=100, remaining=0, reset_at=clock.now + 30)
+    assert bucket.wait_time() == 30
+    clock.now += 30
+    assert bucket.wait_time() == 0
+    assert bucket.remaining == 100
+
+
+def test_classify_endpoint():
+    assert classify_endpoint("GET", "https://api.twitter.com/2/users/42/mentions?max_results=100") == "mentions"
+    assert classify_endpoint("POST", "https://api.twitter.com/1.1/statuses/update.json") == "post"
+    assert classify_endpoint("GET", "https://api.twitter.com/2/tweets?ids=1,2") == "lookup"
+    assert classify_endpoint("GET", "https://example.com/") is None
+
+
+def test_scheduler_retries_after_429_and_returns_futures():
+    scheduler = RateLimitScheduler(limits={"post": (600, 60), "default": (600, 60)}, max_workers=2)
+    attempts = []
+
+    class TooMany(Exception):
+        response = SimpleNamespace(
+            status_code=429,
+            headers={"x-rate-limit-limit": "600", "x-rate-limit-remaining": "500", "x-rate-limit-reset": "0"},
+        )
+
+    def post(i):
+        attempts.append(i)
+        if i == 0 and attempts.count(0) == 1:
+            raise TooMany()
+        return f"ok {i}"
+
+    futures = [scheduler.submit("post", post, i) for i in range(3)]
+    wait(futures, timeout=5)
+    assert [f.result() for f in futures] == ["ok 0", "ok 1", "ok 2"]
+    stats = scheduler.stats()
+    assert stats["throttled"] == 1
+    assert stats["endpoints"]["post"]["queue_wait"]["count"] == 4
+    scheduler.close()
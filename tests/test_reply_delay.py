@@ -0,0 +1,49 @@
+import time
+from types import SimpleNamespace
+
+from src.pipeline.delay import TimerHeap, humanized_delay
+from src.pipeline.outbox import Outbox, OutboxSender
+
+
+def test_timer_heap_releases_in_due_order_and_handles_reschedule():
+    now = [100.0]
+    timers = TimerHeap(clock=lambda: now[0])
+    for i in range(1000):
+        timers.schedule(f"k{i}", 200.0 + i)
+    timers.schedule("a", 150.0)
+    timers.schedule("b", 120.0)
+    timers.schedule("a", 110.0)  # reagendada: vale o prazo novo
+    assert len(timers) == 1002 and timers.wait_time() == 10.0
+    now[0] = 130.0
+    assert timers.pop_due() == ["a", "b"]
+    now[0] = 202.0
+    assert timers.pop_due() == ["k0", "k1", "k2"]
+    assert timers.next_due() == 203.0
+
+
+def test_humanized_delay_range(monkeypatch):
+    monkeypatch.setenv("REPLY_DELAY_MIN_S", "120")
+    monkeypatch.setenv("REPLY_DELAY_MAX_S", "900")
+    assert all(120 <= humanized_delay() <= 900 for _ in range(100))
+    assert humanized_delay(0, 0) == 0.0
+
+
+def test_delayed_replies_survive_restart_and_post_on_time(tmp_path):
+    path = tmp_path / "p.sqlite"
+    Outbox(path).enqueue("1", "já", delay=0)
+    Outbox(path).enqueue("2", "daqui a pouco", delay=0.3)
+    Outbox(path).enqueue("3", "bem depois", delay=3600)
+
+    # "Reinício": um novo sender recarrega os prazos do banco
+    posted = []
+    sender = OutboxSender(Outbox(path), lambda text, key: posted.append((key, time.time())) or SimpleNamespace(id=key))
+    sender.start()
+    deadline = time.time() + 3
+    while len(posted) < 2 and time.time() < deadline:
+        time.sleep(0.02)
+    sender.stop(timeout=2)
+
+    assert [key for key, _ in posted] == ["1", "2"]
+    stats = sender.stats()
+    assert stats["queue"]["pending"] == 1 and stats["scheduled"] == 1
+    assert stats["release_lag"]["max"] < 1.0  # liberada no prazo, sem esperar o poll de 5 s
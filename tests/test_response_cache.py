@@ -0,0 +1,49 @@
+from src.service.response_cache import MemoryResponseCache, SQLiteResponseCache, make_response_key
+
+PERSONA = {"name": "Rony", "tone_of_voice": ["irônico"]}
+LLM = {"provider": "openai", "model": "gpt-4o-mini", "temperature": 0.1, "top_p": 0.9, "max_tokens": 256}
+
+
+def test_key_depends_on_every_component():
+    """Pergunta normalizada, persona, parâmetros do LLM e contexto do RAG entram na chave."""
+    base = make_response_key("O que acha de café?", PERSONA, LLM, ["ctx"])
+    assert base == make_response_key("  o que acha de CAFÉ?", PERSONA, LLM, ["ctx"])
+    assert base != make_response_key("O que acha de chá?", PERSONA, LLM, ["ctx"])
+    assert base != make_response_key("O que acha de café?", {**PERSONA, "name": "Lia"}, LLM, ["ctx"])
+    assert base != make_response_key("O que acha de café?", PERSONA, {**LLM, "temperature": 0.7}, ["ctx"])
+    assert base != make_response_key("O que acha de café?", PERSONA, LLM, ["outro ctx"])
+
+
+def test_memory_backend_ttl_and_stats():
+    now = [1000.0]
+    cache = MemoryResponseCache(max_items=2, ttl=10, clock=lambda: now[0])
+    cache.set("a", "resposta a")
+    assert cache.get("a") == "resposta a"
+    assert cache.get("b") is None
+    now[0] += 9
+    assert cache.get("a") == "resposta a"
+    now[0] += 2  # passou do TTL
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["backend"]) == (2, 2, "memory")
+    assert stats["expirations"] == 1
+    assert stats["items"] == 0
+
+
+def test_sqlite_backend_persists_and_bounds_size(tmp_path):
+    path = tmp_path / "responses.sqlite"
+    cache = SQLiteResponseCache(path, max_items=2, ttl=60)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"  # "a" mais recente que "b"
+    cache.set("c", "3")           # excede max_items -> descarta "b"
+
+    reopened = SQLiteResponseCache(path, max_items=2, ttl=60)
+    assert reopened.get("a") == "1"
+    assert reopened.get("b") is None
+    assert reopened.get("c") == "3"
+    assert reopened.stats()["items"] == 2
+
+    expired = SQLiteResponseCache(tmp_path / "ttl.sqlite", ttl=-1)
+    expired.set("x", "y")
+    assert expired.get("x") is None
@@ -0,0 +1,51 @@
+import uuid
+
+import pytest
+
+from src.service.semantic_cache import SemanticResponseCache
+
+# Vetores fixos: as duas perguntas sobre café são quase colineares; a de chá, não.
+VECTORS = {
+    "o que acha de café?": [1.0, 0.05, 0.0],
+    "você curte café?": [1.0, 0.1, 0.0],
+    "e de chá?": [0.0, 1.0, 0.2],
+}
+PERSONA = {"name": "Rony"}
+LLM = {"model": "gpt-4o-mini", "temperature": 0.1}
+
+
+class FakeRAG:
+    def __init__(self, client):
+        self.client = client
+
+    def _embed_query(self, text):
+        return VECTORS[text.lower()]
+
+
+@pytest.fixture
+def semantic_cache():
+    chromadb = pytest.importorskip("chromadb")
+    cache = SemanticResponseCache(
+        FakeRAG(chromadb.EphemeralClient()), max_distance=0.05, collection_prefix=f"t{uuid.uuid4().hex[:8]}"
+    )
+    return cache
+
+
+def test_paraphrase_hits_and_distant_question_misses(semantic_cache):
+    """Paráfrases dentro do limiar reaproveitam a resposta; perguntas distantes, não."""
+    semantic_cache.store("O que acha de café?", PERSONA, LLM, "Café é vida.")
+
+    hit = semantic_cache.lookup("Você curte café?", PERSONA, LLM)
+    assert hit is not None and hit[0] == "Café é vida."
+    assert hit[1] <= 0.05
+
+    assert semantic_cache.lookup("E de chá?", PERSONA, LLM) is None
+    stats = semantic_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["distance"]["count"] == 2
+
+
+def test_isolated_by_persona_and_llm_settings(semantic_cache):
+    semantic_cache.store("O que acha de café?", PERSONA, LLM, "Café é vida.")
+    assert semantic_cache.lookup("Você curte café?", {"name": "Lia"}, LLM) is None
+    assert semantic_cache.lookup("Você curte café?", PERSONA, {**LLM, "temperature": 0.9}) is None
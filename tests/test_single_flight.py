@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.service.single_flight import SingleFlight
+
+
+def test_threads_with_same_key_share_result():
+    flight = SingleFlight()
+    calls = 0
+    started = threading.Event()
+
+    def work():
+        nonlocal calls
+        calls += 1
+        started.set()
+        time.sleep(0.1)
+        return "ok"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", work)))
+    leader.start()
+    started.wait(1)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("k", work))) for _ in range(3)]
+    for t in followers:
+        t.start()
+    for t in [leader, *followers]:
+        t.join()
+
+    assert results == ["ok"] * 4
+    assert calls == 1
+    assert flight.stats() == {"inflight": 0, "executions": 1, "coalesced": 3, "coalesce_rate": 0.75}
+
+
+def test_async_followers_receive_leader_error_and_key_is_released():
+    flight = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.02)
+        raise ValueError("falhou")
+
+    async def main():
+        return await asyncio.gather(*(flight.ado("k", boom) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+    # Depois de concluída, a chave não fica presa: nova chamada executa de novo
+    assert asyncio.run(flight.ado("k", lambda: asyncio.sleep(0, result="ok"))) == "ok"
+    assert flight.stats()["executions"] == 2
+
+
+def test_cancelled_async_leader_does_not_cancel_followers():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def main():
+        leader = asyncio.ensure_future(flight.ado("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.ado("k", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == "ok"
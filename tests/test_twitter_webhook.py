@@ -0,0 +1,98 @@
+import base64
+import hashlib
+import hmac
+import json
+
+import requests
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.pipeline.checkpoint import Checkpoint
+from src.pipeline.daemon import MentionDaemon
+from src.pipeline.seen import SeenIndex
+from src.twitter.client import TwitterClient
+from src.twitter.fake_server import BOT_ID, FakeServerThread, FakeTwitterState
+from src.twitter.rate_limit import RateLimitScheduler
+from src.twitter.webhook import SIGNATURE_HEADER, WebhookHub, sign
+from src.web.server import ServerThread
+from src.web.twitter_webhook import WEBHOOK_PATH, create_webhook_router
+
+
+SECRET = "segredo"
+
+
+def _app(hub):
+    app = FastAPI()
+    app.include_router(create_webhook_router(hub, secret=SECRET))
+    return app
+
+
+def test_crc_and_signature_validation():
+    hub = WebhookHub()
+    received = []
+    hub.register(lambda mentions: received.extend(mentions) or len(mentions), bot_user_id=BOT_ID)
+    http = TestClient(_app(hub))
+
+    token = http.get(WEBHOOK_PATH, params={"crc_token": "abc"}).json()["response_token"]
+    expected = base64.b64encode(hmac.new(SECRET.encode(), b"abc", hashlib.sha256).digest()).decode()
+    assert token == "sha256=" + expected
+
+    event = {
+        "for_user_id": BOT_ID,
+        "tweet_create_events": [
+            {"id_str": "11", "text": "@personabot oi", "user": {"id_str": "7"},
+             "entities": {"user_mentions": [{"id_str": BOT_ID}]}},
+            {"id_str": "12", "text": "resposta do bot", "user": {"id_str": BOT_ID},
+             "entities": {"user_mentions": [{"id_str": BOT_ID}]}},
+        ],
+    }
+    body = json.dumps(event).encode()
+    assert http.post(WEBHOOK_PATH, content=body, headers={SIGNATURE_HEADER: "sha256=forjada"}).status_code == 401
+    resp = http.post(WEBHOOK_PATH, content=body, headers={SIGNATURE_HEADER: sign(body, SECRET)})
+    assert resp.json() == {"ok": True, "mentions": 1, "accepted": 1}
+    assert [m.id for m in received] == ["11"]
+    assert hub.stats()["rejected"] == 1 and hub.stats()["crc_checks"] == 1
+
+
+def test_fake_api_drives_webhook_and_polling_recovers_gaps(tmp_path):
+    fake = FakeServerThread(FakeTwitterState(consumer_secret=SECRET)).start()
+    hub = WebhookHub()
+    receiver = ServerThread(_app(hub)).start()
+    scheduler = RateLimitScheduler(limits={"default": (100, 900)})
+    creds = {"consumer_key": "k", "consumer_secret": SECRET, "access_token": "t", "access_token_secret": "ts",
+             "user_id": BOT_ID}
+    client = TwitterClient(scheduler=scheduler, credentials=creds, base_url=fake.url)
+    handled = []
+    daemon = MentionDaemon(
+        client, lambda m: handled.append(m.id), Checkpoint(tmp_path / "p.sqlite"), backfill=True, workers=2,
+        seen=SeenIndex(tmp_path / "p.sqlite"), bot_user_id=BOT_ID, reconcile_interval=900,
+    )
+    hub.register(daemon.ingest, bot_user_id=BOT_ID)
+    try:
+        # Registro do webhook: a API falsa faz o desafio CRC antes de aceitar
+        resp = requests.post(
+            f"{fake.url}/1.1/account_activity/all/dev/webhooks.json", params={"url": receiver.url + WEBHOOK_PATH}
+        )
+        assert resp.json()["valid"] is True and daemon.push_active
+
+        first = fake.state.add_tweet("@personabot oi")
+        lost = fake.state.add_tweet("@personabot perdida", deliver=False)
+        last = fake.state.add_tweet("@personabot tudo bem?")
+        fake.state.wait_for_deliveries()
+        daemon.drain()
+        assert sorted(handled) == sorted([first["id"], last["id"]])
+        assert daemon.since_id is None  # push não mexe no checkpoint
+
+        # Polling de reconciliação: só a menção perdida chega ao handler
+        daemon.run_once()
+        daemon.drain()
+        assert sorted(handled) == sorted([first["id"], lost["id"], last["id"]])
+        stats = daemon.stats()
+        assert (stats["pushed"], stats["gap_recovered"], stats["duplicates"]) == (2, 1, 2)
+        assert daemon.since_id == last["id"]
+        assert daemon.next_interval() == 900
+    finally:
+        daemon.pool.close()
+        scheduler.close()
+        receiver.stop()
+        fake.stop()
@@ -0,0 +1,90 @@
+import threading
+import time
+
+from src.pipeline.checkpoint import Checkpoint, Watermark
+from src.pipeline.daemon import MentionDaemon
+from src.pipeline.workers import DEFERRED, DROPPED, QUEUED, WorkerPool
+from src.twitter.client import Mention
+
+
+def test_watermark_advances_only_over_contiguous_prefix():
+    advanced = []
+    wm = Watermark(advanced.append)
+    for key in ("1", "2", "3"):
+        wm.track(key)
+    wm.done("2")
+    assert advanced == []
+    wm.done("1")
+    assert advanced == ["2"]
+    wm.done("3")
+    assert advanced == ["2", "3"]
+    assert len(wm) == 0
+
+
+def test_full_queue_policies():
+    release = threading.Event()
+    pool = WorkerPool(lambda item: release.wait(2), workers=1, max_queue=1, policy="drop").start()
+    assert pool.submit("a") == QUEUED
+    time.sleep(0.05)  # worker pega "a" e fica ocupado
+    assert pool.submit("b") == QUEUED
+    assert pool.submit("c") == DROPPED
+    release.set()
+    pool.join()
+    stats = pool.stats()
+    assert (stats["processed"], stats["dropped"]) == (2, 1)
+    assert stats["queue_wait"]["count"] == 2
+    pool.close()
+
+    pool = WorkerPool(lambda item: None, workers=1, max_queue=1, policy="defer")
+    assert pool.submit("a") == QUEUED  # sem start: a fila não esvazia
+    assert pool.submit("b") == DEFERRED
+    assert pool.submit("c", timeout=0) == DEFERRED
+
+
+def test_daemon_with_workers_checkpoints_watermark(tmp_path):
+    mentions = [Mention(id=str(i), text=f"pergunta {i}") for i in range(1, 21)]
+
+    class Client:
+        def get_recent_mentions(self, since_id=None):
+            return [m for m in mentions if since_id is None or int(m.id) > int(since_id)]
+
+    busy = []
+
+    def handler(mention):
+        busy.append(threading.current_thread().name)
+        time.sleep(0.01)
+
+    daemon = MentionDaemon(Client(), handler, Checkpoint(tmp_path / "p.sqlite"), backfill=True, workers=4)
+    assert daemon.run_once() == 20
+    daemon.drain()
+    daemon.pool.close()
+
+    stats = daemon.stats()
+    assert daemon.since_id == "20"
+    assert stats["processed"] == 20 and stats["inflight"] == 0
+    assert len(set(busy)) > 1
+    assert len(stats["pool"]["utilization"]) == 4
+
+
+def test_daemon_with_workers_counts_final_failure_as_gave_up(tmp_path):
+    mentions = [Mention(id=str(i), text=f"pergunta {i}") for i in range(1, 4)]
+
+    class Client:
+        def get_recent_mentions(self, since_id=None):
+            return [m for m in mentions if since_id is None or int(m.id) > int(since_id)]
+
+    def handler(mention):
+        if mention.id == "2":
+            raise RuntimeError("LLM indisponível")
+
+    daemon = MentionDaemon(
+        Client(), handler, Checkpoint(tmp_path / "p.sqlite"), backfill=True, workers=2, max_attempts=2
+    )
+    daemon.run_once()
+    daemon.drain()
+    daemon.pool.close()
+
+    stats = daemon.stats()
+    assert daemon.since_id == "3"
+    # `dropped` fica só para a fila cheia
+    assert (stats["processed"], stats["failed"], stats["gave_up"], stats["dropped"]) == (2, 1, 1, 0)